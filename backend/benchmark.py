@@ -0,0 +1,398 @@
+"""
+Cleaner benchmark suite.
+
+Generates realistic synthetic rosters with a configurable share of dirty
+data, then times XLSX writing and reading, each validator and
+process_spreadsheet separately. Results are written as JSON so runs can be
+compared, and --compare fails when a benchmark got slower than a baseline.
+
+Usage:
+    python benchmark.py                                  # 1k, 10k and 100k rows
+    python benchmark.py --sizes 1000 1000000 --output results.json
+    python benchmark.py --mix dirty_phone=0.5 duplicate=0.2
+    python benchmark.py --compare baseline.json --tolerance 0.2
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import unicodedata
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import pandas as pd
+from openpyxl import Workbook
+from cleaner import SpreadsheetCleaner, CLEANING_MODES
+from ingest import iter_excel_rows, iter_records
+from validators import (
+    clean_phone,
+    clean_zip_code,
+    clean_name,
+    clean_email,
+    clean_date_of_birth,
+    _clean_date_of_birth,
+    REQUIRED_HEADERS,
+    VALIDATOR_VERSION
+)
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Share of rows with each kind of dirty value (kinds are independent)
+DEFAULT_MIX = {
+    "dirty_phone": 0.25,    # (708) 555-1234, 708.555.1234, numeric cells, too short/long
+    "zip_plus4": 0.15,      # 60163-1234
+    "odd_dob": 0.2,         # unpadded, 2-digit years, dashes, future years, invalid dates
+    "invalid_name": 0.02,   # digits, symbols, blanks
+    "invalid_email": 0.02,  # missing @, blanks
+    "duplicate": 0.05,      # repeat an earlier student's email or name + DOB
+}
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+    "William", "Barbara", "David", "Elizabeth", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "José", "Zoë", "Mary-Jane", "Seán"
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "O'Brien", "Nguyen", "Van Der Berg", "Lee"
+]
+
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "school.k12.il.us"]
+
+# Baseline timings below this are noise, not regressions
+MIN_COMPARE_SECONDS = 0.01
+
+# Benchmarks that process a whole roster, per SpreadsheetCleaner settings
+CLEANER_BENCHMARKS = {
+    "process_spreadsheet[scalar]": {"mode": "scalar"},
+    "process_spreadsheet[scalar,streaming]": {"mode": "scalar", "streaming": True},
+    "process_spreadsheet[scalar,streaming,columnar]": {"mode": "scalar", "streaming": True, "columnar": True},
+    "process_spreadsheet[dictionary]": {"mode": "dictionary"},
+    "process_spreadsheet[dictionary,streaming]": {"mode": "dictionary", "streaming": True},
+}
+
+
+def generate_roster(rows: int, mix: Dict[str, float] = DEFAULT_MIX, seed: int = 0) -> Iterator[list]:
+    """
+    Generate synthetic roster rows in REQUIRED_HEADERS order.
+    
+    Args:
+        rows: Number of data rows
+        mix: Share of rows per kind of dirty value (see DEFAULT_MIX)
+        seed: Random seed, so every run sees the same data
+    
+    Yields:
+        Row value lists
+    """
+    rng = random.Random(seed)
+    mix = {**DEFAULT_MIX, **mix}
+    earlier = []
+    
+    for i in range(rows):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        email = f"{_email_name(first)}.{_email_name(last)}{i}@{rng.choice(EMAIL_DOMAINS)}"
+        area, exchange, line = rng.randint(200, 999), rng.randint(200, 999), rng.randint(0, 9999)
+        phone = f"{area}{exchange}{line:04d}"
+        zip_code = f"{rng.randint(10000, 99999)}"
+        month, day, year = rng.randint(1, 12), rng.randint(1, 28), rng.randint(2005, 2010)
+        dob = f"{month:02d}/{day:02d}/{year}"
+        
+        if rng.random() < mix["dirty_phone"]:
+            phone = rng.choice([
+                f"({area}) {exchange}-{line:04d}",
+                f"{area}-{exchange}-{line:04d}",
+                f"{area}.{exchange}.{line:04d}",
+                int(phone),
+                f"+1 {area} {exchange} {line:04d}",
+                f"{exchange}-{line:04d}",
+            ])
+        if rng.random() < mix["zip_plus4"]:
+            zip_code = f"{zip_code}-{rng.randint(0, 9999):04d}"
+        elif rng.random() < 0.1:
+            zip_code = int(zip_code)
+        if rng.random() < mix["odd_dob"]:
+            dob = rng.choice([
+                f"{month}/{day}/{year}",
+                f"{month}/{day}/{year % 100:02d}",
+                f"{month}-{day}-{year}",
+                f"{month:02d}-{day:02d}-{year % 100:02d}",
+                f"{month}/{day}/{datetime.now().year + rng.randint(1, 3)}",
+                f"{year}-{month:02d}-{day:02d}",
+                f"2/30/{year}",
+                f"{month}/{day}/1949",
+            ])
+        if rng.random() < mix["invalid_name"]:
+            first = rng.choice([f"{first}{rng.randint(1, 9)}", f"{first}!", ""])
+        if rng.random() < mix["invalid_email"]:
+            email = rng.choice([email.replace("@", ""), "", "n/a"])
+        
+        row = [email, first, last, phone, dob, zip_code]
+        
+        if earlier and rng.random() < mix["duplicate"]:
+            original = rng.choice(earlier)
+            if rng.random() < 0.5:
+                row[0] = original[0].upper()
+            else:
+                row[1], row[2], row[4] = original[1], original[2], original[4]
+        elif len(earlier) < 1000:
+            earlier.append(row)
+        
+        yield row
+
+
+def _email_name(name: str) -> str:
+    """Lowercase ASCII form of a name for an email address (José → jose)."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return "".join(c for c in ascii_name.lower() if c.isalnum() or c == "-")
+
+
+def write_roster_xlsx(rows: Iterator[list]) -> bytes:
+    """Write roster rows to an .xlsx file with openpyxl's write-only mode."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Students")
+    ws.append(REQUIRED_HEADERS)
+    for row in rows:
+        ws.append(row)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def measure(func: Callable[[], Any], rows: int, repeat: int = 3,
+            memory: bool = True) -> Dict[str, Any]:
+    """
+    Time a function, and optionally measure its peak Python memory.
+    
+    The fastest of `repeat` runs is reported, which filters out noise from
+    the rest of the machine. Memory is measured in one more run, since
+    tracemalloc slows the code it traces.
+    
+    Args:
+        func: Function to benchmark
+        rows: Rows the function processes, for rows/sec
+        repeat: Number of timed runs
+        memory: Whether to measure peak memory
+    
+    Returns:
+        Dictionary with seconds, rows_per_sec and peak_memory_bytes
+    """
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    
+    return {
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else None,
+        "peak_memory_bytes": peak
+    }
+
+
+def _run_validator(validator: Callable, values: List[str]) -> None:
+    """Run a validator over a column, starting with an empty DOB memo."""
+    _clean_date_of_birth.cache_clear()
+    for value in values:
+        validator(value)
+
+
+def run_benchmarks(sizes: List[int], mix: Dict[str, float] = DEFAULT_MIX, seed: int = 0,
+                   repeat: int = 3, memory: bool = True,
+                   only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Run every benchmark at every roster size.
+    
+    Args:
+        sizes: Roster sizes in rows
+        mix: Share of rows per kind of dirty value
+        seed: Random seed for the generated rosters
+        repeat: Timed runs per benchmark (the fastest is reported)
+        memory: Whether to measure peak memory
+        only: Run only benchmarks whose name starts with one of these
+    
+    Returns:
+        List of result dictionaries, one per (size, benchmark)
+    """
+    results = []
+    
+    def record(name: str, rows: int, func: Callable[[], Any]) -> None:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            return
+        result = {"benchmark": name, "rows": rows, **measure(func, rows, repeat, memory)}
+        results.append(result)
+        print(f"  {name:<45} {result['seconds']:>10.3f}s {result['rows_per_sec'] or 0:>14,.0f} rows/s",
+              file=sys.stderr)
+    
+    for size in sizes:
+        print(f"=== {size:,} rows ===", file=sys.stderr)
+        roster = list(generate_roster(size, mix, seed))
+        content = write_roster_xlsx(iter(roster))
+        
+        record("xlsx_write", size, lambda: write_roster_xlsx(iter(roster)))
+        record("xlsx_read", size, lambda: sum(1 for _ in iter_excel_rows(content)))
+        
+        # Validators see the strings the cleaner would hand them
+        columns = {
+            header: [str(row[i]).strip() for row in roster]
+            for i, header in enumerate(REQUIRED_HEADERS)
+        }
+        scalar_validators = {
+            "clean_email": (clean_email, columns["Email Address"]),
+            "clean_name": (clean_name, columns["First Name"]),
+            "clean_phone": (clean_phone, columns["Phone"]),
+            "clean_date_of_birth": (clean_date_of_birth, columns["Date of Birth"]),
+            "clean_zip_code": (clean_zip_code, columns["Zip Code"]),
+        }
+        for name, (validator, values) in scalar_validators.items():
+            record(f"validator[{name}]", size, lambda: _run_validator(validator, values))
+        
+        # The engines alone, on the records /clean reads, without file I/O
+        records = list(iter_records(iter(roster)))
+        for mode in CLEANING_MODES:
+            record(f"clean_records[{mode}]", size, lambda: _clean(records, mode))
+        
+        for name, options in CLEANER_BENCHMARKS.items():
+            record(name, size, lambda: _process(content, options))
+    
+    return results
+
+
+def _clean(records: List[tuple], mode: str) -> None:
+    """Clean records with one engine, starting with an empty DOB memo."""
+    _clean_date_of_birth.cache_clear()
+    for _ in SpreadsheetCleaner(mode=mode).clean_records(records):
+        pass
+
+
+def _process(content: bytes, options: Dict[str, Any]) -> None:
+    """Run process_spreadsheet and fail loudly if cleaning failed."""
+    _clean_date_of_birth.cache_clear()
+    result = SpreadsheetCleaner(**options).process_spreadsheet(content, "benchmark.xlsx")
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    Find benchmarks that got slower than the baseline.
+    
+    Args:
+        results: Results of this run
+        baseline: Results of an earlier run
+        tolerance: Allowed slowdown, e.g. 0.2 for 20%. Benchmarks faster
+            than MIN_COMPARE_SECONDS in the baseline are too noisy to compare
+    
+    Returns:
+        One message per regression
+    """
+    previous = {(r["benchmark"], r["rows"]): r for r in baseline}
+    regressions = []
+    
+    for result in results:
+        before = previous.get((result["benchmark"], result["rows"]))
+        if before is None or before["seconds"] < MIN_COMPARE_SECONDS:
+            continue
+        
+        slowdown = result["seconds"] / before["seconds"] - 1
+        if slowdown > tolerance:
+            regressions.append(
+                f"{result['benchmark']} at {result['rows']:,} rows: "
+                f"{before['seconds']:.3f}s → {result['seconds']:.3f}s (+{slowdown:.0%})"
+            )
+    
+    return regressions
+
+
+def parse_mix(pairs: List[str]) -> Dict[str, float]:
+    """
+    Parse "kind=share" pairs into a dirty data mix.
+    
+    Raises:
+        ValueError: If a kind is unknown or a share isn't between 0 and 1
+    """
+    mix = dict(DEFAULT_MIX)
+    for pair in pairs:
+        kind, _, share = pair.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown mix kind '{kind}'. Expected one of: {', '.join(DEFAULT_MIX)}")
+        mix[kind] = float(share)
+        if not 0 <= mix[kind] <= 1:
+            raise ValueError(f"Mix share for '{kind}' must be between 0 and 1")
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the spreadsheet cleaner.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="roster sizes in rows (default: 1000 10000 100000)")
+    parser.add_argument("--mix", nargs="*", default=[], metavar="KIND=SHARE",
+                        help=f"dirty data shares, kinds: {', '.join(DEFAULT_MIX)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", metavar="PREFIX",
+                        help="run only benchmarks starting with these names")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timed runs per benchmark, fastest is reported (default: 3)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the extra peak memory run")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown against the baseline (default: 0.2)")
+    args = parser.parse_args(argv)
+    
+    mix = parse_mix(args.mix)
+    results = run_benchmarks(args.sizes, mix, args.seed, args.repeat, not args.no_memory, args.only)
+    
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "validator_version": VALIDATOR_VERSION,
+            "cleaning_modes": list(CLEANING_MODES),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "mix": mix
+        },
+        "results": results
+    }
+    
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"✓ Wrote {len(results)} results to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"✗ Regression: {message}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"✓ No regressions beyond {args.tolerance:.0%}", file=sys.stderr)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Single-pass date of birth parsing.
+
+Recognizes the month/day/year shapes the cleaner accepts with one regex and
+builds the date directly, instead of trying strptime formats one by one and
+catching a ValueError for each miss.
+"""
+import re
+from datetime import datetime
+from typing import Optional
+
+# Same shapes datetime.strptime accepts for '%m/%d/%Y', '%m/%d/%y',
+# '%m-%d-%Y' and '%m-%d-%y' (the separator must not change mid-date).
+DOB_PATTERN = re.compile(
+    r'^(1[0-2]|0[1-9]|[1-9])([/-])(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])\2(\d{4}|\d{2})$'
+)
+
+DATE_SEPARATOR_PATTERN = re.compile(r'[/-]')
+
+
+def parse_date_of_birth(text: str) -> Optional[datetime]:
+    """
+    Parse a stripped month/day/year string.
+    
+    Strict M/D/YYYY and M/D/YY shapes (or with '-') are matched in one
+    regex pass. 2-digit years follow strptime: 00-68 → 2000s, 69-99 → 1900s.
+    Anything else is split on '/' or '-' and read as month, day, year,
+    where 2-digit years 0-50 → 2000s and 51-99 → 1900s.
+    
+    Args:
+        text: Date string
+    
+    Returns:
+        Parsed datetime, or None if the text doesn't have three parts
+    
+    Raises:
+        ValueError: If the parts aren't numbers or don't form a real date
+    """
+    match = DOB_PATTERN.match(text)
+    if match:
+        month, day, year = int(match.group(1)), int(match.group(3)), int(match.group(4))
+        if len(match.group(4)) == 2:
+            year += 2000 if year <= 68 else 1900
+        
+        # Impossible dates (2/30, year 0000) get a second chance below,
+        # just like when every strptime format fails
+        if year >= 1 and day <= _days_in_month(year, month):
+            return datetime(year, month, day)
+    
+    # Try splitting by / or -
+    parts = DATE_SEPARATOR_PATTERN.split(text)
+    if len(parts) != 3:
+        return None
+    
+    month, day, year = (int(part) for part in parts)
+    
+    # Handle 2-digit years
+    if year < 100:
+        if year <= 50:
+            year += 2000
+        else:
+            year += 1900
+    
+    return datetime(year, month, day)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    """Number of days in the given month."""
+    if month == 2:
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        return 29 if leap else 28
+    return 30 if month in (4, 6, 9, 11) else 31
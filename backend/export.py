@@ -0,0 +1,119 @@
+"""
+Cleaned file export in XLSX, CSV and Parquet formats.
+
+Each writer consumes row dictionaries one at a time, so the cleaned output
+never needs a second full in-memory copy of the dataset.
+"""
+import csv
+import io
+from typing import Callable, Dict, Iterable
+from openpyxl import Workbook
+from validators import REQUIRED_HEADERS
+
+# Rows per Parquet row group
+PARQUET_BATCH_SIZE = 10000
+
+
+def write_xlsx(rows: Iterable[Dict[str, str]]) -> bytes:
+    """
+    Write rows to an Excel file using openpyxl's write-only mode.
+    
+    Args:
+        rows: Cleaned row data dictionaries
+    
+    Returns:
+        Excel file as bytes
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Cleaned Data")
+    
+    # Write headers
+    ws.append(REQUIRED_HEADERS)
+    
+    # Write data rows
+    for row_data in rows:
+        ws.append([row_data[header] for header in REQUIRED_HEADERS])
+    
+    # Save to bytes
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def write_csv(rows: Iterable[Dict[str, str]]) -> bytes:
+    """
+    Write rows to a UTF-8 CSV file.
+    
+    Args:
+        rows: Cleaned row data dictionaries
+    
+    Returns:
+        CSV file as bytes
+    """
+    output = io.BytesIO()
+    text = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    
+    writer.writerow(REQUIRED_HEADERS)
+    for row_data in rows:
+        writer.writerow([row_data[header] for header in REQUIRED_HEADERS])
+    
+    text.flush()
+    content = output.getvalue()
+    text.detach()
+    return content
+
+
+def write_parquet(rows: Iterable[Dict[str, str]]) -> bytes:
+    """
+    Write rows to a Parquet file, one row group per PARQUET_BATCH_SIZE rows.
+    
+    Args:
+        rows: Cleaned row data dictionaries
+    
+    Returns:
+        Parquet file as bytes
+    
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires the pyarrow package")
+    
+    schema = pa.schema([(header, pa.string()) for header in REQUIRED_HEADERS])
+    output = io.BytesIO()
+    
+    with pq.ParquetWriter(output, schema) as writer:
+        batch = []
+        for row_data in rows:
+            batch.append(row_data)
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    
+    return output.getvalue()
+
+
+# Export format -> (writer, file extension, content type)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "xlsx": (write_xlsx, "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (write_csv, "csv", "text/csv"),
+    "parquet": (write_parquet, "parquet", "application/vnd.apache.parquet"),
+}
+
+
+def get_writer(output_format: str) -> Callable[[Iterable[Dict[str, str]]], bytes]:
+    """
+    Look up the writer for an export format.
+    
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}'. Expected one of: {', '.join(EXPORT_FORMATS)}")
+    return EXPORT_FORMATS[output_format][0]
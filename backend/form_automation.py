@@ -3,8 +3,13 @@ Playwright form automation for Army recruitment form.
 Fills out the form with student data.
 """
 import asyncio
-from typing import Dict, Optional
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
 from playwright.async_api import async_playwright, Page, Browser
+from request_blocking import DEFAULT_BLOCKING, RequestBlocker, new_blocking_stats
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -23,29 +28,146 @@ SELECTORS = {
     'submit_button': 'button.form-submit'
 }
 
+# Inputs that must be on the page before filling starts
+FORM_FIELDS = ['email', 'first_name', 'last_name', 'phone', 'dob', 'zip_code']
+
+# When a page counts as loaded:
+# - "networkidle": no requests for 500 ms, trackers and beacons included
+# - "selectors": DOM parsed and every FORM_FIELDS input attached and enabled;
+#   after submit, the form's POST response
+READINESS_STRATEGIES = ("networkidle", "selectors")
+DEFAULT_READINESS = os.getenv("FORM_READINESS", "selectors")
+
+# Pages loaded ahead of time for the next students while one is filled, so
+# their navigation overlaps with filling and submitting
+DEFAULT_LOOKAHEAD = int(os.getenv("FORM_LOOKAHEAD", "1"))
+MAX_LOOKAHEAD = 4
+
+# Resource types of the form's own submission request; beacons, pings and
+# tracking pixels come as other types
+SUBMISSION_RESOURCE_TYPES = ("document", "xhr", "fetch")
+
+# Action of the form the submit button belongs to, or "" if it has none
+FORM_ACTION_JS = "button => button.form ? button.form.action : ''"
+
+# True once every selector matches an enabled element
+FORM_READY_JS = """selectors => selectors.every(selector => {
+    const element = document.querySelector(selector);
+    return element !== null && !element.disabled;
+})"""
+
+
+def new_readiness_stats() -> Dict[str, float]:
+    """
+    Counters of how long pages took to be ready.
+    
+    "rows" and "ready_seconds" count every navigation, preloaded or not.
+    "wait_seconds" is the part students actually waited for; the students
+    that got a preloaded page count in "preloaded_rows". With the selectors
+    strategy, navigations that also reached networkidle before the page was
+    closed add to "networkidle_rows" and "saved_seconds", the time waiting
+    for networkidle would have added.
+    """
+    return {
+        "rows": 0, "ready_seconds": 0.0, "wait_seconds": 0.0, "preloaded_rows": 0,
+        "networkidle_rows": 0, "saved_seconds": 0.0
+    }
+
+
+def url_origin(url: str) -> str:
+    """Scheme and host (with port) of a URL, e.g. "https://www.goarmy.com"."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def is_form_submission(request, origins: Iterable[str]) -> bool:
+    """Whether a request is a form's own POST: a document, XHR or fetch to one of origins."""
+    return (request.method == "POST" and request.resource_type in SUBMISSION_RESOURCE_TYPES
+            and url_origin(request.url) in origins)
+
+
+def new_page_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of a page: "readiness" (see above) and "blocking" (see request_blocking)."""
+    return {"readiness": new_readiness_stats(), "blocking": new_blocking_stats()}
+
+
+def merge_counters(total: Dict[str, Any], stats: Dict[str, Any]) -> None:
+    """Add (nested) counters of one page to a total."""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            merge_counters(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+
 
 class FormAutomation:
-    """Handles automated form filling using Playwright."""
+    """
+    Handles automated form filling using Playwright.
     
-    def __init__(self):
+    Each student gets a fresh page. With lookahead > 0, that many pages are
+    kept loading the form in the background, and fill_form takes the oldest
+    one instead of navigating after the previous student is done. The
+    pipeline is per URL; pages loaded for another URL are discarded. Near
+    the end of a job, no more pages are loaded than students are left.
+    """
+    
+    def __init__(self, readiness: str = DEFAULT_READINESS, blocking: str = DEFAULT_BLOCKING,
+                 lookahead: int = DEFAULT_LOOKAHEAD):
+        """
+        Args:
+            readiness: When a page counts as loaded, one of READINESS_STRATEGIES
+            blocking: Requests to block, one of request_blocking.BLOCKING_PROFILES
+            lookahead: Pages to load ahead, at most MAX_LOOKAHEAD
+        """
+        if readiness not in READINESS_STRATEGIES:
+            raise ValueError(f"Unknown readiness strategy: {readiness} (expected one of {', '.join(READINESS_STRATEGIES)})")
+        if not 0 <= lookahead <= MAX_LOOKAHEAD:
+            raise ValueError(f"lookahead must be between 0 and {MAX_LOOKAHEAD}, got {lookahead}")
+        self.readiness = readiness
+        self.lookahead = lookahead
+        self._preloaded: Deque[Tuple[str, asyncio.Task]] = deque()  # (url, task loading a page), oldest first
+        self.readiness_stats = new_readiness_stats()
+        self.blocker = RequestBlocker.from_profile(blocking)
+        self._idle_watchers = set()  # networkidle waits still running, see _watch_networkidle
         self.browser: Optional[Browser] = None
         self.playwright = None
         self.context = None  # Reuse same context across students
         self.page = None
         self.page_used = False  # Track if page has been used
+        self.owns_browser = True  # False when sharing another automation's browser
     
-    async def start(self):
-        """Initialize Playwright and browser."""
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=True)
+    async def start(self, browser: Optional[Browser] = None):
+        """
+        Initialize Playwright and browser.
+        
+        Args:
+            browser: Already running browser to open this automation's
+                context and page in, instead of launching one. It is left
+                running by stop().
+        """
+        self.owns_browser = browser is None
+        if self.owns_browser:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True)
+        else:
+            self.browser = browser
         # Create a single context and page to reuse across all students
         self.context = await self.browser.new_context()
+        await self.blocker.attach(self.context)
         self.page = await self.context.new_page()
         self.page_used = False  # Reset flag for new browser session
-        logger.info("Browser launched successfully")
+        logger.info("Browser launched successfully" if self.owns_browser else "Page opened in shared browser")
+    
+    @property
+    def page_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Readiness and request blocking counters, as from new_page_stats."""
+        return {"readiness": self.readiness_stats, "blocking": self.blocker.stats}
     
     async def stop(self):
-        """Close browser and Playwright."""
+        """Close browser and Playwright (only the page and context of a shared browser)."""
+        for watcher in self._idle_watchers:
+            watcher.cancel()
+        await self._discard_preloaded()
         if self.page:
             try:
                 await self.page.close()
@@ -59,7 +181,8 @@ class FormAutomation:
                 pass
             self.context = None
         if self.browser:
-            await self.browser.close()
+            if self.owns_browser:
+                await self.browser.close()
             self.browser = None
         if self.playwright:
             await self.playwright.stop()
@@ -71,7 +194,8 @@ class FormAutomation:
         url: str,
         student_data: Dict[str, str],
         submit: bool = False,
-        max_retries: int = 3
+        max_retries: int = 3,
+        upcoming: Optional[int] = None
     ) -> Dict[str, any]:
         """
         Fill out the form with student data.
@@ -81,6 +205,8 @@ class FormAutomation:
             student_data: Dictionary with student information
             submit: Whether to actually submit the form (False for testing)
             max_retries: Number of retries on failure
+            upcoming: Students this page may still get after this one, so
+                no more forms are loaded ahead (None if not known)
         
         Returns:
             Dictionary with status and message
@@ -90,25 +216,29 @@ class FormAutomation:
                 # Check if browser is still connected
                 if not self.browser or not self.browser.is_connected():
                     raise Exception("Browser is not connected")
-
+                
                 # Check if context exists
                 if not self.context:
                     raise Exception("Context not initialized")
                 
-                # For 2nd+ students, create fresh page to avoid dirty state
+                # For 2nd+ students, use a fresh page to avoid dirty state
                 # For 1st student, use the page created in start()
+                loaded = False
                 if self.page_used:
-                    # Page has been used for previous student - close and recreate
+                    # Page has been used for previous student - close and take the next one
                     try:
                         await self.page.close()
                     except:
                         pass
-                    self.page = await self.context.new_page()
-                    logger.debug("Created fresh page for next student")
+                    self.page_used = False
+                    self.page, loaded = await self._next_page(url)
+                    logger.debug("Took fresh page for next student")
                 
-                # Navigate to form
-                logger.info(f"Navigating to: {url}")
-                await self.page.goto(url, wait_until="networkidle", timeout=30000)
+                # Navigate to form, unless the page was loaded ahead
+                if not loaded:
+                    logger.info(f"Navigating to: {url}")
+                    self.readiness_stats["wait_seconds"] += await self._navigate(self.page, url)
+                self._fill_pipeline(url, upcoming)
                 
                 # Fill email
                 logger.info(f"Filling email: {student_data['Email Address']}")
@@ -162,15 +292,26 @@ class FormAutomation:
                     
                     for result in checkbox_result:
                         logger.info(f"✓ Consent checkbox {result['id']} checked: {result['checked']}")
-                    
+                
                 except Exception as e:
                     logger.warning(f"Checkbox checking failed: {str(e)} - continuing anyway")
                 
                 # Optional: Submit the form
                 if submit:
                     logger.info("⚠️  SUBMITTING FORM!")
-                    await self.page.click(SELECTORS['submit_button'])
-                    await self.page.wait_for_load_state("networkidle", timeout=10000)
+                    if self.readiness == "networkidle":
+                        await self.page.click(SELECTORS['submit_button'])
+                        await self.page.wait_for_load_state("networkidle", timeout=10000)
+                    else:
+                        # Only the form's own request confirms it, not an analytics beacon
+                        origins = await self._submission_origins(url)
+                        async with self.page.expect_response(
+                            lambda response: is_form_submission(response.request, origins), timeout=10000
+                        ) as response_info:
+                            await self.page.click(SELECTORS['submit_button'])
+                        response = await response_info.value
+                        if not response.ok:
+                            raise Exception(f"Form submission failed with HTTP {response.status}")
                     logger.info("✓ Form submitted successfully")
                 else:
                     logger.info("✓ Form filled (NOT submitted - testing mode)")
@@ -184,15 +325,24 @@ class FormAutomation:
                     'message': 'Form submitted' if submit else 'Form filled successfully (not submitted)',
                     'student': f"{student_data['First Name']} {student_data['Last Name']}"
                 }
-                
+            
             except Exception as e:
                 error_msg = str(e) if str(e) else "Unknown error"
                 logger.error(f"Attempt {attempt + 1} failed: {error_msg}")
                 
+                # stop() closed the page under us; retrying would only reopen it
+                if self.browser is None:
+                    return {
+                        'success': False,
+                        'message': f'Stopped: {error_msg}',
+                        'student': f"{student_data.get('First Name', 'Unknown')} {student_data.get('Last Name', 'Unknown')}"
+                    }
+                
                 # If it's a browser connection issue, try to recreate page
                 if "browser" in error_msg.lower() or "target closed" in error_msg.lower():
                     logger.warning("Browser/page issue detected, recreating page...")
                     try:
+                        await self._discard_preloaded()
                         if self.page:
                             try:
                                 await self.page.close()
@@ -205,6 +355,7 @@ class FormAutomation:
                                 pass
                         # Recreate context and page
                         self.context = await self.browser.new_context()
+                        await self.blocker.attach(self.context)
                         self.page = await self.context.new_page()
                         self.page_used = False  # Fresh page, reset flag
                         logger.info("Page recreated successfully")
@@ -226,6 +377,113 @@ class FormAutomation:
             'message': 'Unknown error',
             'student': 'Unknown'
         }
+    
+    async def _submission_origins(self, url: str) -> set:
+        """Origins the form's submission can go to: the form page's and its action's."""
+        origins = {url_origin(url), url_origin(self.page.url)}
+        try:
+            action = await self.page.eval_on_selector(SELECTORS['submit_button'], FORM_ACTION_JS)
+        except Exception:
+            action = ""
+        if action:
+            origins.add(url_origin(action))
+        return origins
+    
+    async def _next_page(self, url: str) -> Tuple[Page, bool]:
+        """
+        Take the oldest page loaded ahead for url, waiting for it if needed.
+        
+        Returns:
+            Tuple of (page, whether the form is loaded on it); a new blank
+            page if none was loaded ahead or loading failed
+        """
+        start = time.perf_counter()
+        while self._preloaded:
+            preloaded_url, task = self._preloaded.popleft()
+            if preloaded_url != url:
+                await self._discard(task)
+                continue
+            try:
+                page = await task
+            except Exception as e:
+                logger.warning(f"Loading page ahead failed: {str(e)}")
+                continue
+            self.readiness_stats["wait_seconds"] += time.perf_counter() - start
+            self.readiness_stats["preloaded_rows"] += 1
+            return page, True
+        return await self.context.new_page(), False
+    
+    def _fill_pipeline(self, url: str, upcoming: Optional[int] = None):
+        """Start loading pages for url until lookahead pages, or upcoming if fewer, are on the way."""
+        wanted = self.lookahead if upcoming is None else min(self.lookahead, upcoming)
+        while len(self._preloaded) < wanted:
+            self._preloaded.append((url, asyncio.create_task(self._preload(url))))
+    
+    async def _preload(self, url: str) -> Page:
+        """Open a page in the current context and load the form on it."""
+        page = await self.context.new_page()
+        try:
+            await self._navigate(page, url)
+        except BaseException:
+            try:
+                await page.close()
+            except:
+                pass
+            raise
+        return page
+    
+    async def _discard(self, task: asyncio.Task):
+        """Stop loading a page ahead and close it."""
+        task.cancel()
+        try:
+            page = await task
+        except (asyncio.CancelledError, Exception):
+            return
+        try:
+            await page.close()
+        except:
+            pass
+    
+    async def _discard_preloaded(self):
+        """Close every page loaded ahead, e.g. before their context closes."""
+        preloaded, self._preloaded = self._preloaded, deque()
+        for _, task in preloaded:
+            await self._discard(task)
+    
+    async def _navigate(self, page: Page, url: str) -> float:
+        """
+        Load the form on a page and wait until it is ready to fill.
+        
+        Returns:
+            Seconds until the form was ready
+        """
+        start = time.perf_counter()
+        if self.readiness == "networkidle":
+            await page.goto(url, wait_until="networkidle", timeout=30000)
+        else:
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await page.wait_for_function(
+                FORM_READY_JS, arg=[SELECTORS[field] for field in FORM_FIELDS], timeout=30000
+            )
+        ready = time.perf_counter() - start
+        
+        self.readiness_stats["rows"] += 1
+        self.readiness_stats["ready_seconds"] += ready
+        logger.info(f"Form ready after {ready:.2f}s ({self.readiness})")
+        if self.readiness != "networkidle":
+            watcher = asyncio.create_task(self._watch_networkidle(page, start, ready))
+            self._idle_watchers.add(watcher)
+            watcher.add_done_callback(self._idle_watchers.discard)
+        return ready
+    
+    async def _watch_networkidle(self, page: Page, start: float, ready: float):
+        """Record how much later than ready a page reached networkidle, if before it closes."""
+        try:
+            await page.wait_for_load_state("networkidle", timeout=30000)
+        except Exception:
+            return
+        self.readiness_stats["networkidle_rows"] += 1
+        self.readiness_stats["saved_seconds"] += max(time.perf_counter() - start - ready, 0.0)
 
 
 # Test function
@@ -259,7 +517,7 @@ async def test_automation():
         print(f"Message: {result['message']}")
         print(f"Student: {result['student']}")
         print("="*60 + "\n")
-        
+    
     finally:
         await automation.stop()
 
@@ -0,0 +1,247 @@
+"""
+Fuzzy duplicate detection.
+
+DuplicateIndex only catches exact email or exact name + DOB matches. This
+module also flags near-duplicates such as "Jon"/"John", swapped first and
+last names, or Gmail dot and plus variants of one address.
+
+Comparing every pair of rows would be quadratic, so rows are grouped into
+blocks by cheap keys (normalized email, phonetic name code + DOB, phone)
+and only rows sharing a block are scored. Blocks are capped at
+MAX_BLOCK_SIZE rows, which keeps the work per row constant.
+"""
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+from validators import DuplicateIndex
+
+# Rows kept per blocking key; later rows with the key aren't compared
+MAX_BLOCK_SIZE = 20
+
+# Score at or above which a row is flagged as a possible duplicate
+FUZZY_THRESHOLD = 0.85
+
+# Weight of each field comparison in the score
+FIELD_WEIGHTS = {
+    "name": 0.5,
+    "dob": 0.3,
+    "email": 0.1,
+    "phone": 0.1,
+}
+
+# Providers that ignore dots in the local part of an address
+DOTLESS_EMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize_email(email: str) -> str:
+    """
+    Canonical form of an email address.
+    
+    Drops "+tag" suffixes, and dots for Gmail addresses, so
+    "J.Doe+school@gmail.com" and "jdoe@googlemail.com" match.
+    """
+    local, _, domain = email.lower().strip().partition("@")
+    local = local.split("+", 1)[0]
+    if domain in DOTLESS_EMAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}" if domain else local
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase ASCII letters of a name (José → jose, O'Brien → obrien)."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return "".join(c for c in ascii_name.lower() if c.isalpha())
+
+
+def soundex(name: str) -> str:
+    """
+    American Soundex code of a normalized name (e.g. "robert" → "R163").
+    
+    Returns an empty string for an empty name.
+    """
+    if not name:
+        return ""
+    
+    code = name[0].upper()
+    previous = SOUNDEX_CODES.get(name[0], "")
+    for c in name[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate letters with the same code; vowels do
+        if c not in "hw":
+            previous = digit
+    
+    return code.ljust(4, "0")
+
+
+def jaro_winkler(a: str, b: str) -> float:
+    """Jaro-Winkler similarity of two strings, from 0.0 to 1.0."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    
+    window = max(0, max(len(a), len(b)) // 2 - 1)
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    
+    for i, c in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == c:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    
+    if not matches:
+        return 0.0
+    
+    a_chars = [c for c, matched in zip(a, a_matched) if matched]
+    b_chars = [c for c, matched in zip(b, b_matched) if matched]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+# Normalized fields compared by score_pair
+Features = Tuple[str, str, str, str, str]
+
+
+def row_features(row_data: dict) -> Features:
+    """Normalize a row into (first, last, dob, email, phone) for comparison."""
+    return (
+        normalize_name(row_data.get('First Name', '')),
+        normalize_name(row_data.get('Last Name', '')),
+        row_data.get('Date of Birth', '').strip(),
+        normalize_email(row_data.get('Email Address', '')),
+        row_data.get('Phone', '').strip()
+    )
+
+
+def blocking_keys(features: Features) -> List[Tuple[str, ...]]:
+    """
+    Keys of the blocks a row belongs to.
+    
+    Soundex codes are sorted, so swapped first and last names share a block.
+    """
+    first, last, dob, email, phone = features
+    keys = []
+    if email:
+        keys.append(("email", email))
+    if first and last and dob:
+        keys.append(("name_dob",) + tuple(sorted((soundex(first), soundex(last)))) + (dob,))
+    if phone:
+        keys.append(("phone", phone))
+    return keys
+
+
+def score_pair(a: Features, b: Features) -> float:
+    """
+    Likelihood that two rows are the same student, from 0.0 to 1.0.
+    
+    Rows whose normalized emails match score 1.0, the same rule
+    DuplicateIndex applies to exact emails. Otherwise names (in either
+    order), DOB, email local part and phone are compared and weighted by
+    FIELD_WEIGHTS. First and last name similarities are multiplied, so
+    twins sharing a last name, DOB and phone don't look alike.
+    """
+    a_first, a_last, a_dob, a_email, a_phone = a
+    b_first, b_last, b_dob, b_email, b_phone = b
+    
+    if a_email and a_email == b_email:
+        return 1.0
+    
+    name = max(
+        jaro_winkler(a_first, b_first) * jaro_winkler(a_last, b_last),
+        jaro_winkler(a_first, b_last) * jaro_winkler(a_last, b_first)
+    )
+    dob = 1.0 if a_dob and a_dob == b_dob else 0.0
+    email = jaro_winkler(a_email.split("@")[0], b_email.split("@")[0])
+    phone = 1.0 if a_phone and a_phone == b_phone else 0.0
+    
+    return (
+        FIELD_WEIGHTS["name"] * name
+        + FIELD_WEIGHTS["dob"] * dob
+        + FIELD_WEIGHTS["email"] * email
+        + FIELD_WEIGHTS["phone"] * phone
+    )
+
+
+class FuzzyDuplicateIndex(DuplicateIndex):
+    """
+    DuplicateIndex that also finds likely duplicates.
+    
+    find/add keep the exact matching rules. find_similar scores a row
+    against the earlier rows in its blocks, at most
+    MAX_BLOCK_SIZE * len(blocking_keys) comparisons per row.
+    """
+    
+    def __init__(self, threshold: float = FUZZY_THRESHOLD):
+        super().__init__()
+        self.threshold = threshold
+        self._blocks: Dict[Tuple[str, ...], List[int]] = {}
+        self._entries: List[Tuple[Any, Features]] = []
+    
+    def find_similar(self, row_data: dict) -> Optional[Tuple[Any, float]]:
+        """
+        Find the earlier row most likely to be the same student.
+        
+        Args:
+            row_data: Dictionary with student data
+        
+        Returns:
+            Tuple of (reference of the matching row, score), or None if no
+            row scores at least the threshold
+        """
+        features = row_features(row_data)
+        candidates = set()
+        for key in blocking_keys(features):
+            candidates.update(self._blocks.get(key, ()))
+        
+        best = None
+        for entry in sorted(candidates):
+            row_ref, other = self._entries[entry]
+            score = score_pair(features, other)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (row_ref, score)
+        
+        return best
+    
+    def add(self, row_data: dict, row_ref: Any) -> None:
+        """
+        Add an accepted row to the index and its blocks.
+        
+        Args:
+            row_data: Dictionary with student data
+            row_ref: Reference reported by find and find_similar
+        """
+        super().add(row_data, row_ref)
+        
+        features = row_features(row_data)
+        entry = len(self._entries)
+        self._entries.append((row_ref, features))
+        
+        for key in blocking_keys(features):
+            block = self._blocks.setdefault(key, [])
+            if len(block) < MAX_BLOCK_SIZE:
+                block.append(entry)
@@ -0,0 +1,239 @@
+"""
+Streaming spreadsheet ingestion.
+
+Reads uploads row by row instead of loading them into a DataFrame first,
+so memory stays flat no matter how many rows the file has.
+"""
+import codecs
+import csv
+import io
+import numbers
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from openpyxl import load_workbook
+from validators import validate_headers, REQUIRED_HEADERS
+
+# Cell value as fed to the cleaner: a stripped string, or a native Excel
+# date or number (see normalize_cell)
+Cell = Union[str, int, float, datetime]
+
+# (row_number, row_data) pair as fed to SpreadsheetCleaner.clean_records
+Record = Tuple[int, Dict[str, Cell]]
+
+# Upload extensions read as delimited text instead of Excel
+CSV_EXTENSIONS = ('.csv', '.tsv', '.txt')
+
+# Bytes inspected when sniffing encoding and delimiter
+SNIFF_BYTES = 64 * 1024
+
+# Delimiters considered when sniffing
+CSV_DELIMITERS = ',\t;|'
+
+# Codec error handler for UTF-8 files with Windows-1252 text past the
+# sniffed sample (see _cp1252_fallback)
+CP1252_FALLBACK = 'cp1252_fallback'
+
+
+def iter_excel_rows(file_content: bytes) -> Iterator[tuple]:
+    """
+    Yield every row of the first worksheet as a tuple of cell values.
+    
+    Uses openpyxl's read-only mode, which parses the sheet lazily.
+    
+    Args:
+        file_content: .xlsx file content as bytes
+    
+    Yields:
+        Tuples of cell values, header row first
+    """
+    wb = load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        for row in ws.iter_rows(values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def iter_csv_rows(file_content: bytes, filename: str = "") -> Iterator[tuple]:
+    """
+    Yield every row of a CSV/TSV file as a tuple of strings.
+    
+    The encoding and delimiter are sniffed from the start of the file,
+    and the rest is decoded and parsed lazily. Bytes past the sample that
+    turn out not to be UTF-8 are read as Windows-1252 (see
+    _cp1252_fallback), since only the sample was checked.
+    
+    Args:
+        file_content: Delimited text file content as bytes
+        filename: Original filename (.tsv files default to tabs)
+    
+    Yields:
+        Tuples of cell values, header row first
+    """
+    encoding = sniff_encoding(file_content[:SNIFF_BYTES])
+    errors = CP1252_FALLBACK if encoding == 'utf-8' else 'strict'
+    text = io.TextIOWrapper(io.BytesIO(file_content), encoding=encoding, errors=errors, newline="")
+    
+    sample = text.read(SNIFF_BYTES)
+    text.seek(0)
+    delimiter = sniff_delimiter(sample, default='\t' if filename.lower().endswith('.tsv') else ',')
+    
+    for row in csv.reader(text, delimiter=delimiter):
+        yield tuple(row)
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """
+    Guess the text encoding of a file from its first bytes.
+    
+    Byte order marks win; otherwise UTF-8 if the sample decodes cleanly,
+    else Windows-1252 (what Excel writes for "CSV" on Windows).
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    
+    try:
+        # final=False tolerates a multi-byte character cut off at the end
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+def _cp1252_fallback(error: UnicodeDecodeError) -> Tuple[str, int]:
+    """Codec error handler decoding bytes that aren't valid UTF-8 as Windows-1252."""
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    return error.object[error.start:error.end].decode('cp1252'), error.end
+
+
+codecs.register_error(CP1252_FALLBACK, _cp1252_fallback)
+
+
+def sniff_delimiter(sample: str, default: str = ',') -> str:
+    """
+    Guess the delimiter of a CSV sample.
+    
+    Args:
+        sample: Start of the decoded file
+        default: Delimiter to use when sniffing is inconclusive
+    
+    Returns:
+        Delimiter character
+    """
+    lines = sample.splitlines()
+    
+    # A header that splits into the required headers settles it
+    if lines:
+        for delimiter in CSV_DELIMITERS:
+            if lines[0].split(delimiter)[:len(REQUIRED_HEADERS)] == REQUIRED_HEADERS:
+                return delimiter
+    
+    # Only whole lines give the sniffer consistent field counts
+    if len(lines) > 1:
+        lines = lines[:-1]
+    
+    try:
+        return csv.Sniffer().sniff("\n".join(lines), delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        return default
+
+
+def is_csv_filename(filename: str) -> bool:
+    """Whether an upload should be read as delimited text."""
+    return filename.lower().endswith(CSV_EXTENSIONS)
+
+
+def read_header(rows: Iterator[tuple]) -> Tuple[List[Any], Optional[str]]:
+    """
+    Consume the header row and validate it.
+    
+    Args:
+        rows: Row iterator positioned at the header row
+    
+    Returns:
+        Tuple of (headers, error_message)
+    """
+    header_row = next(rows, None)
+    if header_row is None:
+        return [], f"Missing headers. Expected: {', '.join(REQUIRED_HEADERS)}"
+    
+    # Drop trailing empty header cells
+    headers = list(header_row)
+    while headers and _is_blank(headers[-1]):
+        headers.pop()
+    
+    is_valid, error_msg = validate_headers(headers)
+    return headers, error_msg if not is_valid else None
+
+
+def iter_records(rows: Iterable[tuple], first_row_number: int = 2) -> Iterator[Record]:
+    """
+    Turn raw data rows into (row_number, row_data) pairs.
+    
+    Completely blank rows are skipped but still counted, so row numbers
+    match the spreadsheet. Unlike pd.read_excel, text such as "NA" or
+    "null" is kept as text instead of being treated as a blank cell.
+    
+    Args:
+        rows: Raw data rows (header already consumed)
+        first_row_number: Spreadsheet row number of the first data row
+    
+    Yields:
+        Tuples of (row_number, row_data) with values from normalize_cell
+    """
+    for row_num, row in enumerate(rows, start=first_row_number):
+        if all(_is_blank(value) for value in row):
+            continue
+        
+        yield row_num, {
+            header: normalize_cell(row[i]) if i < len(row) else ""
+            for i, header in enumerate(REQUIRED_HEADERS)
+        }
+
+
+def normalize_cell(value: Any) -> Cell:
+    """
+    Normalize a cell value from openpyxl or pandas, keeping its type.
+    
+    Text is stripped and blanks (None, NaN, NaT) become "". Excel dates
+    stay datetimes and whole numbers become ints (numpy types included),
+    so the validators can format them without parsing str() output such
+    as "2007-03-07 00:00:00" or "6364801423.0". Anything else becomes text.
+    """
+    if isinstance(value, str):
+        return value.strip()
+    if value is None or value != value:
+        return ""
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day, value.hour, value.minute, value.second)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return int(value) if float(value).is_integer() else float(value)
+    return str(value).strip()
+
+
+def cell_to_string(value: Any) -> str:
+    """
+    Convert a cell value to the stripped string the validators expect.
+    
+    Whole-number floats are written without a trailing '.0', as pandas
+    does for numeric Excel cells. Used for cells the validators take as
+    text, e.g. a number in a name column.
+    """
+    if _is_blank(value):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _is_blank(value: Any) -> bool:
+    """Whether a cell value counts as empty."""
+    return value is None or value == ""
@@ -0,0 +1,171 @@
+"""
+Timings and counters for one cleaning run.
+
+SpreadsheetCleaner(instrument=True) records where the time of a run goes:
+wall time and call counts per stage (reading, field cleaning, duplicate
+detection, summary, writing the cleaned file) and per column validator,
+plus how many values each column's rules fixed or skipped. Without it the
+cleaner holds no CleaningStats and skips all of this.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from rules import FIXED, ROW_RULES, SKIPPED, TYPED_CELL_CLEANERS, ColumnCleaner, compile_rules
+from validators import REQUIRED_HEADERS
+
+# Stages in the order a run goes through them
+STAGES = ("read", "clean", "duplicates", "summary", "write")
+
+
+class CleaningStats:
+    """
+    Timings and counters collected while cleaning.
+    
+    Stages don't overlap: in streaming mode "read" only covers the time
+    spent producing rows, not cleaning them. Stats from worker processes
+    are added with merge, so stage and validator times are summed across
+    processes and can exceed the wall time of the run.
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {stage: {"seconds": 0.0, "calls": 0} for stage in STAGES}
+        self.validators = {header: {"seconds": 0.0, "calls": 0, "values": 0} for header in REQUIRED_HEADERS}
+        self.rules = {header: {"fixed": 0, "skipped": 0} for header in REQUIRED_HEADERS}
+        self.counters = {"rows": 0, "reused_rows": 0, "duplicates": 0, "possible_duplicates": 0, "cache_hits": 0}
+        self._clean_fields = compile_rules(ROW_RULES, TYPED_CELL_CLEANERS, self._instrument_column)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Stats come back from worker processes; compiled rules don't pickle
+        state = dict(self.__dict__)
+        del state["_clean_fields"]
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._clean_fields = compile_rules(ROW_RULES, TYPED_CELL_CLEANERS, self._instrument_column)
+    
+    def add_time(self, stage: str, seconds: float, calls: int = 1) -> None:
+        """Add wall time spent in a stage."""
+        entry = self.stages[stage]
+        entry["seconds"] += seconds
+        entry["calls"] += calls
+    
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Time the body of a with block as one call of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+    
+    def time_records(self, records: Iterable[Any], stage: str = "read") -> Iterator[Any]:
+        """
+        Pass records through, timing how long each one takes to produce.
+        
+        Only the time spent inside the source iterator counts, so lazily
+        read files split cleanly into "read" and the stages after it. The
+        whole pass counts as one call.
+        """
+        iterator = iter(records)
+        entry = self.stages[stage]
+        entry["calls"] += 1
+        while True:
+            start = time.perf_counter()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                entry["seconds"] += time.perf_counter() - start
+                return
+            entry["seconds"] += time.perf_counter() - start
+            yield record
+    
+    def record_column(self, header: str, seconds: float, statuses: Iterable[str], calls: int = 1) -> None:
+        """
+        Record cleaning a column chunk.
+        
+        Args:
+            header: Column the validator cleaned
+            seconds: Wall time of the call
+            statuses: Status of each value it returned (list or Series)
+            calls: Validator calls it took (one per distinct value for the
+                dictionary engine)
+        """
+        validator = self.validators[header]
+        validator["seconds"] += seconds
+        validator["calls"] += calls
+        validator["values"] += len(statuses)
+        
+        counts = Counter(statuses)
+        self.rules[header]["fixed"] += counts["fixed"]
+        self.rules[header]["skipped"] += counts["skipped"]
+    
+    def clean_fields(self, row_data: Dict[str, Any]) -> Tuple[Dict[str, str], str, List[str]]:
+        """
+        rules.clean_fields, timing each column cleaner (see _instrument_column).
+        
+        Args:
+            row_data: Raw row data
+        
+        Returns:
+            Tuple of (cleaned_data, status, notes), as from rules.clean_fields
+        """
+        start = time.perf_counter()
+        result = self._clean_fields(row_data)
+        self.add_time("clean", time.perf_counter() - start)
+        return result
+    
+    def _instrument_column(self, header: str, clean: ColumnCleaner) -> ColumnCleaner:
+        """Column hook for compile_rules timing a column cleaner and counting what it fixed or skipped."""
+        validator = self.validators[header]
+        rules = self.rules[header]
+        
+        def instrumented(raw: Any) -> Tuple[str, int, str]:
+            start = time.perf_counter()
+            value, rank, note = clean(raw)
+            validator["seconds"] += time.perf_counter() - start
+            validator["calls"] += 1
+            validator["values"] += 1
+            if rank == FIXED:
+                rules["fixed"] += 1
+            elif rank == SKIPPED:
+                rules["skipped"] += 1
+            return value, rank, note
+        return instrumented
+    
+    def merge(self, other: "CleaningStats") -> None:
+        """Add the stages, validators, rules and counters of another run."""
+        for stage, entry in other.stages.items():
+            self.add_time(stage, entry["seconds"], entry["calls"])
+        for header, entry in other.validators.items():
+            for key, value in entry.items():
+                self.validators[header][key] += value
+        for header, entry in other.rules.items():
+            for key, value in entry.items():
+                self.rules[header][key] += value
+        for key, value in other.counters.items():
+            self.counters[key] += value
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        JSON-ready snapshot, returned as "stats" next to the summary.
+        
+        Returns:
+            Dictionary with "total_seconds" since the stats were created,
+            and "stages", "validators", "rules" and "counters"
+        """
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {
+                stage: {"seconds": round(entry["seconds"], 6), "calls": entry["calls"]}
+                for stage, entry in self.stages.items()
+            },
+            "validators": {
+                header: {**entry, "seconds": round(entry["seconds"], 6)}
+                for header, entry in self.validators.items()
+            },
+            "rules": {header: dict(entry) for header, entry in self.rules.items()},
+            "counters": dict(self.counters)
+        }
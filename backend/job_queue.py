@@ -0,0 +1,273 @@
+"""
+Shared queue of submission rows for distributed workers.
+
+A distributed /submit job puts its students on a JobQueue instead of
+submitting them in the API process. Any number of worker processes
+(submission_worker.py), on any number of nodes sharing the queue, lease
+rows, submit them and ack the outcome. A row whose worker dies is leased
+again once its lease times out.
+
+Backends are picked by URL scheme (see open_queue). SQLiteJobQueue keeps
+everything in one SQLite file, for a single node, a shared volume or tests.
+"""
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# How long a row's lease lasts unless renewed. Workers renew the leases of
+# the rows on their pages (see QueueWorker), so this only bounds how long
+# the row of a dead or hung worker waits before another worker takes it.
+DEFAULT_LEASE_SECONDS = 300
+
+# Leases a row may time out before it is failed instead of leased again
+MAX_LEASE_ATTEMPTS = 3
+
+# Job statuses; rows are only leased from running jobs
+JOB_STATUSES = ("running", "paused", "killed")
+
+
+class JobQueue:
+    """
+    Interface of a submission queue backend.
+    
+    A lease is a dictionary with "job_id", "position", "token", "url" and
+    "student" (row_number and data, as given to create_job). A result is a
+    dictionary with "id" (increasing per queue), "position", "row",
+    "student", "error" (None on success) and "timestamp".
+    """
+    
+    def create_job(self, url: str, students: List[Dict]) -> str:
+        """Queue a job's students and return the job ID."""
+        raise NotImplementedError
+    
+    def set_job_status(self, job_id: str, status: str) -> None:
+        """Pause, resume ("running") or kill a job; see JOB_STATUSES."""
+        raise NotImplementedError
+    
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status, total and finished row count of a job, or None if unknown."""
+        raise NotImplementedError
+    
+    def lease(self, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Take the next queued row of any running job, or None if there is none."""
+        raise NotImplementedError
+    
+    def renew(self, lease: Dict[str, Any], lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """
+        Extend a lease to lease_seconds from now.
+        
+        Returns False if the lease timed out and the row was leased again
+        since, or it was already acked.
+        """
+        raise NotImplementedError
+    
+    def ack(self, lease: Dict[str, Any], student_name: str, error_msg: Optional[str] = None) -> bool:
+        """
+        Record the outcome of a leased row.
+        
+        Returns False, recording nothing, if the lease timed out and the row
+        was leased again since.
+        """
+        raise NotImplementedError
+    
+    def results(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        """Results of a job with an ID above after, in the order they were acked."""
+        raise NotImplementedError
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    JobQueue in a SQLite database file.
+    
+    Every call opens its own connection, so one queue object can be used
+    from threads, and many processes can share the file. Leasing runs in
+    an IMMEDIATE transaction, so two workers never get the same row.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    created REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS rows (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    student TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    token TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (job_id, position)
+                );
+                CREATE INDEX IF NOT EXISTS rows_by_state ON rows (state, lease_expires);
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    row INTEGER NOT NULL,
+                    student TEXT NOT NULL,
+                    error TEXT,
+                    timestamp TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS results_by_job ON results (job_id, id);
+            """)
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection in autocommit mode, closed after the with block."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Connection in an IMMEDIATE transaction, committed unless the block raises."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    def create_job(self, url: str, students: List[Dict]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, url, status, total, created) VALUES (?, ?, 'running', ?, ?)",
+                (job_id, url, len(students), time.time())
+            )
+            conn.executemany(
+                "INSERT INTO rows (job_id, position, student) VALUES (?, ?, ?)",
+                ((job_id, position, json.dumps(student)) for position, student in enumerate(students))
+            )
+        return job_id
+    
+    def set_job_status(self, job_id: str, status: str) -> None:
+        if status not in JOB_STATUSES:
+            raise ValueError(f"Unknown job status: {status}")
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (status, job_id))
+    
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            job = conn.execute("SELECT status, total FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            finished = conn.execute("SELECT COUNT(*) FROM results WHERE job_id = ?", (job_id,)).fetchone()[0]
+        return {"status": job["status"], "total": job["total"], "finished": finished}
+    
+    def lease(self, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction() as conn:
+            self._fail_exhausted(conn, now)
+            row = conn.execute("""
+                SELECT rows.job_id, rows.position, rows.student, jobs.url FROM rows
+                JOIN jobs ON jobs.id = rows.job_id
+                WHERE jobs.status = 'running'
+                  AND (rows.state = 'queued' OR (rows.state = 'leased' AND rows.lease_expires < ?))
+                ORDER BY jobs.created, rows.position
+                LIMIT 1
+            """, (now,)).fetchone()
+            if row is None:
+                return None
+            
+            token = uuid.uuid4().hex
+            conn.execute("""
+                UPDATE rows SET state = 'leased', token = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE job_id = ? AND position = ?
+            """, (token, now + lease_seconds, row["job_id"], row["position"]))
+        
+        return {
+            "job_id": row["job_id"],
+            "position": row["position"],
+            "token": token,
+            "url": row["url"],
+            "student": json.loads(row["student"])
+        }
+    
+    def _fail_exhausted(self, conn: sqlite3.Connection, now: float) -> None:
+        """Fail rows whose lease timed out MAX_LEASE_ATTEMPTS times."""
+        exhausted = conn.execute("""
+            SELECT job_id, position, student FROM rows
+            WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?
+        """, (now, MAX_LEASE_ATTEMPTS)).fetchall()
+        for row in exhausted:
+            student = json.loads(row["student"])
+            data = student.get("data", {})
+            name = f"{data.get('First Name', '')} {data.get('Last Name', '')}".strip()
+            self._finish(conn, row["job_id"], row["position"], student, name,
+                         f"Worker lease timed out {MAX_LEASE_ATTEMPTS} times")
+    
+    def _finish(self, conn: sqlite3.Connection, job_id: str, position: int, student: Dict,
+                student_name: str, error_msg: Optional[str]) -> None:
+        """Mark a row done and add its result."""
+        conn.execute("UPDATE rows SET state = 'done', token = NULL WHERE job_id = ? AND position = ?",
+                     (job_id, position))
+        conn.execute(
+            "INSERT INTO results (job_id, position, row, student, error, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, position, student.get("row_number", position + 1), student_name, error_msg,
+             datetime.now().isoformat())
+        )
+    
+    def renew(self, lease: Dict[str, Any], lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        with self._connect() as conn:
+            renewed = conn.execute(
+                "UPDATE rows SET lease_expires = ? WHERE job_id = ? AND position = ? AND state = 'leased' AND token = ?",
+                (time.time() + lease_seconds, lease["job_id"], lease["position"], lease["token"])
+            ).rowcount
+        return renewed == 1
+    
+    def ack(self, lease: Dict[str, Any], student_name: str, error_msg: Optional[str] = None) -> bool:
+        with self._transaction() as conn:
+            held = conn.execute(
+                "SELECT 1 FROM rows WHERE job_id = ? AND position = ? AND state = 'leased' AND token = ?",
+                (lease["job_id"], lease["position"], lease["token"])
+            ).fetchone()
+            if held:
+                self._finish(conn, lease["job_id"], lease["position"], lease["student"], student_name, error_msg)
+        return held is not None
+    
+    def results(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, position, row, student, error, timestamp FROM results WHERE job_id = ? AND id > ? ORDER BY id",
+                (job_id, after)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+# URL scheme -> backend class; each takes the rest of the URL
+QUEUE_BACKENDS = {
+    "sqlite": SQLiteJobQueue,
+}
+
+
+def open_queue(url: str) -> JobQueue:
+    """
+    Open a queue backend from a URL such as "sqlite:///var/lib/jobs.db".
+    
+    The part after "://" goes to the backend; for SQLite it is the file path.
+    
+    Raises:
+        ValueError: If the scheme has no backend
+    """
+    scheme, _, location = url.partition("://")
+    if scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown queue backend: {scheme} (expected one of {', '.join(QUEUE_BACKENDS)})")
+    return QUEUE_BACKENDS[scheme](location)
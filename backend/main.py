@@ -1,14 +1,23 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict
-import base64
-from cleaner import SpreadsheetCleaner
+from typing import List, Dict, Iterator, Optional
+import asyncio
+import json
+import os
+from cleaner import CLEANING_MODES, SpreadsheetCleaner
+from export import EXPORT_FORMATS
+from ingest import CSV_EXTENSIONS, Record
+from result_store import result_store
+from result_cache import cleaning_cache
 from submission_manager import submission_manager
 
 app = FastAPI(title="Form Pipeline API")
 
+# Most files accepted by one /clean/batch call
+MAX_BATCH_FILES = 100
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +35,12 @@ class StudentData(BaseModel):
 class SubmitRequest(BaseModel):
     url: str
     students: List[StudentData]
+    concurrency: Optional[int] = None
+    processes: Optional[int] = None
+    distributed: bool = False
+    readiness: Optional[str] = None
+    blocking: Optional[str] = None
+    lookahead: Optional[int] = None
 
 @app.get("/")
 async def root():
@@ -36,18 +51,59 @@ async def health():
     return {"status": "healthy"}
 
 @app.post("/clean")
-async def clean_spreadsheet(file: UploadFile = File(...)):
+async def clean_spreadsheet(file: UploadFile = File(...), output_format: str = Form("xlsx"),
+                            stream: bool = Form(False),
+                            previous_result_id: Optional[str] = Form(None),
+                            fuzzy_dedup: bool = Form(False),
+                            instrument: bool = Form(False),
+                            mode: str = Form("scalar")):
     """
     Clean and validate uploaded spreadsheet.
     
     Validates headers, cleans data, detects duplicates.
-    Returns processed results and cleaned file.
+    Stores the row results and the cleaned file (xlsx, csv or parquet)
+    and returns the result ID with the summary. Fetch rows from
+    GET /results/{result_id} and the file from GET /results/{result_id}/file.
+    
+    With stream=true the response is NDJSON instead: one
+    {"type": "row", ...} line per row as soon as it is cleaned, then a
+    {"type": "summary", ...} line with the same fields as the JSON response
+    (or a {"type": "error", ...} line if cleaning fails midway).
+    
+    With previous_result_id set to an earlier (non-streamed) /clean result,
+    only rows that are new or changed since that upload are re-validated,
+    including rows of its downloaded cleaned file. An expired ID just
+    means a full clean.
+    
+    With fuzzy_dedup=true, rows that look like an earlier row (similar
+    names, Gmail address variants) are also flagged with
+    "possible_duplicate_of" and "duplicate_score", but not skipped.
+    
+    With instrument=true the response (or summary line) also has "stats":
+    time and calls per stage and validator, and fixed/skipped counts per
+    column (see instrumentation.py).
+    
+    mode picks the cleaning engine (see cleaner.CLEANING_MODES). The
+    default "scalar" engine is the fastest on typical rosters; "dictionary"
+    pays off when columns repeat a few values many times.
     """
     # Validate file type
-    if not file.filename.endswith(('.xlsx', '.xls')):
+    if not file.filename.lower().endswith(('.xlsx', '.xls') + CSV_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Please upload an Excel file (.xlsx or .xls) or a CSV/TSV file (.csv, .tsv or .txt)"
+        )
+    
+    if output_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid output format. Expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    
+    if mode not in CLEANING_MODES:
         raise HTTPException(
             status_code=400,
-            detail="Invalid file type. Please upload an Excel file (.xlsx or .xls)"
+            detail=f"Invalid cleaning mode. Expected one of: {', '.join(CLEANING_MODES)}"
         )
     
     # Read file content
@@ -59,9 +115,48 @@ async def clean_spreadsheet(file: UploadFile = File(...)):
             detail=f"Error reading file: {str(e)}"
         )
     
+    _, extension, content_type = EXPORT_FORMATS[output_format]
+    filename = f"cleaned_{os.path.splitext(file.filename)[0]}.{extension}".replace('"', '')
+    loop = asyncio.get_running_loop()
+    
+    if stream:
+        # In this process, one row (or a small first chunk, for the chunked
+        # engines) at a time, so the first rows go out right away
+        cleaner = SpreadsheetCleaner(mode=mode, output_format=output_format,
+                                     fuzzy_dedup=fuzzy_dedup, instrument=instrument)
+        records, error_msg = await loop.run_in_executor(None, cleaner.open_records, content, file.filename)
+        if error_msg is not None:
+            raise HTTPException(
+                status_code=400,
+                detail=error_msg
+            )
+        
+        return StreamingResponse(
+            _stream_clean_lines(cleaner, records, filename, content_type),
+            media_type="application/x-ndjson"
+        )
+    
+    # Reuse field results of the previous upload, if it's still stored
+    field_cache = None
+    if previous_result_id:
+        previous = result_store.get(previous_result_id)
+        field_cache = previous.get("field_cache") if previous else None
+    
     # Process spreadsheet
-    cleaner = SpreadsheetCleaner()
-    result = cleaner.process_spreadsheet(content, file.filename)
+    cleaner = SpreadsheetCleaner(
+        mode=mode,
+        streaming=True,
+        output_format=output_format,
+        cache=cleaning_cache,
+        workers=os.cpu_count() or 1,
+        field_cache=field_cache,
+        columnar=True,  # Only from cleaner.COLUMNAR_MIN_ROWS rows on
+        fuzzy_dedup=fuzzy_dedup,
+        instrument=instrument
+    )
+    
+    # Clean off the event loop so /status polling stays responsive
+    result = await loop.run_in_executor(None, cleaner.process_spreadsheet, content, file.filename)
     
     if not result["success"]:
         raise HTTPException(
@@ -69,23 +164,263 @@ async def clean_spreadsheet(file: UploadFile = File(...)):
             detail=result["error"]
         )
     
-    # Encode cleaned file as base64 for JSON response
-    cleaned_file_b64 = base64.b64encode(result["cleaned_file"]).decode('utf-8')
+    # Keep results server-side; the client downloads the file separately
+    try:
+        result_id = result_store.put({
+            "results": result["results"],
+            "summary": result["summary"],
+            "cleaned_file": result["cleaned_file"],
+            "field_cache": result.get("field_cache"),
+            "filename": filename,
+            "content_type": content_type
+        })
+    except ValueError as e:
+        raise HTTPException(
+            status_code=413,
+            detail=str(e)
+        )
     
-    return {
+    response = {
         "success": True,
-        "results": result["results"],
+        "result_id": result_id,
         "summary": result["summary"],
-        "cleaned_file": cleaned_file_b64,
-        "filename": f"cleaned_{file.filename}"
+        "filename": filename,
+        "content_type": content_type
     }
+    if field_cache is not None:
+        response["incremental"] = {
+            "reused_rows": cleaner.reused_rows,
+            "recleaned_rows": cleaner.recleaned_rows
+        }
+    if "stats" in result:
+        response["stats"] = result["stats"]
+    
+    return response
+
+@app.post("/clean/batch")
+async def clean_batch(files: List[UploadFile] = File(...), output_format: str = Form("xlsx"),
+                      fuzzy_dedup: bool = Form(False), instrument: bool = Form(False),
+                      mode: str = Form("scalar")):
+    """
+    Clean and validate several spreadsheets as one roster.
+    
+    Files are cleaned concurrently and checked for duplicates against each
+    other as well as themselves. Returns per-file summaries and stores the
+    merged row results and one merged cleaned file under a single result ID,
+    fetched like a /clean result. fuzzy_dedup, instrument and mode work as
+    for /clean.
+    """
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Upload at most {MAX_BATCH_FILES} files per batch"
+        )
+    
+    for file in files:
+        if not file.filename.lower().endswith(('.xlsx', '.xls') + CSV_EXTENSIONS):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file type for {file.filename}. Please upload Excel files (.xlsx or .xls) or CSV/TSV files (.csv, .tsv or .txt)"
+            )
+    
+    if output_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid output format. Expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    
+    if mode not in CLEANING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid cleaning mode. Expected one of: {', '.join(CLEANING_MODES)}"
+        )
+    
+    # Read file contents
+    try:
+        uploads = [(file.filename, await file.read()) for file in files]
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Error reading file: {str(e)}"
+        )
+    
+    cleaner = SpreadsheetCleaner(
+        mode=mode,
+        output_format=output_format,
+        workers=os.cpu_count() or 1,
+        fuzzy_dedup=fuzzy_dedup,
+        instrument=instrument
+    )
+    
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, cleaner.process_batch, uploads)
+    
+    if not result["success"]:
+        raise HTTPException(
+            status_code=400,
+            detail=result["error"]
+        )
+    
+    _, extension, content_type = EXPORT_FORMATS[output_format]
+    filename = f"cleaned_batch.{extension}"
+    
+    try:
+        result_id = result_store.put({
+            "results": result["results"],
+            "summary": result["summary"],
+            "cleaned_file": result["cleaned_file"],
+            "filename": filename,
+            "content_type": content_type
+        })
+    except ValueError as e:
+        raise HTTPException(
+            status_code=413,
+            detail=str(e)
+        )
+    
+    response = {
+        "success": True,
+        "result_id": result_id,
+        "files": result["files"],
+        "summary": result["summary"],
+        "filename": filename,
+        "content_type": content_type
+    }
+    if "stats" in result:
+        response["stats"] = result["stats"]
+    
+    return response
+
+def _stream_clean_lines(cleaner: SpreadsheetCleaner, records: Iterator[Record],
+                        filename: str, content_type: str) -> Iterator[str]:
+    """
+    Yield NDJSON lines for a streaming /clean response.
+    
+    A plain generator, so Starlette iterates it in its thread pool and
+    cleaning stays off the event loop.
+    """
+    try:
+        for cleaned_row in cleaner.stream_results(records):
+            yield json.dumps({"type": "row", **cleaned_row}) + "\n"
+        
+        result_id = result_store.put({
+            "results": cleaner.results,
+            "summary": cleaner.summary,
+            "cleaned_file": cleaner.cleaned_file,
+            "filename": filename,
+            "content_type": content_type
+        })
+    except Exception as e:
+        # Headers are already sent, so the error goes in the stream
+        yield json.dumps({"type": "error", "success": False, "error": f"Error processing spreadsheet: {str(e)}"}) + "\n"
+        return
+    
+    summary_line = {
+        "type": "summary",
+        "success": True,
+        "result_id": result_id,
+        "summary": cleaner.summary,
+        "filename": filename,
+        "content_type": content_type
+    }
+    if cleaner.stats is not None:
+        summary_line["stats"] = cleaner.stats.as_dict()
+    
+    yield json.dumps(summary_line) + "\n"
+
+@app.get("/results/{result_id}")
+async def get_result(result_id: str, offset: int = 0, limit: Optional[int] = None):
+    """
+    Get the row results of a previous /clean call.
+    
+    Use offset and limit to page through large results; by default all
+    rows are returned. Returns 404 once the result has expired.
+    """
+    stored = result_store.get(result_id)
+    if stored is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Result not found or expired. Please clean the spreadsheet again."
+        )
+    
+    if offset < 0 or (limit is not None and limit < 0):
+        raise HTTPException(
+            status_code=400,
+            detail="offset and limit must not be negative"
+        )
+    
+    # Slicing also turns columnar results into row dictionaries
+    end = None if limit is None else offset + limit
+    
+    return {
+        "success": True,
+        "result_id": result_id,
+        "results": stored["results"][offset:end],
+        "summary": stored["summary"],
+        "filename": stored["filename"]
+    }
+
+@app.get("/results/{result_id}/file")
+async def download_result_file(result_id: str):
+    """
+    Download the cleaned file of a previous /clean call as raw bytes.
+    
+    Returns 404 once the result has expired.
+    """
+    stored = result_store.get(result_id)
+    if stored is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Result not found or expired. Please clean the spreadsheet again."
+        )
+    
+    content = stored["cleaned_file"]
+    chunk_size = 64 * 1024
+    
+    return StreamingResponse(
+        (content[i:i + chunk_size] for i in range(0, len(content), chunk_size)),
+        media_type=stored["content_type"],
+        headers={
+            "Content-Disposition": f'attachment; filename="{stored["filename"]}"',
+            "Content-Length": str(len(content))
+        }
+    )
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get hit/miss counters and size of the cleaning result cache.
+    """
+    return cleaning_cache.stats()
 
 @app.post("/submit")
 async def submit_forms(request: SubmitRequest):
     """
     Start batch form submission.
     
-    Processes students one by one, filling and submitting forms.
+    Fills and submits forms for several students at a time, on
+    `concurrency` pages (default SUBMISSION_CONCURRENCY) of one browser,
+    or of each of `processes` browser processes (default
+    SUBMISSION_PROCESSES) to use more than one CPU.
+    
+    With distributed=true the students go on the SUBMISSION_QUEUE_URL
+    queue for submission_worker.py processes on any number of nodes;
+    /status, /pause, /resume and /kill work the same.
+    
+    readiness picks when a form counts as loaded: "selectors" (default
+    FORM_READINESS) once its inputs are attached and enabled, or
+    "networkidle". /status reports the time forms took to be ready and,
+    for "selectors", the time waiting for networkidle would have added.
+    
+    blocking picks a request blocking profile: "off" (default
+    FORM_BLOCKING) blocks nothing, "safe" aborts images, media, fonts and
+    known trackers. Blocking turns off the browser's HTTP cache, so "safe"
+    only pays off when a form's media outweigh its scripts and styles.
+    /status reports blocked requests and estimated bytes saved.
+    
+    lookahead is how many forms each page loads ahead for the next
+    students while it fills one (default FORM_LOOKAHEAD, 0 to turn it
+    off). /status reports how long students actually waited for a form.
     Returns job status with total count.
     """
     try:
@@ -100,7 +435,13 @@ async def submit_forms(request: SubmitRequest):
         
         result = await submission_manager.start_submission(
             url=request.url,
-            students=students_data
+            students=students_data,
+            concurrency=request.concurrency,
+            processes=request.processes,
+            distributed=request.distributed,
+            readiness=request.readiness,
+            blocking=request.blocking,
+            lookahead=request.lookahead
         )
         
         return result
@@ -0,0 +1,133 @@
+"""
+Request blocking for form pages.
+
+Filling the form needs its HTML, scripts, styles and the form's own API
+calls, not the page's images, fonts, video or analytics. RequestBlocker is
+routed on a FormAutomation browser context and aborts requests by resource
+type and domain before they are sent, so they cost neither load time nor
+bandwidth.
+
+Playwright turns off the HTTP cache of a routed context, so the "off"
+profile doesn't route at all. With "safe", every page downloads the form's
+scripts and styles again instead of reusing them from the cache, which can
+cost more than the images and fonts it skips. It is opt-in for forms
+whose media outweigh their scripts and styles; "off" is the default.
+"""
+import os
+from typing import Any, Dict, Iterable
+from urllib.parse import urlsplit
+
+# Analytics, tag manager, ad and session-recording hosts (and subdomains).
+# Personalization services (e.g. Adobe Target) are left out: their snippets
+# can hide the page until they answer.
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "analytics.tiktok.com",
+    "ads.linkedin.com",
+    "snap.licdn.com",
+)
+
+# Resource types and domains each profile blocks
+BLOCKING_PROFILES = {
+    "off": {"types": (), "domains": ()},
+    # Nothing the form is built from: no scripts, styles or XHR of the site itself
+    "safe": {"types": ("image", "media", "font"), "domains": TRACKER_DOMAINS},
+}
+DEFAULT_BLOCKING = os.getenv("FORM_BLOCKING", "off")
+
+# Domains never blocked, whatever the profile (comma-separated), for
+# third-party hosts a form turns out to need
+ALLOWED_DOMAINS = tuple(domain.strip() for domain in os.getenv("FORM_ALLOW_DOMAINS", "").split(",") if domain.strip())
+
+# Rough transfer size of a request of each type, for estimating bytes saved
+# (blocked responses are never downloaded, so their size is unknown)
+ESTIMATED_BYTES = {
+    "image": 20_000,
+    "media": 500_000,
+    "font": 30_000,
+    "script": 25_000,
+    "stylesheet": 15_000,
+}
+DEFAULT_ESTIMATED_BYTES = 2_000
+
+
+def new_blocking_stats() -> Dict[str, Any]:
+    """Counters of routed requests, blocked requests per type and estimated bytes saved."""
+    return {"requests": 0, "blocked": 0, "estimated_bytes_saved": 0, "blocked_by_type": {}}
+
+
+def domain_matches(host: str, domains: Iterable[str]) -> bool:
+    """Whether host is one of domains or a subdomain of one."""
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class RequestBlocker:
+    """
+    Allow/deny policy for the requests of a browser context.
+    
+    A request is blocked if its domain is denied or its resource type is,
+    unless its domain is allowed. Counters in stats add up over every
+    context the blocker is attached to.
+    """
+    
+    def __init__(self, blocked_types: Iterable[str] = (), blocked_domains: Iterable[str] = (),
+                 allowed_domains: Iterable[str] = ALLOWED_DOMAINS):
+        """
+        Args:
+            blocked_types: Playwright resource types to block ("image", "font", ...)
+            blocked_domains: Domains to block requests to, subdomains included
+            allowed_domains: Domains never blocked, subdomains included
+        """
+        self.blocked_types = frozenset(blocked_types)
+        self.blocked_domains = tuple(blocked_domains)
+        self.allowed_domains = tuple(allowed_domains)
+        self.stats = new_blocking_stats()
+    
+    @classmethod
+    def from_profile(cls, profile: str) -> "RequestBlocker":
+        """
+        Blocker for one of BLOCKING_PROFILES.
+        
+        Raises:
+            ValueError: If the profile is unknown
+        """
+        if profile not in BLOCKING_PROFILES:
+            raise ValueError(f"Unknown blocking profile: {profile} (expected one of {', '.join(BLOCKING_PROFILES)})")
+        return cls(BLOCKING_PROFILES[profile]["types"], BLOCKING_PROFILES[profile]["domains"])
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.blocked_types or self.blocked_domains)
+    
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """Whether the policy blocks a request."""
+        host = (urlsplit(url).hostname or "").lower()
+        if domain_matches(host, self.allowed_domains):
+            return False
+        return resource_type in self.blocked_types or domain_matches(host, self.blocked_domains)
+    
+    async def attach(self, context) -> None:
+        """Route every request of a browser context through the policy."""
+        if self.enabled:
+            await context.route("**/*", self._route)
+    
+    async def _route(self, route) -> None:
+        request = route.request
+        self.stats["requests"] += 1
+        if not self.should_block(request.url, request.resource_type):
+            await route.continue_()
+            return
+        
+        self.stats["blocked"] += 1
+        self.stats["estimated_bytes_saved"] += ESTIMATED_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+        by_type = self.stats["blocked_by_type"]
+        by_type[request.resource_type] = by_type.get(request.resource_type, 0) + 1
+        await route.abort("blockedbyclient")
@@ -0,0 +1,105 @@
+"""
+Content-addressed cache of cleaning results.
+
+Coordinators often re-upload the same spreadsheet. Results are cached under
+a hash of the uploaded bytes plus everything else that can change the
+output: the validator version, the current year (future DOBs are corrected
+relative to it) and the cleaner options.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Tuple
+from result_store import estimate_result_size
+from validators import VALIDATOR_VERSION
+
+# Memory budget for cached results
+DEFAULT_CACHE_BYTES = 128 * 1024 * 1024
+
+
+def cache_key(file_content: bytes, *options: Hashable) -> Tuple:
+    """
+    Build the cache key for an upload.
+    
+    Args:
+        file_content: Uploaded file content as bytes
+        options: Cleaner settings that affect the result
+    
+    Returns:
+        Hashable key
+    """
+    digest = hashlib.sha256(file_content).hexdigest()
+    return (digest, VALIDATOR_VERSION, datetime.now().year) + tuple(options)
+
+
+class CleaningCache:
+    """LRU cache of successful cleaning results with a memory budget."""
+    
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result and mark it as recently used.
+        
+        Args:
+            key: Key from cache_key
+        
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: Tuple, result: Dict[str, Any]) -> None:
+        """
+        Cache a result, evicting least recently used entries to fit.
+        
+        Results larger than the whole budget are not cached.
+        
+        Args:
+            key: Key from cache_key
+            result: Result dictionary from process_spreadsheet
+        """
+        size = estimate_result_size(result)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            
+            while self._entries and self._total_bytes + size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+            
+            self._entries[key] = (result, size)
+            self._total_bytes += size
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+# Global instance (singleton pattern for simplicity)
+cleaning_cache = CleaningCache()
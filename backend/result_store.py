@@ -0,0 +1,112 @@
+"""
+Server-side store for cleaning results.
+
+/clean keeps the cleaned file and row results here under a result ID, so the
+file can be downloaded as raw bytes instead of travelling base64-encoded
+inside the JSON response.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# How long a result stays downloadable
+DEFAULT_TTL_SECONDS = 60 * 60
+
+# Total size budget for stored results
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Rough in-memory cost of one processed row dictionary
+ROW_RESULT_BYTES = 600
+
+# Rough in-memory cost of one field cache entry (the row data is shared
+# with the row results)
+FIELD_CACHE_ENTRY_BYTES = 200
+
+
+def estimate_result_size(entry: Dict[str, Any]) -> int:
+    """Approximate memory used by a result's cleaned file, row results and field cache."""
+    results = entry.get("results") or []
+    # Columnar results know their size
+    results_bytes = getattr(results, "nbytes", len(results) * ROW_RESULT_BYTES)
+    return (
+        len(entry.get("cleaned_file") or b"")
+        + results_bytes
+        + len(entry.get("field_cache") or {}) * FIELD_CACHE_ENTRY_BYTES
+    )
+
+
+class ResultStore:
+    """In-memory result store with TTL expiry and a total size cap."""
+    
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+    
+    def put(self, entry: Dict[str, Any]) -> str:
+        """
+        Store a result and return its ID.
+        
+        Oldest results are evicted first when the store would exceed
+        max_bytes. A result larger than max_bytes is rejected.
+        
+        Args:
+            entry: Result dictionary; "cleaned_file" (bytes) and "results"
+                (list) count towards its size
+        
+        Returns:
+            New result ID
+        
+        Raises:
+            ValueError: If the result alone exceeds max_bytes
+        """
+        size = estimate_result_size(entry)
+        if size > self.max_bytes:
+            raise ValueError(f"Result too large to store ({size} bytes, limit {self.max_bytes})")
+        
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            now = time.time()
+            self._evict_expired(now)
+            while self._entries and self._total_bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            
+            self._entries[result_id] = {**entry, "created": now, "size": size}
+            self._total_bytes += size
+        
+        return result_id
+    
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored result.
+        
+        Args:
+            result_id: ID returned by put
+        
+        Returns:
+            Result dictionary, or None if unknown or expired
+        """
+        with self._lock:
+            self._evict_expired(time.time())
+            return self._entries.get(result_id)
+    
+    def _evict_expired(self, now: float) -> None:
+        """Drop results older than the TTL (entries are in insertion order)."""
+        while self._entries:
+            result_id, entry = next(iter(self._entries.items()))
+            if now - entry["created"] < self.ttl_seconds:
+                break
+            self._remove(result_id)
+    
+    def _remove(self, result_id: str) -> None:
+        entry = self._entries.pop(result_id)
+        self._total_bytes -= entry["size"]
+
+
+# Global instance (singleton pattern for simplicity)
+result_store = ResultStore()
@@ -0,0 +1,150 @@
+"""
+Columnar storage for processed rows.
+
+A processed row is normally a dict holding a dict of six strings, which
+costs several hundred bytes of object overhead per row. ColumnarResults
+keeps the same rows as column buffers instead: row numbers and duplicate
+references in integer arrays, statuses as int8 codes, and cleaned values
+and notes as UTF-8 bytes with offsets (the Arrow string layout). Row dicts
+are only built when a row is read.
+"""
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
+import numpy as np
+from rules import STATUSES
+from validators import REQUIRED_HEADERS
+
+# Status name -> int8 code
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Stored in place of a missing "duplicate_of" or "possible_duplicate_of"
+NO_DUPLICATE = -1
+
+
+class StringColumn:
+    """Append-only column of strings stored as one UTF-8 buffer plus offsets."""
+    
+    def __init__(self):
+        self._offsets = array('q', [0])
+        self._buffer = bytearray()
+    
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+    
+    def __getitem__(self, i: int) -> str:
+        return self._buffer[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+    
+    def append(self, value: str) -> None:
+        self._buffer += value.encode('utf-8')
+        self._offsets.append(len(self._buffer))
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+
+class ColumnarResults(Sequence):
+    """
+    Processed rows stored column by column.
+    
+    Reads like a list of processed row dictionaries (indexing, slicing,
+    iteration, len), so the summary, export writers and API can use it in
+    place of one. Each read builds a fresh dict, so changes to a returned
+    row are not stored. "duplicate_of" and "possible_duplicate_of" must be
+    row numbers.
+    """
+    
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        self._row_numbers = array('q')
+        self._statuses = array('b')
+        self._duplicate_of = array('q')
+        self._possible_duplicate_of = array('q')
+        self._duplicate_scores = array('d')
+        self._notes = StringColumn()
+        self._values = {header: StringColumn() for header in REQUIRED_HEADERS}
+        self.extend(rows)
+    
+    def append(self, row: Dict[str, Any]) -> None:
+        """Add a processed row dictionary."""
+        self._row_numbers.append(row["row_number"])
+        self._statuses.append(STATUS_CODES[row["status"]])
+        self._duplicate_of.append(row.get("duplicate_of", NO_DUPLICATE))
+        self._possible_duplicate_of.append(row.get("possible_duplicate_of", NO_DUPLICATE))
+        self._duplicate_scores.append(row.get("duplicate_score", 0.0))
+        self._notes.append(row["note"])
+        data = row["data"]
+        for header, column in self._values.items():
+            column.append(data[header])
+    
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Add processed row dictionaries, e.g. straight from clean_records."""
+        for row in rows:
+            self.append(row)
+    
+    def __len__(self) -> int:
+        return len(self._row_numbers)
+    
+    def __getitem__(self, i: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        return self._row(i)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self._row(i)
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (ColumnarResults, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def _row(self, i: int) -> Dict[str, Any]:
+        """Build the processed row dictionary for position i."""
+        row = {
+            "row_number": self._row_numbers[i],
+            "status": STATUSES[self._statuses[i]],
+            "note": self._notes[i],
+            "data": {header: column[i] for header, column in self._values.items()}
+        }
+        if self._duplicate_of[i] != NO_DUPLICATE:
+            row["duplicate_of"] = self._duplicate_of[i]
+        if self._possible_duplicate_of[i] != NO_DUPLICATE:
+            row["possible_duplicate_of"] = self._possible_duplicate_of[i]
+            row["duplicate_score"] = self._duplicate_scores[i]
+        return row
+    
+    def status_codes(self) -> np.ndarray:
+        """
+        Status of every row as int8 codes into rules.STATUSES.
+        
+        The array is a view of the buffer; don't hold on to it across append.
+        """
+        return np.frombuffer(self._statuses, dtype=np.int8) if len(self) else np.zeros(0, dtype=np.int8)
+    
+    def summary(self) -> Dict[str, int]:
+        """Count rows per status, like SpreadsheetCleaner._calculate_summary."""
+        counts = np.bincount(self.status_codes(), minlength=len(STATUSES))
+        summary = {status: int(counts[code]) for status, code in STATUS_CODES.items()}
+        summary["total"] = len(self)
+        return summary
+    
+    def iter_data(self, statuses: Sequence[str] = STATUSES) -> Iterator[Dict[str, str]]:
+        """Yield the cleaned data of rows with one of the given statuses."""
+        wanted = [STATUS_CODES[status] for status in statuses]
+        for i in np.flatnonzero(np.isin(self.status_codes(), wanted)):
+            yield {header: column[i] for header, column in self._values.items()}
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the column buffers."""
+        arrays = (self._row_numbers, self._statuses, self._duplicate_of,
+                  self._possible_duplicate_of, self._duplicate_scores)
+        return (
+            sum(a.itemsize * len(a) for a in arrays)
+            + self._notes.nbytes
+            + sum(column.nbytes for column in self._values.values())
+        )
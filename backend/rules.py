@@ -0,0 +1,213 @@
+"""
+Declarative validation rules for spreadsheet columns.
+
+Each column lists its cleaning steps once in COLUMN_RULES. At import the
+steps are compiled into one callable per column, and the columns into a
+single clean_fields function that cleans a whole row. Regexes are compiled
+up front, and statuses are merged as integer ranks.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ingest import cell_to_string
+from validators import (
+    clean_date_of_birth,
+    clean_date_of_birth_value,
+    clean_phone_number,
+    clean_zip_code_number,
+    EMAIL_PATTERN,
+    NAME_PATTERN,
+    NON_DIGIT_PATTERN,
+    REQUIRED_HEADERS
+)
+
+# Status ranks: a row takes the most severe status of its fields
+OK, FIXED, SKIPPED = 0, 1, 2
+STATUSES = ("ok", "fixed", "skipped")
+
+# Cleaning steps per column, applied in order to the stripped cell value.
+# A step either passes the value on, or ends the column with a status.
+#   ("required", note)                  - skip empty values
+#   ("lowercase",)                      - lowercase the value
+#   ("match", pattern, note)            - skip values not matching pattern
+#   ("digits", length, exact, label, note)
+#                                       - keep the first `length` digits; skip if
+#                                         there are fewer (or more, when exact)
+#   ("validator", func)                 - delegate to a scalar validator
+COLUMN_RULES = {
+    "Email Address": [
+        ("required", "Email is empty"),
+        ("lowercase",),
+        ("match", EMAIL_PATTERN, "Invalid email format"),
+    ],
+    "First Name": [
+        ("required", "First Name is empty"),
+        ("match", NAME_PATTERN, "First Name contains invalid characters"),
+    ],
+    "Last Name": [
+        ("required", "Last Name is empty"),
+        ("match", NAME_PATTERN, "Last Name contains invalid characters"),
+    ],
+    "Phone": [
+        ("required", "Phone number is empty"),
+        ("digits", 10, True, "Phone formatted", "Phone must be 10 digits, got {count}"),
+    ],
+    "Date of Birth": [
+        ("required", "Date of birth is empty"),
+        ("validator", clean_date_of_birth),
+    ],
+    "Zip Code": [
+        ("required", "ZIP code is empty"),
+        ("digits", 5, False, "ZIP code formatted", "ZIP code must be 5 digits, got {count}"),
+    ],
+}
+
+# Validators for native Excel cells (dates and numbers, see
+# ingest.normalize_cell), tried before a column's steps. They return
+# (value, status, note), or None to validate the cell as text.
+TYPED_CELL_CLEANERS = {
+    "Phone": clean_phone_number,
+    "Date of Birth": clean_date_of_birth_value,
+    "Zip Code": clean_zip_code_number,
+}
+
+# A compiled step takes (value, original) and returns (value, rank, note).
+# Rank None means "continue with the next step".
+Step = Callable[[str, str], Tuple[str, Any, str]]
+ColumnCleaner = Callable[[Any], Tuple[str, int, str]]
+TypedCellCleaner = Callable[[Any], Optional[Tuple[str, str, str]]]
+ColumnHook = Callable[[str, ColumnCleaner], ColumnCleaner]
+
+RANKS = {status: rank for rank, status in enumerate(STATUSES)}
+
+
+def _compile_step(step: tuple) -> Step:
+    """Compile one declared step into a closure."""
+    kind = step[0]
+    
+    if kind == "required":
+        note = step[1]
+        
+        def required(value, original):
+            if not value:
+                return "", SKIPPED, note
+            return value, None, ""
+        return required
+    
+    if kind == "lowercase":
+        def lowercase(value, original):
+            return value.lower(), None, ""
+        return lowercase
+    
+    if kind == "match":
+        match, note = step[1].match, step[2]
+        
+        def matches(value, original):
+            if match(value):
+                return value, None, ""
+            return value, SKIPPED, note
+        return matches
+    
+    if kind == "digits":
+        length, exact, label, note = step[1:]
+        strip_non_digits = NON_DIGIT_PATTERN.sub
+        
+        def digits(value, original):
+            found = strip_non_digits('', value)
+            count = len(found)
+            if count < length or (exact and count != length):
+                return original, SKIPPED, note.format(count=count)
+            found = found[:length]
+            if found == original:
+                return found, OK, ""
+            return found, FIXED, f"{label}: {original} → {found}"
+        return digits
+    
+    if kind == "validator":
+        validator = step[1]
+        
+        def delegate(value, original):
+            value, status, note = validator(value)
+            return value, RANKS[status], note
+        return delegate
+    
+    raise ValueError(f"Unknown rule step '{kind}'")
+
+
+def compile_column(steps: List[tuple], typed: Optional[TypedCellCleaner] = None) -> ColumnCleaner:
+    """
+    Compile a column's declared steps into a single callable.
+    
+    Args:
+        steps: Declared steps for the column
+        typed: Validator for native date and number cells, if the column
+            has one (see TYPED_CELL_CLEANERS)
+    
+    Returns:
+        Function mapping a raw cell value to (cleaned_value, rank, note)
+    """
+    compiled = tuple(_compile_step(step) for step in steps)
+    
+    def clean(raw: Any) -> Tuple[str, int, str]:
+        if raw is not None and type(raw) is not str:
+            if typed is not None:
+                result = typed(raw)
+                if result is not None:
+                    value, status, note = result
+                    return value, RANKS[status], note
+            raw = cell_to_string(raw)
+        
+        original = raw.strip() if raw else ""
+        value = original
+        for step in compiled:
+            value, rank, note = step(value, original)
+            if rank is not None:
+                return value, rank, note
+        return value, OK, ""
+    
+    return clean
+
+
+def compile_rules(rules: Dict[str, List[tuple]],
+                  typed: Optional[Dict[str, TypedCellCleaner]] = None,
+                  column_hook: Optional[ColumnHook] = None) -> Callable[[Dict[str, Any]], Tuple[Dict[str, str], str, List[str]]]:
+    """
+    Compile every column's rules into one row-level function.
+    
+    Args:
+        rules: Declared steps per column header
+        typed: Validators for native date and number cells per column header
+        column_hook: Called with each column's header and compiled cleaner;
+            the cleaner it returns is used instead (e.g. to time it)
+    
+    Returns:
+        Function mapping raw row data to (cleaned_data, status, notes)
+    """
+    typed = typed or {}
+    columns = tuple((header, compile_column(steps, typed.get(header))) for header, steps in rules.items())
+    if column_hook is not None:
+        columns = tuple((header, column_hook(header, clean)) for header, clean in columns)
+    
+    def clean_row_fields(row_data: Dict[str, Any]) -> Tuple[Dict[str, str], str, List[str]]:
+        cleaned_data = {}
+        notes = []
+        row_rank = OK
+        for header, clean in columns:
+            value, rank, note = clean(row_data.get(header, ""))
+            cleaned_data[header] = value
+            if note:
+                notes.append(note)
+            if rank > row_rank:
+                row_rank = rank
+        return cleaned_data, STATUSES[row_rank], notes
+    
+    return clean_row_fields
+
+
+# Steps per column in REQUIRED_HEADERS order, as compiled into clean_fields
+ROW_RULES = {header: COLUMN_RULES[header] for header in REQUIRED_HEADERS}
+
+# Column cleaners and row cleaner, compiled once at import
+COLUMN_CLEANERS = {
+    header: compile_column(COLUMN_RULES[header], TYPED_CELL_CLEANERS.get(header))
+    for header in REQUIRED_HEADERS
+}
+clean_fields = compile_rules(ROW_RULES, TYPED_CELL_CLEANERS)
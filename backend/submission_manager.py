@@ -2,113 +2,253 @@
 Submission Manager - Handles batch form submission with pause/resume/kill controls.
 """
 import asyncio
-from typing import Dict, List, Optional
+import multiprocessing
+import queue
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import time
-from form_automation import FormAutomation
+import os
+from form_automation import (DEFAULT_LOOKAHEAD, DEFAULT_READINESS, MAX_LOOKAHEAD, READINESS_STRATEGIES, FormAutomation,
+                             merge_counters, new_page_stats)
+from request_blocking import BLOCKING_PROFILES, DEFAULT_BLOCKING
+from job_queue import JobQueue, open_queue
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pages filling forms at the same time, unless a job asks for another number
+DEFAULT_CONCURRENCY = int(os.getenv("SUBMISSION_CONCURRENCY", "4"))
+
+# Most pages one job may open in the shared browser
+MAX_CONCURRENCY = 16
+
+# Browser processes per job, unless a job asks for another number; each
+# runs `concurrency` pages
+DEFAULT_PROCESSES = int(os.getenv("SUBMISSION_PROCESSES", "1"))
+
+# Most browser processes one job may start
+MAX_PROCESSES = os.cpu_count() or 1
+
+# Queue that distributed jobs are put on for submission_worker.py processes
+# (see job_queue.open_queue), e.g. "sqlite:///data/jobs.db"
+SUBMISSION_QUEUE_URL = os.getenv("SUBMISSION_QUEUE_URL")
+
+# Pause between two students on the same page, to prevent browser instability
+ROW_DELAY_SECONDS = 0.2
+
+# How often shard processes check for resume, and the API process for dead
+# shards or new results of a distributed job
+SHARD_POLL_SECONDS = 0.5
+
+# Time shard processes get to close their browser after kill
+SHARD_EXIT_SECONDS = 10.0
+
+# Students queued for shard processes ahead of the rows they're on, per page
+SHARD_FEED_PER_PAGE = 2
+
+# Stands in for "no student taken yet", since None is the end marker
+_NOTHING_TAKEN = object()
+
 
 class SubmissionManager:
-    """Manages batch form submission state and execution."""
+    """
+    Manages batch form submission state and execution.
+    
+    Students are submitted by a pool of pages, each a FormAutomation with
+    its own browser context, all in one browser. Every page takes the next
+    student from the shared position until the job is done, so rows finish
+    (and are logged) in roughly, not exactly, row order.
+    
+    One browser runs on one or two cores, so with processes > 1 the pages
+    are split over that many shard processes instead, each with its own
+    browser (see ShardWorker). They take students from one queue and send
+    every result back here, where the counters and log are kept.
+    
+    A distributed job is put on the SUBMISSION_QUEUE_URL queue instead and
+    submitted by submission_worker.py processes on any node; this manager
+    then only follows its results and passes on pause, resume and kill.
+    """
     
     def __init__(self):
         """Initialize submission manager with idle state."""
         self.state = {
             'status': 'idle',  # idle/running/paused/completed/killed
-            'current_position': 0,
+            'current_position': 0,  # Rows finished
+            'in_flight': 0,  # Rows on a page
             'total': 0,
             'completed': 0,
             'failed': 0,
             'start_time': None,
             'elapsed_seconds': 0,
             'log': [],
-            'errors': []
+            'errors': [],
+            'page_stats': new_page_stats()  # Of closed pages; see get_status
         }
         self.url: Optional[str] = None
         self.students: List[Dict] = []
-        self.automation: Optional[FormAutomation] = None
+        self.concurrency = DEFAULT_CONCURRENCY
+        self.processes = DEFAULT_PROCESSES
+        self.readiness = DEFAULT_READINESS
+        self.blocking = DEFAULT_BLOCKING
+        self.lookahead = DEFAULT_LOOKAHEAD
+        self.distributed = False
+        self.job_queue: Optional[JobQueue] = None
+        self.job_id: Optional[str] = None  # Queue job of a distributed submission
+        self._last_result = 0  # Last queue result recorded
+        self._next_position = 0  # Next student a page takes
+        self.automation: Optional[FormAutomation] = None  # Page that owns the browser
+        self.automations: List[FormAutomation] = []  # All pages, automation first
         self.task: Optional[asyncio.Task] = None
         self._should_stop = False
-        self._should_pause = False
+        self._unpaused = asyncio.Event()  # Cleared while paused
+        self._restart_lock = asyncio.Lock()
+        self._shard_control: Optional[Tuple] = None  # (unpaused, stop) events shared with shards
     
     def get_status(self) -> Dict:
         """
         Get current submission status.
         
         Returns:
-            Dictionary with current state including progress, logs, and errors
+            Dictionary with current state including progress
+            (current_position: rows finished, in_flight: rows on a page of
+            this process or its shards), logs, and errors, "readiness": how
+            long forms took to load with the job's readiness strategy and
+            lookahead, and how long students waited for them (see
+            form_automation.new_readiness_stats),
+            and "blocking": requests blocked by the job's blocking profile
+            (see request_blocking.new_blocking_stats)
         """
         # Calculate elapsed time if running
         if self.state['status'] == 'running' and self.state['start_time']:
             self.state['elapsed_seconds'] = int(time.time() - self.state['start_time'])
         
+        page_stats = new_page_stats()
+        merge_counters(page_stats, self.state['page_stats'])
+        for automation in self.automations:
+            merge_counters(page_stats, automation.page_stats)
+        
         return {
             'completed': self.state['completed'],
             'total': self.state['total'],
             'elapsed_seconds': self.state['elapsed_seconds'],
             'status': self.state['status'],
             'current_position': self.state['current_position'],
+            'in_flight': self.state['in_flight'],
             'failed': self.state['failed'],
             'log': self.state['log'],
-            'errors': self.state['errors']
+            'errors': self.state['errors'],
+            'readiness': {'strategy': self.readiness, 'lookahead': self.lookahead, **page_stats['readiness']},
+            'blocking': {'profile': self.blocking, **page_stats['blocking']}
         }
     
-    async def start_submission(self, url: str, students: List[Dict]) -> Dict:
+    async def start_submission(self, url: str, students: List[Dict], concurrency: Optional[int] = None,
+                               processes: Optional[int] = None, distributed: bool = False,
+                               readiness: Optional[str] = None, blocking: Optional[str] = None,
+                               lookahead: Optional[int] = None) -> Dict:
         """
         Start batch form submission.
         
         Args:
             url: Target form URL
             students: List of student data dictionaries with row_number and data
+            concurrency: Pages submitting at the same time (default
+                DEFAULT_CONCURRENCY, at most MAX_CONCURRENCY), per process
+            processes: Browser processes (default DEFAULT_PROCESSES, at
+                most MAX_PROCESSES, the number of CPUs)
+            distributed: Put the students on the SUBMISSION_QUEUE_URL queue
+                for worker processes instead (concurrency and processes
+                are then set per worker)
+            readiness: When a form counts as loaded, one of
+                READINESS_STRATEGIES (default DEFAULT_READINESS)
+            blocking: Requests the pages block, one of BLOCKING_PROFILES
+                (default DEFAULT_BLOCKING)
+            lookahead: Forms each page loads ahead for the next students
+                (default DEFAULT_LOOKAHEAD, at most MAX_LOOKAHEAD)
         
         Returns:
             Dictionary with job status
         """
-        if self.state['status'] == 'running':
-            raise Exception("Submission already running")
+        if self.state['status'] in ['running', 'paused']:
+            raise Exception(f"Submission already {self.state['status']}")
+        
+        concurrency = DEFAULT_CONCURRENCY if concurrency is None else concurrency
+        if not 1 <= concurrency <= MAX_CONCURRENCY:
+            raise ValueError(f"concurrency must be between 1 and {MAX_CONCURRENCY}, got {concurrency}")
+        processes = DEFAULT_PROCESSES if processes is None else processes
+        if not 1 <= processes <= MAX_PROCESSES:
+            raise ValueError(f"processes must be between 1 and {MAX_PROCESSES}, got {processes}")
+        if distributed and not SUBMISSION_QUEUE_URL:
+            raise ValueError("Distributed submission needs SUBMISSION_QUEUE_URL to be set")
+        readiness = DEFAULT_READINESS if readiness is None else readiness
+        if readiness not in READINESS_STRATEGIES:
+            raise ValueError(f"readiness must be one of {', '.join(READINESS_STRATEGIES)}, got {readiness}")
+        blocking = DEFAULT_BLOCKING if blocking is None else blocking
+        if blocking not in BLOCKING_PROFILES:
+            raise ValueError(f"blocking must be one of {', '.join(BLOCKING_PROFILES)}, got {blocking}")
+        lookahead = DEFAULT_LOOKAHEAD if lookahead is None else lookahead
+        if not 0 <= lookahead <= MAX_LOOKAHEAD:
+            raise ValueError(f"lookahead must be between 0 and {MAX_LOOKAHEAD}, got {lookahead}")
+        
+        # Let the pages of a killed job finish closing before reusing state
+        if self.task and not self.task.done():
+            await self.task
         
         # Initialize state
         self.url = url
         self.students = students
+        self.processes = min(processes, max(len(students), 1))
+        self.concurrency = min(concurrency, max(-(-len(students) // self.processes), 1))
+        self.distributed = distributed
+        self.readiness = readiness
+        self.blocking = blocking
+        self.lookahead = lookahead
+        self.job_id = None
+        self._last_result = 0
+        self._next_position = 0
         self.state = {
             'status': 'running',
             'current_position': 0,
+            'in_flight': 0,
             'total': len(students),
             'completed': 0,
             'failed': 0,
             'start_time': time.time(),
             'elapsed_seconds': 0,
             'log': [],
-            'errors': []
+            'errors': [],
+            'page_stats': new_page_stats()
         }
         self._should_stop = False
-        self._should_pause = False
+        self._unpaused.set()
         
         # Start processing in background
         self.task = asyncio.create_task(self._process_submissions())
         
-        logger.info(f"Started submission: {len(students)} students")
+        logger.info(f"Started submission: {len(students)} students on {self.processes} x {self.concurrency} pages")
         
         return {
             'status': 'started',
-            'total': len(students)
+            'total': len(students),
+            'concurrency': self.concurrency,
+            'processes': self.processes,
+            'distributed': self.distributed
         }
     
     async def pause(self) -> Dict:
         """
         Pause submission at current position.
         
+        Pages finish the student they are on, then wait for resume.
+        
         Returns:
             Dictionary with paused status and position
         """
         if self.state['status'] != 'running':
             raise Exception(f"Cannot pause when status is {self.state['status']}")
         
-        self._should_pause = True
+        self._unpaused.clear()
+        await self._signal_workers()
         self.state['status'] = 'paused'
         
         logger.info(f"Pausing submission at position {self.state['current_position']}")
@@ -129,10 +269,12 @@ class SubmissionManager:
             raise Exception(f"Cannot resume when status is {self.state['status']}")
         
         self.state['status'] = 'running'
-        self._should_pause = False
+        self._unpaused.set()
+        await self._signal_workers()
         
-        # Resume processing
-        self.task = asyncio.create_task(self._process_submissions())
+        # Paused pages pick up where they stopped; restart them if they're gone
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self._process_submissions())
         
         logger.info(f"Resuming submission from position {self.state['current_position']}")
         
@@ -152,14 +294,11 @@ class SubmissionManager:
         
         self._should_stop = True
         self.state['status'] = 'killed'
+        self._unpaused.set()  # Wake paused pages so they can exit
+        await self._signal_workers()
         
         # Close automation if running
-        if self.automation:
-            try:
-                await self.automation.stop()
-            except:
-                pass
-            self.automation = None
+        await self._stop_pages()
         
         logger.info(f"Killed submission at position {final_position}")
         
@@ -170,111 +309,29 @@ class SubmissionManager:
     
     async def _process_submissions(self):
         """
-        Internal method to process submissions one by one.
+        Internal method to process submissions on the page pool.
         Handles pause/resume/kill logic.
         """
         try:
-            # Initialize Playwright automation if not already started
-            if not self.automation:
-                self.automation = FormAutomation()
-                await self.automation.start()
-            
-            # Process each student from current position
-            while self.state['current_position'] < self.state['total']:
-                # Check for pause or kill
-                if self._should_pause:
-                    logger.info("Pausing execution...")
-                    return
-                
-                if self._should_stop:
-                    logger.info("Stopping execution...")
-                    return
-                
-                # Get current student
-                student = self.students[self.state['current_position']]
-                row_number = student.get('row_number', self.state['current_position'] + 1)
-                student_data = student['data']
-                
-                # Get student name for logging
-                student_name = f"{student_data.get('First Name', '')} {student_data.get('Last Name', '')}".strip()
+            if self.distributed:
+                await self._process_queue()
+            elif self.processes > 1:
+                await self._process_shards()
+            else:
+                # Initialize Playwright automation if not already started
+                if not self.automations:
+                    await self._start_pages()
                 
-                logger.info(f"Processing Row {row_number}: {student_name}")
-                
-                try:
-                    # Fill and submit the form
-                    # NOTE: Change submit=True when ready for production
-                    
-                    result = await self.automation.fill_form(
-                        url=self.url,
-                        student_data=student_data,
-                        submit=False  # Set to True for production (currently testing mode)
-                    )
-                    
-                    if result['success']:
-                        # Success
-                        self.state['completed'] += 1
-                        log_entry = {
-                            'row': row_number,
-                            'status': 'success',
-                            'student': student_name,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        self.state['log'].append(log_entry)
-                        logger.info(f"✓ Row {row_number}: Success - {student_name}")
-                    else:
-                        # Failed
-                        self.state['failed'] += 1
-                        error_msg = result.get('message', 'Unknown error')
-                        log_entry = {
-                            'row': row_number,
-                            'status': 'failed',
-                            'student': student_name,
-                            'error': error_msg,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        self.state['log'].append(log_entry)
-                        self.state['errors'].append(f"Row {row_number}: {error_msg}")
-                        logger.error(f"✗ Row {row_number}: Failed - {student_name} - {error_msg}")
-                
-                except Exception as e:
-                    # Exception during submission
-                    error_msg = str(e)
-                    logger.error(f"✗ Row {row_number}: Exception - {student_name} - {error_msg}")
-                    
-                    # If browser-related error, try to restart browser
-                    if "browser" in error_msg.lower() or "closed" in error_msg.lower() or "disconnected" in error_msg.lower():
-                        logger.warning("Browser error detected, attempting restart...")
-                        try:
-                            await asyncio.wait_for(self.automation.stop(), timeout=3.0)
-                        except:
-                            pass
-                        try:
-                            await self.automation.start()
-                            logger.info("Browser restarted successfully")
-                        except Exception as restart_error:
-                            logger.error(f"Failed to restart browser: {restart_error}")
-                    
-                    self.state['failed'] += 1
-                    log_entry = {
-                        'row': row_number,
-                        'status': 'failed',
-                        'student': student_name,
-                        'error': error_msg,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    self.state['log'].append(log_entry)
-                    self.state['errors'].append(f"Row {row_number}: {error_msg}")
-                
-                # Move to next student
-                self.state['current_position'] += 1
-                
-                # Small delay to prevent browser instability
-                await asyncio.sleep(0.2)
+                await asyncio.gather(*(self._run_page(automation) for automation in self.automations))
+            
+            if self._should_stop:
+                logger.info("Stopping execution...")
+                return
             
             # All done
             self.state['status'] = 'completed'
             logger.info(f"Submission completed: {self.state['completed']} successful, {self.state['failed']} failed")
-            
+        
         except Exception as e:
             logger.error(f"Fatal error in submission processing: {str(e)}")
             self.state['status'] = 'error'
@@ -282,12 +339,448 @@ class SubmissionManager:
         
         finally:
             # Clean up automation
-            if self.automation and self.state['status'] in ['completed', 'error', 'killed']:
+            if self.state['status'] in ['completed', 'error', 'killed']:
+                await self._stop_pages()
+    
+    async def _process_shards(self):
+        """
+        Run the job on shard processes and record the results they send.
+        
+        Students from current_position on are queued as rows finish, at
+        most SHARD_FEED_PER_PAGE per page ahead, then one end marker per
+        page. Rows a shard was on when it died are not resubmitted, and a
+        shard that crashes fails the job. The job is complete once every
+        row is recorded, whether or not every shard got to report that it
+        is done.
+        """
+        context = multiprocessing.get_context("spawn")
+        tasks = context.Queue()
+        events = context.Queue()
+        in_flight = context.Value('i', 0)
+        self._shard_control = (context.Event(), context.Event())
+        await self._signal_workers()
+        
+        pages = self.processes * self.concurrency
+        queued = self.state['current_position']
+        
+        def feed():
+            # Top up the queue; the end markers follow the last student
+            nonlocal queued
+            while queued < self.state['total'] and queued - self.state['current_position'] < pages * SHARD_FEED_PER_PAGE:
+                tasks.put((queued, self.students[queued]))
+                queued += 1
+            if queued == self.state['total']:
+                for _ in range(pages):
+                    tasks.put(None)
+                queued += 1
+        
+        feed()
+        shards = [
+            context.Process(target=run_shard, args=(self.url, self.concurrency, self.readiness, self.blocking, self.lookahead, self.state['total'], self.processes, tasks, events, in_flight) + self._shard_control, daemon=True)
+            for _ in range(self.processes)
+        ]
+        for shard in shards:
+            shard.start()
+        
+        loop = asyncio.get_running_loop()
+        running = len(shards)
+        try:
+            while running:
+                crashed = [shard for shard in shards if shard.exitcode not in (None, 0)]
+                if crashed:
+                    # It may have died holding a lock of the shared queues,
+                    # which would leave the other shards stuck: stop them
+                    self.state['errors'].append(f"Shard process exited with code {crashed[0].exitcode}")
+                    self._shard_control[1].set()
+                    break
+                try:
+                    event = await loop.run_in_executor(None, events.get, True, SHARD_POLL_SECONDS)
+                except queue.Empty:
+                    self.state['in_flight'] = in_flight.value
+                    # Shards that died never send 'done'
+                    if not any(shard.is_alive() for shard in shards):
+                        break
+                    continue
+                self.state['in_flight'] = in_flight.value
+                if self._handle_shard_event(event):
+                    running -= 1
+                feed()
+        finally:
+            for shard in shards:
+                await loop.run_in_executor(None, shard.join, SHARD_EXIT_SECONDS)
+                if shard.is_alive():
+                    shard.terminate()
+            # Students nobody will take: don't let the feeder thread wait
+            # for them to be read, here or at interpreter exit
+            tasks.cancel_join_thread()
+            tasks.close()
+            self._shard_control = None
+            # Rows the shards took but never finished are no longer on a page
+            self.state['in_flight'] = 0
+        
+        # Results sent just before the shards exited
+        while True:
+            try:
+                self._handle_shard_event(events.get_nowait())
+            except queue.Empty:
+                break
+        
+        if not self._should_stop and self.state['current_position'] < self.state['total']:
+            raise Exception("Shard processes exited without finishing")
+    
+    def _handle_shard_event(self, event: Tuple) -> bool:
+        """
+        Record an event sent by a shard process.
+        
+        Returns:
+            Whether it was the shard's last event
+        """
+        kind, *details = event
+        if kind == 'row':
+            self._record_row(*details)
+        elif kind == 'page_stats':
+            merge_counters(self.state['page_stats'], details[0])
+        elif kind == 'error':
+            self.state['errors'].append(f"Shard error: {details[0]}")
+        return kind == 'done'
+    
+    async def _process_queue(self):
+        """
+        Queue the job for worker processes and record their results.
+        
+        The job is queued once, so following it again after a restart
+        doesn't queue the students twice.
+        """
+        if self.job_queue is None:
+            self.job_queue = open_queue(SUBMISSION_QUEUE_URL)
+        if self.job_id is None:
+            self.job_id = await asyncio.to_thread(self.job_queue.create_job, self.url, self.students)
+            logger.info(f"Queued job {self.job_id} for submission workers")
+        
+        while True:
+            for result in await asyncio.to_thread(self.job_queue.results, self.job_id, self._last_result):
+                self._last_result = result['id']
+                self._record_row(result['position'], result['row'], result['student'], result['error'])
+            
+            if self._should_stop or self.state['current_position'] >= self.state['total']:
+                return
+            await asyncio.sleep(SHARD_POLL_SECONDS)
+    
+    async def _signal_workers(self):
+        """Pass pause, resume and kill on to the shard processes or queue workers."""
+        if self.job_id is not None:
+            status = 'killed' if self._should_stop else 'running' if self._unpaused.is_set() else 'paused'
+            await asyncio.to_thread(self.job_queue.set_job_status, self.job_id, status)
+        
+        if not self._shard_control:
+            return
+        unpaused, stop = self._shard_control
+        if self._unpaused.is_set():
+            unpaused.set()
+        else:
+            unpaused.clear()
+        if self._should_stop:
+            stop.set()
+    
+    async def _start_pages(self):
+        """Launch the browser and open one page per concurrent worker."""
+        self.automation = FormAutomation(self.readiness, self.blocking, self.lookahead)
+        self.automations = [self.automation]
+        await self.automation.start()
+        for _ in range(self.concurrency - 1):
+            automation = FormAutomation(self.readiness, self.blocking, self.lookahead)
+            self.automations.append(automation)
+            await automation.start(browser=self.automation.browser)
+    
+    async def _stop_pages(self):
+        """Close every page, then the browser, keeping their page counters."""
+        automations, self.automations, self.automation = self.automations, [], None
+        for automation in reversed(automations):
+            merge_counters(self.state['page_stats'], automation.page_stats)
+            try:
+                await automation.stop()
+            except:
+                pass
+    
+    async def _restart_page(self, automation: FormAutomation):
+        """
+        Recover a page after a browser error.
+        
+        The browser is relaunched once if it is gone, however many pages
+        report the error; pages sharing it then open a new context in it.
+        """
+        async with self._restart_lock:
+            owner = self.automation
+            if not owner:
+                return
+            if not owner.browser or not owner.browser.is_connected():
+                logger.warning("Browser error detected, attempting restart...")
+                try:
+                    await asyncio.wait_for(owner.stop(), timeout=3.0)
+                except:
+                    pass
+                await owner.start()
+                logger.info("Browser restarted successfully")
+            if automation is not owner and automation.browser is not owner.browser:
                 try:
-                    await self.automation.stop()
+                    await asyncio.wait_for(automation.stop(), timeout=3.0)
                 except:
                     pass
-                self.automation = None
+                await automation.start(browser=owner.browser)
+                logger.info("Page reopened in restarted browser")
+    
+    async def _run_page(self, automation: FormAutomation):
+        """Submit students on one page until none are left."""
+        while True:
+            taken = await self._next_student()
+            if taken is None:
+                return
+            index, student = taken
+            self.state['in_flight'] += 1
+            try:
+                await self._submit_student(automation, student, index)
+            finally:
+                self.state['in_flight'] -= 1
+            
+            # Small delay to prevent browser instability
+            await asyncio.sleep(ROW_DELAY_SECONDS)
+    
+    async def _next_student(self) -> Optional[Tuple[int, Dict]]:
+        """
+        Wait while paused, then take the next student.
+        
+        Students are taken by advancing _next_position, which only
+        happens between awaits, so no two pages get the same student.
+        
+        Returns:
+            Tuple of (position, student), or None once the job is done or killed
+        """
+        # Check for pause or kill
+        if not self._unpaused.is_set():
+            logger.info("Pausing execution...")
+            await self._unpaused.wait()
+        
+        if self._should_stop or self._next_position >= self.state['total']:
+            return None
+        
+        index = self._next_position
+        self._next_position += 1
+        return index, self.students[index]
+    
+    async def _submit_student(self, automation: FormAutomation, student: Dict, index: int):
+        """
+        Fill and submit the form for one student and record the outcome.
+        
+        Args:
+            automation: Page to submit on
+            student: Student dictionary with row_number, data and, from a
+                queue, the url of its job
+            index: Position of the student in the job
+        """
+        row_number = student.get('row_number', index + 1)
+        student_data = student['data']
+        
+        # Get student name for logging
+        student_name = f"{student_data.get('First Name', '')} {student_data.get('Last Name', '')}".strip()
+        
+        logger.info(f"Processing Row {row_number}: {student_name}")
+        
+        try:
+            # Fill and submit the form
+            # NOTE: Change submit=True when ready for production
+            
+            result = await automation.fill_form(
+                url=student.get('url', self.url),
+                student_data=student_data,
+                submit=False,  # Set to True for production (currently testing mode)
+                upcoming=self._upcoming(index)
+            )
+            
+            # Closing the pages on kill interrupts the students on them
+            if self._should_stop and not result['success']:
+                return
+            
+            if result['success']:
+                self._record_row(index, row_number, student_name)
+            else:
+                self._record_row(index, row_number, student_name, result.get('message', 'Unknown error'))
+        
+        except Exception as e:
+            if self._should_stop:
+                return
+            
+            # Exception during submission
+            error_msg = str(e)
+            logger.error(f"✗ Row {row_number}: Exception - {student_name} - {error_msg}")
+            
+            # If browser-related error, try to restart browser
+            if "browser" in error_msg.lower() or "closed" in error_msg.lower() or "disconnected" in error_msg.lower():
+                try:
+                    await self._restart_page(automation)
+                except Exception as restart_error:
+                    logger.error(f"Failed to restart browser: {restart_error}")
+            
+            self._record_row(index, row_number, student_name, error_msg)
+    
+    def _upcoming(self, index: int) -> Optional[int]:
+        """
+        Students a page may still get after the one at index: those after
+        it, shared out over all the job's pages. Pages take students in
+        turn, so this is an estimate, but it keeps pages from loading forms
+        ahead for students that are not there.
+        
+        Returns:
+            Number of students, or None if not known
+        """
+        pages = self.processes * self.concurrency
+        return -(-(self.state['total'] - index - 1) // pages)
+    
+    def _record_row(self, index: int, row_number: int, student_name: str, error_msg: Optional[str] = None):
+        """
+        Count a finished row (current_position) and add its log entry.
+        
+        Args:
+            index: Position of the student in the job
+            row_number: Spreadsheet row of the student
+            student_name: Name shown in the log
+            error_msg: Why the row failed, or None if it succeeded
+        """
+        self.state['current_position'] += 1
+        if error_msg is None:
+            # Success
+            self.state['completed'] += 1
+            log_entry = {
+                'row': row_number,
+                'status': 'success',
+                'student': student_name,
+                'timestamp': datetime.now().isoformat()
+            }
+            self.state['log'].append(log_entry)
+            logger.info(f"✓ Row {row_number}: Success - {student_name}")
+        else:
+            # Failed
+            self.state['failed'] += 1
+            log_entry = {
+                'row': row_number,
+                'status': 'failed',
+                'student': student_name,
+                'error': error_msg,
+                'timestamp': datetime.now().isoformat()
+            }
+            self.state['log'].append(log_entry)
+            self.state['errors'].append(f"Row {row_number}: {error_msg}")
+            logger.error(f"✗ Row {row_number}: Failed - {student_name} - {error_msg}")
+
+
+class ShardWorker(SubmissionManager):
+    """
+    Page pool of one shard process.
+    
+    Runs the SubmissionManager page loop on its own browser, but takes
+    students from the queue shared by all shards and sends each result to
+    the API process instead of keeping the job's state.
+    """
+    
+    def __init__(self, url: str, concurrency: int, readiness: str, blocking: str, lookahead: int,
+                 total: int, processes: int, tasks, events, in_flight, unpaused, stop):
+        """
+        Args:
+            url: Target form URL
+            concurrency: Pages to open in this shard's browser
+            readiness: Readiness strategy of the pages
+            blocking: Request blocking profile of the pages
+            lookahead: Forms each page loads ahead
+            total: Students in the job, over all shards
+            processes: Shards of the job, each with concurrency pages
+            tasks: Queue of (position, student) items, None when done
+            events: Queue results are sent back on
+            in_flight: Shared count of the students on a page, over all shards
+            unpaused: Event cleared while the job is paused
+            stop: Event set when the job is killed
+        """
+        self._tasks = tasks
+        self._events = events
+        self._in_flight = in_flight
+        self._shard_unpaused = unpaused
+        self._stop = stop
+        super().__init__()
+        self.url = url
+        self.concurrency = concurrency
+        self.readiness = readiness
+        self.blocking = blocking
+        self.lookahead = lookahead
+        self.processes = processes
+        self.state['total'] = total
+    
+    @property
+    def _should_stop(self) -> bool:
+        return self._stop.is_set()
+    
+    @_should_stop.setter
+    def _should_stop(self, value: bool):
+        if value:
+            self._stop.set()
+    
+    async def run(self):
+        """Submit students until the queue is drained or the job is killed."""
+        watcher = asyncio.create_task(self._close_pages_on_stop())
+        try:
+            await self._start_pages()
+            await asyncio.gather(*(self._run_page(automation) for automation in self.automations))
+        except Exception as e:
+            logger.error(f"Fatal error in shard {os.getpid()}: {str(e)}")
+            self._events.put(('error', str(e)))
+        finally:
+            if self._should_stop:
+                await watcher
+            else:
+                watcher.cancel()
+            await self._stop_pages()
+            self._events.put(('page_stats', self.state['page_stats']))
+            self._events.put(('done',))
+    
+    async def _close_pages_on_stop(self):
+        """Close the pages as soon as the job is killed, like SubmissionManager.kill."""
+        while not self._should_stop:
+            await asyncio.sleep(SHARD_POLL_SECONDS)
+        await self._stop_pages()
+    
+    async def _next_student(self) -> Optional[Tuple[int, Dict]]:
+        # Polls the queue so a pause or kill is seen while it is empty, and
+        # checks again after taking a student, which a kill drops unsubmitted
+        loop = asyncio.get_running_loop()
+        taken = _NOTHING_TAKEN
+        while True:
+            while not self._shard_unpaused.is_set() and not self._should_stop:
+                await asyncio.sleep(SHARD_POLL_SECONDS)
+            if self._should_stop:
+                return None
+            if taken is not _NOTHING_TAKEN:
+                return taken
+            try:
+                taken = await loop.run_in_executor(None, self._tasks.get, True, SHARD_POLL_SECONDS)
+            except queue.Empty:
+                pass
+    
+    async def _submit_student(self, automation: FormAutomation, student: Dict, index: int):
+        with self._in_flight.get_lock():
+            self._in_flight.value += 1
+        try:
+            await super()._submit_student(automation, student, index)
+        finally:
+            with self._in_flight.get_lock():
+                self._in_flight.value -= 1
+    
+    def _record_row(self, index: int, row_number: int, student_name: str, error_msg: Optional[str] = None):
+        super()._record_row(index, row_number, student_name, error_msg)
+        self._events.put(('row', index, row_number, student_name, error_msg))
+
+
+def run_shard(url: str, concurrency: int, readiness: str, blocking: str, lookahead: int,
+              total: int, processes: int, tasks, events, in_flight, unpaused, stop):
+    """Process entry point of a shard (see ShardWorker)."""
+    asyncio.run(ShardWorker(url, concurrency, readiness, blocking, lookahead, total, processes,
+                            tasks, events, in_flight, unpaused, stop).run())
 
 
 # Global instance (singleton pattern for simplicity)
@@ -0,0 +1,175 @@
+"""
+Submission worker for distributed jobs.
+
+Leases students of distributed /submit jobs from the shared queue, fills
+and submits their forms on a page pool, and acks each outcome. Start as
+many as needed, on any node that can reach the queue:
+
+    python submission_worker.py --queue sqlite:///data/jobs.db --concurrency 4
+
+SIGINT/SIGTERM stop taking rows; rows already on a page are finished.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from typing import Dict, List, Optional, Tuple
+from job_queue import DEFAULT_LEASE_SECONDS, JobQueue, open_queue
+from form_automation import DEFAULT_LOOKAHEAD, DEFAULT_READINESS, MAX_LOOKAHEAD, READINESS_STRATEGIES
+from request_blocking import BLOCKING_PROFILES, DEFAULT_BLOCKING
+from submission_manager import DEFAULT_CONCURRENCY, MAX_CONCURRENCY, SUBMISSION_QUEUE_URL, SubmissionManager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Wait between lease attempts while no running job has queued rows
+QUEUE_POLL_SECONDS = 1.0
+
+# Leases of rows on a page are renewed this often, as a share of lease_seconds
+LEASE_RENEW_SHARE = 1 / 3
+
+
+class QueueWorker(SubmissionManager):
+    """
+    Page pool that takes its students from a JobQueue.
+    
+    Runs the SubmissionManager page loop, but each page leases the next
+    row of any running job and acks the result instead of counting it. The
+    job's counters and log are kept by the API process that queued it.
+    """
+    
+    def __init__(self, job_queue: JobQueue, concurrency: int = DEFAULT_CONCURRENCY,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, exit_when_idle: bool = False,
+                 readiness: str = DEFAULT_READINESS, blocking: str = DEFAULT_BLOCKING,
+                 lookahead: int = DEFAULT_LOOKAHEAD):
+        """
+        Args:
+            job_queue: Queue to lease rows from
+            concurrency: Pages to open
+            lease_seconds: How long a row may take before another worker
+                gets it
+            exit_when_idle: Stop once no running job has queued rows,
+                instead of waiting for more
+            readiness: When a form counts as loaded, one of READINESS_STRATEGIES
+            blocking: Requests to block, one of BLOCKING_PROFILES
+            lookahead: Forms each page loads ahead; pages loaded for one
+                job's URL are discarded when the next lease is for another
+        """
+        super().__init__()
+        self.job_queue = job_queue
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.exit_when_idle = exit_when_idle
+        self.readiness = readiness
+        self.blocking = blocking
+        self.lookahead = lookahead
+        self._leases: Dict[int, Dict] = {}  # Leases of the rows on a page, by local index
+        self._outcomes: Dict[int, Tuple] = {}  # (row_number, student_name, error_msg) to ack, by local index
+        self._next_index = 0
+    
+    async def run(self):
+        """Submit leased rows until stopped (or idle, with exit_when_idle)."""
+        try:
+            await self._start_pages()
+            await asyncio.gather(*(self._run_page(automation) for automation in self.automations))
+        finally:
+            await self._stop_pages()
+            logger.info(f"Form readiness ({self.readiness}, lookahead {self.lookahead}): {self.state['page_stats']['readiness']}")
+            logger.info(f"Request blocking ({self.blocking}): {self.state['page_stats']['blocking']}")
+    
+    def stop(self):
+        """Stop leasing rows; pages finish the row they are on."""
+        self._should_stop = True
+    
+    async def _next_student(self) -> Optional[Tuple[int, Dict]]:
+        while not self._should_stop:
+            lease = await asyncio.to_thread(self.job_queue.lease, self.lease_seconds)
+            if lease:
+                index = self._next_index
+                self._next_index += 1
+                self._leases[index] = lease
+                return index, {**lease['student'], 'url': lease['url']}
+            if self.exit_when_idle:
+                return None
+            await asyncio.sleep(QUEUE_POLL_SECONDS)
+        return None
+    
+    async def _submit_student(self, automation, student: Dict, index: int):
+        # Keep the row while it is on the page, however long fill_form takes
+        renewer = asyncio.create_task(self._renew_lease(self._leases[index]))
+        try:
+            await super()._submit_student(automation, student, index)
+        finally:
+            renewer.cancel()
+        lease = self._leases.pop(index)
+        outcome = self._outcomes.pop(index, None)
+        # Rows interrupted by a stop are left to time out and be leased again
+        if outcome is None:
+            return
+        
+        # Off the event loop, like lease: acking may wait on the queue's lock
+        row_number, student_name, error_msg = outcome
+        if not await asyncio.to_thread(self.job_queue.ack, lease, student_name, error_msg):
+            logger.warning(f"Lease of row {row_number} timed out; result dropped")
+    
+    async def _renew_lease(self, lease: Dict):
+        """Renew a lease every LEASE_RENEW_SHARE of lease_seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds * LEASE_RENEW_SHARE)
+            if not await asyncio.to_thread(self.job_queue.renew, lease, self.lease_seconds):
+                logger.warning(f"Lease of row {lease['student'].get('row_number')} timed out while on a page")
+                return
+    
+    def _upcoming(self, index: int) -> Optional[int]:
+        # Leases come from any job, with no end known in advance
+        return None
+    
+    def _record_row(self, index: int, row_number: int, student_name: str, error_msg: Optional[str] = None):
+        if error_msg is None:
+            logger.info(f"✓ Row {row_number}: Success - {student_name}")
+        else:
+            logger.error(f"✗ Row {row_number}: Failed - {student_name} - {error_msg}")
+        self._outcomes[index] = (row_number, student_name, error_msg)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Submit forms for distributed jobs from a shared queue.")
+    parser.add_argument("--queue", default=SUBMISSION_QUEUE_URL,
+                        help="queue URL (default: SUBMISSION_QUEUE_URL)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"pages filling forms at the same time (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f"time before an unacked row goes to another worker (default: {DEFAULT_LEASE_SECONDS})")
+    parser.add_argument("--readiness", choices=READINESS_STRATEGIES, default=DEFAULT_READINESS,
+                        help=f"when a form counts as loaded (default: {DEFAULT_READINESS})")
+    parser.add_argument("--blocking", choices=list(BLOCKING_PROFILES), default=DEFAULT_BLOCKING,
+                        help=f"requests to block (default: {DEFAULT_BLOCKING})")
+    parser.add_argument("--lookahead", type=int, default=DEFAULT_LOOKAHEAD,
+                        help=f"forms each page loads ahead for the next rows (default: {DEFAULT_LOOKAHEAD})")
+    parser.add_argument("--exit-when-idle", action="store_true",
+                        help="exit once no running job has queued rows")
+    args = parser.parse_args(argv)
+    
+    if not args.queue:
+        parser.error("--queue or SUBMISSION_QUEUE_URL is required")
+    if not 1 <= args.concurrency <= MAX_CONCURRENCY:
+        parser.error(f"--concurrency must be between 1 and {MAX_CONCURRENCY}")
+    if not 0 <= args.lookahead <= MAX_LOOKAHEAD:
+        parser.error(f"--lookahead must be between 0 and {MAX_LOOKAHEAD}")
+    
+    worker = QueueWorker(open_queue(args.queue), args.concurrency, args.lease_seconds, args.exit_when_idle,
+                         args.readiness, args.blocking, args.lookahead)
+    
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, worker.stop)
+        await worker.run()
+    
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
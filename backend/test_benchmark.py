@@ -0,0 +1,63 @@
+"""
+Test script for the benchmark suite.
+"""
+from benchmark import DEFAULT_MIX, compare, generate_roster, parse_mix, run_benchmarks, write_roster_xlsx
+from cleaner import SpreadsheetCleaner
+
+
+def test_generate_roster():
+    """Test that generated rosters are repeatable and follow the mix."""
+    print("=== Testing Roster Generation ===")
+    
+    roster = list(generate_roster(2000, seed=1))
+    assert len(roster) == 2000
+    assert roster == list(generate_roster(2000, seed=1)), "Expected the same rows for the same seed"
+    
+    no_dirt = parse_mix([f"{kind}=0" for kind in DEFAULT_MIX])
+    clean = SpreadsheetCleaner().process_spreadsheet(write_roster_xlsx(generate_roster(2000, no_dirt)), "clean.xlsx")
+    print(f"  Clean mix: {clean['summary']}")
+    assert clean["summary"]["ok"] == 2000
+    
+    dirty = SpreadsheetCleaner().process_spreadsheet(write_roster_xlsx(roster), "dirty.xlsx")
+    print(f"  Default mix: {dirty['summary']}")
+    assert dirty["summary"]["fixed"] > 0 and dirty["summary"]["skipped"] > 0
+    assert any(r["note"].endswith("Duplicate entry detected") for r in dirty["results"])
+    
+    try:
+        parse_mix(["typo=0.5"])
+        assert False, "Expected ValueError for an unknown mix kind"
+    except ValueError:
+        pass
+    
+    print("✓ Roster generation tests passed\n")
+
+
+def test_run_benchmarks():
+    """Test that a small run produces comparable results."""
+    print("=== Testing Benchmark Run ===")
+    
+    results = run_benchmarks([200], repeat=1, only=["xlsx_read", "validator[clean_phone"])
+    names = [r["benchmark"] for r in results]
+    print(f"  Benchmarks: {names}")
+    assert names == ["xlsx_read", "validator[clean_phone]"]
+    assert all(r["rows"] == 200 and r["rows_per_sec"] and r["peak_memory_bytes"] for r in results)
+    
+    baseline = [{**r, "seconds": 0.5} for r in results]
+    slower = [{**r, "seconds": 1.0} for r in results]
+    assert compare(results, baseline, 0.2) == []
+    assert len(compare(slower, baseline, 0.2)) == len(results)
+    
+    print("✓ Benchmark run tests passed\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Running Benchmark Tests")
+    print("="*50 + "\n")
+    
+    test_generate_roster()
+    test_run_benchmarks()
+    
+    print("="*50)
+    print("✓ All tests passed!")
+    print("="*50 + "\n")
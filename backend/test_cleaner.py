@@ -1,15 +1,68 @@
 """
 Test script for the spreadsheet cleaner.
 """
+import csv
+import io
+from datetime import datetime
+import pandas as pd
+from openpyxl import Workbook
+import cleaner
+from cleaner import FIRST_STREAM_CHUNK_SIZE, STREAM_CHUNK_SIZE, SpreadsheetCleaner
+from ingest import SNIFF_BYTES
+from rules import COLUMN_CLEANERS, STATUSES
+from result_cache import CleaningCache
+from result_store import ROW_RESULT_BYTES
+from row_store import ColumnarResults
+from dob_parser import parse_date_of_birth
+from fuzzy_dedup import jaro_winkler, normalize_email, soundex
 from validators import (
+    DuplicateIndex,
+    detect_duplicate,
     clean_phone,
     clean_zip_code,
     clean_name,
     clean_email,
     clean_date_of_birth,
-    validate_headers
+    validate_headers,
+    REQUIRED_HEADERS
 )
 
+# Mix of clean, fixable, invalid, blank and duplicate rows
+SAMPLE_ROWS = [
+    ["john@example.com", "John", "Doe", "(636) 480-1423", "3/7/2007", "60163-1234"],
+    ["Jane@Example.COM", "Jane", "Smith", "6364801424", "03/16/2007", "60163"],
+    ["bad.email", "Bob", "Jones", "6364801425", "1/1/2006", "60164"],
+    [None, None, None, None, None, None],
+    ["amy@example.com", "Amy3", "Lee", "123", "13/1/2006", "601"],
+    ["JOHN@example.com", "Johnny", "Doe", "6364801426", "3/7/2007", "60165"],
+    ["sam@example.com", "Sam", "O'Brien", 6364801427, "1-2-07", 60166],
+    ["kim@example.com", "Kim", "Park", "6364801428", "2/30/2007", "60167"],
+    ["ann@example.com", "Ann", "Wu", "6364801429", "1/1/2099", "60168"],
+    ["liz@example.com", "Jane", "Smith", "6364801430", "3/16/2007", "60169"],
+]
+
+
+def build_csv(rows, headers=REQUIRED_HEADERS, delimiter=",", encoding="utf-8") -> bytes:
+    """Build an in-memory delimited text file from a header row and data rows."""
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=delimiter)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+    return output.getvalue().encode(encoding)
+
+
+def build_workbook(rows, headers=REQUIRED_HEADERS) -> bytes:
+    """Build an in-memory .xlsx file from a header row and data rows."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(headers)
+    for row in rows:
+        ws.append(row)
+    output = io.BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
 
 def test_phone_cleaning():
     """Test phone number cleaning."""
@@ -115,6 +168,39 @@ def test_dob_cleaning():
     print("✓ DOB cleaning tests passed\n")
 
 
+def test_dob_parser():
+    """Test single-pass DOB parsing against the accepted shapes."""
+    print("=== Testing DOB Parser ===")
+    
+    tests = [
+        ("3/7/2007", (2007, 3, 7)),
+        ("03-16-2007", (2007, 3, 16)),
+        ("1/2/60", (2060, 1, 2)),  # strict M/D/YY: 00-68 → 2000s
+        ("1/2/69", (1969, 1, 2)),
+        ("3/7-60", (1960, 3, 7)),  # mixed separators: 51-99 → 1900s
+        ("1/1/0000", (2000, 1, 1)),
+        ("2007", None),
+    ]
+    
+    for original, expected in tests:
+        parsed = parse_date_of_birth(original)
+        actual = (parsed.year, parsed.month, parsed.day) if parsed else None
+        print(f"  Input: '{original}' → {actual}")
+        assert actual == expected, f"Expected {expected}, got {actual}"
+    
+    for invalid in ["2/30/2007", "13/1/2007", "a/b/c"]:
+        try:
+            parse_date_of_birth(invalid)
+            assert False, f"Expected ValueError for {invalid}"
+        except ValueError as e:
+            print(f"  Input: '{invalid}' → ValueError: {e}")
+    
+    first = clean_date_of_birth("7/4/2006")
+    assert clean_date_of_birth(" 7/4/2006 ") == first == ("07/04/2006", "fixed", "DOB formatted: 7/4/2006 → 07/04/2006")
+    
+    print("✓ DOB parser tests passed\n")
+
+
 def test_header_validation():
     """Test header validation."""
     print("=== Testing Header Validation ===")
@@ -133,6 +219,494 @@ def test_header_validation():
     print("✓ Header validation tests passed\n")
 
 
+def test_dictionary_matches_scalar():
+    """Test that cleaning each distinct value once matches the scalar reference."""
+    print("=== Testing Dictionary Cleaning ===")
+    
+    content = build_workbook(SAMPLE_ROWS * 5)
+    for streaming in [False, True]:
+        scalar = SpreadsheetCleaner(mode="scalar", streaming=streaming).process_spreadsheet(content, "test.xlsx")
+        dictionary = SpreadsheetCleaner(mode="dictionary", streaming=streaming, instrument=True).process_spreadsheet(content, "test.xlsx")
+        assert dictionary["success"], dictionary.get("error")
+        assert dictionary["results"] == scalar["results"], f"streaming={streaming}"
+        assert dictionary["summary"] == scalar["summary"]
+        
+        # Five copies of each row: every distinct value is validated once
+        validators = dictionary["stats"]["validators"]
+        rows = len(dictionary["results"])
+        for header in REQUIRED_HEADERS:
+            print(f"  streaming={streaming}, {header}: {validators[header]['calls']} calls for {validators[header]['values']} values")
+            assert validators[header]["values"] == rows
+            assert validators[header]["calls"] * 5 <= rows
+    
+    print("✓ Dictionary cleaning tests passed\n")
+
+
+def test_duplicate_index():
+    """Test indexed duplicate detection against the linear scan."""
+    print("=== Testing Duplicate Index ===")
+    
+    rows = [
+        {"Email Address": "a@example.com", "First Name": "Ann", "Last Name": "Lee", "Date of Birth": "01/01/2007"},
+        {"Email Address": "b@example.com", "First Name": "Bob", "Last Name": "Kim", "Date of Birth": "02/02/2007"},
+    ]
+    index = DuplicateIndex()
+    for row_num, row in enumerate(rows, start=2):
+        index.add(row, row_num)
+    
+    tests = [
+        ({"Email Address": "A@Example.com ", "First Name": "X", "Last Name": "Y", "Date of Birth": "03/03/2007"}, 2),
+        ({"Email Address": "c@example.com", "First Name": "bob", "Last Name": "KIM", "Date of Birth": "02/02/2007"}, 3),
+        ({"Email Address": "b@example.com", "First Name": "Ann", "Last Name": "Lee", "Date of Birth": "01/01/2007"}, 2),
+        ({"Email Address": "c@example.com", "First Name": "Bob", "Last Name": "Kim", "Date of Birth": "03/03/2007"}, None),
+        ({"Email Address": "", "First Name": "", "Last Name": "", "Date of Birth": ""}, None),
+    ]
+    
+    for row, expected in tests:
+        duplicate_of = index.find(row)
+        print(f"  {row['Email Address']!r} {row['First Name']} {row['Last Name']} → {duplicate_of}")
+        assert duplicate_of == expected, f"Expected {expected}, got {duplicate_of}"
+        assert (duplicate_of is not None) == detect_duplicate(row, rows)
+    
+    content = build_workbook(SAMPLE_ROWS)
+    result = SpreadsheetCleaner().process_spreadsheet(content, "test.xlsx")
+    duplicates = {r["row_number"]: r.get("duplicate_of") for r in result["results"] if "duplicate_of" in r}
+    print(f"  Duplicates in sample: {duplicates}")
+    assert duplicates == {7: 2, 11: 3}, f"Unexpected duplicates {duplicates}"
+    
+    print("✓ Duplicate index tests passed\n")
+
+
+def test_rule_pipeline_matches_validators():
+    """Test that the compiled column rules match the scalar validators."""
+    print("=== Testing Rule Pipeline ===")
+    
+    validators = {
+        "Email Address": clean_email,
+        "First Name": lambda v: clean_name(v, "First Name"),
+        "Last Name": lambda v: clean_name(v, "Last Name"),
+        "Phone": clean_phone,
+        "Date of Birth": clean_date_of_birth,
+        "Zip Code": clean_zip_code,
+    }
+    inputs = [
+        "", "  ", None, "Test@Example.COM", "invalid.email", "John", "Jo3",
+        "(636) 480-1423", "6364801423", "123", "60163-1234", "60163",
+        "3/7/2007", "03/16/2007", "1/1/1949", "2/30/2007", 6364801423,
+    ]
+    
+    for header, validator in validators.items():
+        clean = COLUMN_CLEANERS[header]
+        for value in inputs:
+            expected = validator(value) if value is not None else validator("")
+            cleaned, rank, note = clean(value)
+            actual = (cleaned, STATUSES[rank], note)
+            assert actual == expected, f"{header} {value!r}: expected {expected}, got {actual}"
+        print(f"  {header}: {len(inputs)} inputs match")
+    
+    print("✓ Rule pipeline tests passed\n")
+
+
+def test_streaming_matches_dataframe():
+    """Test that streaming ingestion matches the pd.read_excel path."""
+    print("=== Testing Streaming Ingestion ===")
+    
+    content = build_workbook(SAMPLE_ROWS)
+    expected = SpreadsheetCleaner().process_spreadsheet(content, "test.xlsx")
+    
+    for mode in ["scalar", "dictionary"]:
+        result = SpreadsheetCleaner(mode=mode, streaming=True).process_spreadsheet(content, "test.xlsx")
+        print(f"  {mode}: {result['summary']}")
+        assert result["success"], result.get("error")
+        assert result["results"] == expected["results"]
+        assert result["summary"] == expected["summary"]
+    
+    wrong_headers = ["Email", "First Name", "Last Name", "Phone", "Date of Birth", "Zip Code"]
+    result = SpreadsheetCleaner(streaming=True).process_spreadsheet(build_workbook([], wrong_headers), "test.xlsx")
+    print(f"  Wrong headers: {result['error']}")
+    assert not result["success"]
+    
+    print("✓ Streaming ingestion tests passed\n")
+
+
+def test_csv_ingestion():
+    """Test that CSV/TSV uploads clean the same as the Excel file."""
+    print("=== Testing CSV Ingestion ===")
+    
+    expected = SpreadsheetCleaner().process_spreadsheet(build_workbook(SAMPLE_ROWS), "test.xlsx")
+    
+    uploads = {
+        "test.csv": build_csv(SAMPLE_ROWS),
+        "test.tsv": build_csv(SAMPLE_ROWS, delimiter="\t"),
+        "semicolons.txt": build_csv(SAMPLE_ROWS, delimiter=";"),
+        "excel.csv": build_csv(SAMPLE_ROWS, encoding="utf-8-sig"),
+    }
+    for filename, content in uploads.items():
+        result = SpreadsheetCleaner(mode="dictionary").process_spreadsheet(content, filename)
+        print(f"  {filename}: {result['summary']}")
+        assert result["success"], result.get("error")
+        assert result["results"] == expected["results"]
+    
+    # Windows-1252 text survives intact
+    rows = [["jose@example.com", "José", "Nuñez", "6364801423", "3/7/2007", "60163"]]
+    result = SpreadsheetCleaner().process_spreadsheet(build_csv(rows, encoding="cp1252"), "test.csv")
+    assert result["success"], result.get("error")
+    assert result["results"][0]["data"]["Last Name"] == "Nuñez"
+    
+    # ... also when it only starts past the bytes the encoding is sniffed from
+    ascii_rows = [["ann@example.com", "Ann", "Lee", "6364801423", "3/7/2007", "60163"]] * (SNIFF_BYTES // 50)
+    content = build_csv(ascii_rows + rows, encoding="cp1252")
+    assert content.index("ñ".encode("cp1252")) > SNIFF_BYTES
+    result = SpreadsheetCleaner().process_spreadsheet(content, "test.csv")
+    assert result["success"], result.get("error")
+    assert result["results"][-1]["data"]["Last Name"] == "Nuñez"
+    
+    wrong_headers = ["Email", "First Name", "Last Name", "Phone", "Date of Birth", "Zip Code"]
+    result = SpreadsheetCleaner().process_spreadsheet(build_csv([], wrong_headers), "test.csv")
+    print(f"  Wrong headers: {result['error']}")
+    assert not result["success"]
+    
+    print("✓ CSV ingestion tests passed\n")
+
+
+def test_stream_results():
+    """Test that streamed rows and final state match process_spreadsheet."""
+    print("=== Testing Streamed Results ===")
+    
+    content = build_workbook(SAMPLE_ROWS)
+    expected = SpreadsheetCleaner().process_spreadsheet(content, "test.xlsx")
+    
+    for mode in ["scalar", "dictionary"]:
+        cleaner = SpreadsheetCleaner(mode=mode)
+        records, error_msg = cleaner.open_records(content, "test.xlsx")
+        assert error_msg is None, error_msg
+        
+        stream = cleaner.stream_results(records)
+        first = next(stream)
+        assert first == expected["results"][0]
+        assert cleaner.results == [], "Expected results to be filled in at the end"
+        
+        rows = [first] + list(stream)
+        print(f"  {mode}: {len(rows)} rows, {cleaner.summary}")
+        assert rows == expected["results"]
+        assert cleaner.results == expected["results"]
+        assert cleaner.summary == expected["summary"]
+        assert cleaner.cleaned_file
+    
+    # Chunked engines yield their first row after a small first chunk
+    records = [(i + 2, dict(zip(REQUIRED_HEADERS, ["", "Ann", "Lee", "", "", ""]))) for i in range(STREAM_CHUNK_SIZE)]
+    for mode in ["dictionary"]:
+        consumed = []
+        stream = SpreadsheetCleaner(mode=mode).stream_results(consumed.append(record) or record for record in records)
+        next(stream)
+        print(f"  {mode}: first row after {len(consumed)} records")
+        assert len(consumed) == FIRST_STREAM_CHUNK_SIZE
+        assert len([next(stream)] + list(stream)) == len(records) - 1
+    
+    records, error_msg = SpreadsheetCleaner().open_records(build_csv([], ["Email"]), "test.csv")
+    print(f"  Wrong headers: {error_msg}")
+    assert records is None and error_msg
+    
+    print("✓ Streamed results tests passed\n")
+
+
+def test_batch_cross_file_duplicates():
+    """Test that batch cleaning finds duplicates across files."""
+    print("=== Testing Batch Cleaning ===")
+    
+    expected = SpreadsheetCleaner(output_format="csv").process_spreadsheet(build_workbook(SAMPLE_ROWS), "test.xlsx")
+    files = [
+        ("first.xlsx", build_workbook(SAMPLE_ROWS[:5])),
+        ("broken.xlsx", build_workbook([], ["Email"])),
+        ("second.csv", build_csv(SAMPLE_ROWS[5:])),
+    ]
+    
+    for workers in [1, 2]:
+        result = SpreadsheetCleaner(mode="dictionary", output_format="csv", workers=workers).process_batch(files)
+        print(f"  workers={workers}: {result['summary']}")
+        assert result["success"], result.get("error")
+        assert result["summary"] == expected["summary"]
+        assert [r["status"] for r in result["results"]] == [r["status"] for r in expected["results"]]
+        assert [r["data"] for r in result["results"]] == [r["data"] for r in expected["results"]]
+        
+        duplicates = {(r["file"], r["row_number"]): r["duplicate_of"] for r in result["results"] if "duplicate_of" in r}
+        assert duplicates == {
+            ("second.csv", 2): {"file": "first.xlsx", "row_number": 2},
+            ("second.csv", 6): {"file": "first.xlsx", "row_number": 3},
+        }, f"Unexpected duplicates: {duplicates}"
+        
+        assert [f["success"] for f in result["files"]] == [True, False, True]
+        assert result["files"][2]["summary"]["skipped"] == 3
+        assert result["cleaned_file"] == expected["cleaned_file"]
+    
+    print("✓ Batch cleaning tests passed\n")
+
+
+def test_incremental_reclean():
+    """Test that an incremental re-clean only re-validates changed rows."""
+    print("=== Testing Incremental Re-clean ===")
+    
+    rows = [list(row) for row in SAMPLE_ROWS * 200]
+    first = SpreadsheetCleaner(mode="dictionary", streaming=True).process_spreadsheet(build_workbook(rows), "test.xlsx")
+    assert first["success"], first.get("error")
+    
+    # Fix three cells, one of which makes a later row a duplicate of it
+    rows[0][3] = "6364809999"
+    rows[4][1] = "Amy"
+    rows[7][4] = "2/28/2007"
+    content = build_workbook(rows)
+    expected = SpreadsheetCleaner(mode="dictionary", streaming=True).process_spreadsheet(content, "test.xlsx")
+    
+    for mode in ["scalar", "dictionary"]:
+        cleaner = SpreadsheetCleaner(mode=mode, streaming=True, field_cache=first["field_cache"])
+        result = cleaner.process_spreadsheet(content, "test.xlsx")
+        print(f"  {mode}: reused {cleaner.reused_rows}, re-cleaned {cleaner.recleaned_rows}")
+        assert result["success"], result.get("error")
+        assert cleaner.recleaned_rows == 3
+        assert result["results"] == expected["results"]
+        assert result["summary"] == expected["summary"]
+    
+    # The downloaded cleaned file re-uploads without re-validation
+    cleaned_upload = build_csv(list(csv.reader(io.StringIO(
+        SpreadsheetCleaner(output_format="csv").process_spreadsheet(content, "test.xlsx")["cleaned_file"].decode("utf-8")
+    )))[1:])
+    expected = SpreadsheetCleaner().process_spreadsheet(cleaned_upload, "cleaned.csv")
+    cleaner = SpreadsheetCleaner(field_cache=result["field_cache"])
+    result = cleaner.process_spreadsheet(cleaned_upload, "cleaned.csv")
+    print(f"  cleaned file: reused {cleaner.reused_rows}, re-cleaned {cleaner.recleaned_rows}")
+    assert cleaner.recleaned_rows == 0
+    assert result["results"] == expected["results"]
+    
+    # A repeat upload served from the result cache counts every row as reused
+    cache = CleaningCache()
+    SpreadsheetCleaner(streaming=True, cache=cache).process_spreadsheet(content, "test.xlsx")
+    cleaner = SpreadsheetCleaner(streaming=True, cache=cache, field_cache=first["field_cache"])
+    result = cleaner.process_spreadsheet(content, "test.xlsx")
+    print(f"  cache hit: reused {cleaner.reused_rows}, re-cleaned {cleaner.recleaned_rows}")
+    assert cleaner.reused_rows == len(result["results"]) > 0
+    assert cleaner.recleaned_rows == 0
+    
+    print("✓ Incremental re-clean tests passed\n")
+
+
+def test_columnar_results():
+    """Test that columnar results read back like the list of row dicts."""
+    print("=== Testing Columnar Results ===")
+    
+    content = build_workbook(SAMPLE_ROWS * 20)
+    
+    for mode in ["scalar", "dictionary"]:
+        for streaming in [False, True]:
+            expected = SpreadsheetCleaner(mode=mode, streaming=streaming, output_format="csv").process_spreadsheet(content, "test.xlsx")
+            result = SpreadsheetCleaner(mode=mode, streaming=streaming, output_format="csv", columnar=True,
+                                        columnar_min_rows=0).process_spreadsheet(content, "test.xlsx")
+            assert result["success"], result.get("error")
+            assert isinstance(result["results"], ColumnarResults)
+            assert list(result["results"]) == expected["results"]
+            assert result["summary"] == expected["summary"]
+            assert result["cleaned_file"] == expected["cleaned_file"]
+    
+    results = result["results"]
+    print(f"  {len(results)} rows in {results.nbytes} bytes")
+    assert results[0] == expected["results"][0]
+    assert results[-1] == expected["results"][-1]
+    assert results[5:8] == expected["results"][5:8]
+    assert results[4]["duplicate_of"] == 2
+    assert results.nbytes < len(results) * ROW_RESULT_BYTES / 2
+    
+    # Files below the threshold keep the faster list of dicts
+    for streaming in [False, True]:
+        for min_rows in [cleaner.COLUMNAR_MIN_ROWS, len(expected["results"]) + 1]:
+            result = SpreadsheetCleaner(streaming=streaming, columnar=True, columnar_min_rows=min_rows).process_spreadsheet(content, "test.xlsx")
+            assert isinstance(result["results"], list), (streaming, min_rows)
+        result = SpreadsheetCleaner(streaming=streaming, columnar=True,
+                                    columnar_min_rows=len(expected["results"])).process_spreadsheet(content, "test.xlsx")
+        assert isinstance(result["results"], ColumnarResults)
+        assert list(result["results"]) == SpreadsheetCleaner(streaming=streaming).process_spreadsheet(content, "test.xlsx")["results"]
+    
+    print("✓ Columnar results tests passed\n")
+
+
+def test_fuzzy_duplicates():
+    """Test that fuzzy dedup flags near-duplicates without skipping them."""
+    print("=== Testing Fuzzy Duplicates ===")
+    
+    assert soundex("robert") == soundex("rupert") == "R163"
+    assert soundex("ashcraft") == "A261"
+    assert soundex("tymczak") == "T522"
+    assert jaro_winkler("martha", "martha") == 1.0
+    assert abs(jaro_winkler("martha", "marhta") - 0.961) < 0.001
+    assert normalize_email("J.Smith+school@googlemail.com") == "jsmith@gmail.com"
+    
+    rows = [
+        ["john.smith@gmail.com", "John", "Smith", "6364801423", "03/07/2007", "60163"],
+        ["johnsmith+school@gmail.com", "Johnny", "Smyth", "6364809999", "03/07/2007", "60163"],
+        ["jon.smith@yahoo.com", "Jon", "Smith", "6364801000", "03/07/2007", "60163"],
+        ["amy.lee@yahoo.com", "Amy", "Lee", "6364801424", "04/01/2008", "60163"],
+        ["leeamy@yahoo.com", "Lee", "Amy", "6364801424", "04/01/2008", "60163"],
+        ["sam.twin@yahoo.com", "Sam", "Park", "6364805555", "05/05/2007", "60163"],
+        ["pat.twin@yahoo.com", "Pat", "Park", "6364805555", "05/05/2007", "60163"],
+        ["john.smith@gmail.com", "John", "Smith", "6364801423", "03/07/2007", "60163"],
+    ]
+    content = build_csv(rows)
+    expected = SpreadsheetCleaner().process_spreadsheet(content, "test.csv")
+    result = SpreadsheetCleaner(fuzzy_dedup=True).process_spreadsheet(content, "test.csv")
+    assert result["success"], result.get("error")
+    
+    flagged = {r["row_number"]: r["possible_duplicate_of"] for r in result["results"] if "possible_duplicate_of" in r}
+    print(f"  flagged: {flagged}")
+    # Gmail variant, Jon/John and swapped names; twins are different students
+    assert flagged == {3: 2, 4: 2, 6: 5}
+    assert result["results"][1]["duplicate_score"] == 1.0
+    assert result["results"][1]["note"] == "Possible duplicate (score 1.00)"
+    
+    # Flags don't change statuses, and exact duplicates are still skipped
+    assert result["summary"] == expected["summary"]
+    assert result["results"][-1]["duplicate_of"] == 2
+    assert "possible_duplicate_of" not in result["results"][-1]
+    for row in expected["results"]:
+        assert "possible_duplicate_of" not in row
+    
+    columnar = SpreadsheetCleaner(fuzzy_dedup=True, columnar=True).process_spreadsheet(content, "test.csv")
+    assert list(columnar["results"]) == result["results"]
+    
+    print("✓ Fuzzy duplicate tests passed\n")
+
+
+def test_instrumentation():
+    """Test that instrumented runs match plain runs and count every row."""
+    print("=== Testing Instrumentation ===")
+    
+    content = build_workbook(SAMPLE_ROWS * 5)
+    
+    for mode in ["scalar", "dictionary"]:
+        for streaming in [False, True]:
+            expected = SpreadsheetCleaner(mode=mode, streaming=streaming).process_spreadsheet(content, "test.xlsx")
+            result = SpreadsheetCleaner(mode=mode, streaming=streaming, instrument=True).process_spreadsheet(content, "test.xlsx")
+            assert result["success"], result.get("error")
+            assert "stats" not in expected
+            assert result["results"] == expected["results"]
+            
+            stats = result["stats"]
+            rows = len(result["results"])
+            duplicates = sum(1 for r in result["results"] if "duplicate_of" in r)
+            print(f"  {mode}, streaming={streaming}: {stats['total_seconds']:.4f}s, rules {stats['rules']['Phone']}")
+            assert stats["counters"]["rows"] == rows
+            assert stats["counters"]["duplicates"] == duplicates
+            for header in REQUIRED_HEADERS:
+                assert stats["validators"][header]["values"] == rows
+            # Amy's "123" in each copy of the sample; the blank row isn't cleaned
+            assert stats["rules"]["Phone"]["skipped"] == 5
+            assert all(stage["calls"] > 0 for stage in stats["stages"].values())
+    
+    cache = CleaningCache()
+    SpreadsheetCleaner(cache=cache, instrument=True).process_spreadsheet(content, "test.xlsx")
+    result = SpreadsheetCleaner(cache=cache, instrument=True).process_spreadsheet(content, "test.xlsx")
+    assert result["stats"]["counters"]["cache_hits"] == 1
+    assert "stats" not in SpreadsheetCleaner(cache=cache).process_spreadsheet(content, "test.xlsx")
+    
+    print("✓ Instrumentation tests passed\n")
+
+
+def test_typed_cells():
+    """Test that native Excel dates and numbers are cleaned from their values."""
+    print("=== Testing Typed Cells ===")
+    
+    current_year = datetime.now().year
+    rows = [
+        ["ann@example.com", "Ann", "Lee", 6364801423, datetime(2007, 3, 7), 2134],
+        ["bob@example.com", "Bob", "Kim", 6364801424.0, datetime(2008, 12, 25, 14, 30), 21341234],
+        ["cal@example.com", "Cal", "Ray", None, datetime(1940, 1, 2), 60163],
+        ["dee@example.com", "Dee", "Fox", 6364801425, datetime(current_year + 1, 5, 6), "02134"],
+        ["eve@example.com", "Eve", "Ng", 123, "3/7/2007", 12],
+    ]
+    expected = [
+        ("fixed", "6364801423", "03/07/2007", "02134", "ZIP code formatted: 2134 → 02134"),
+        ("fixed", "6364801424", "12/25/2008", "02134", "ZIP code formatted: 21341234 → 02134"),
+        ("skipped", "", "1940", "60163", "DOB year 1940 is before 1950"),
+        ("fixed", "6364801425", f"05/06/{current_year - 16}", "02134", "DOB year corrected"),
+        ("skipped", "123", "03/07/2007", "12", "ZIP code must be 5 digits, got 2"),
+    ]
+    content = build_workbook(rows)
+    
+    reference = None
+    for mode in cleaner.CLEANING_MODES:
+        for streaming in [False, True]:
+            result = SpreadsheetCleaner(mode=mode, streaming=streaming).process_spreadsheet(content, "test.xlsx")
+            assert result["success"], result.get("error")
+            reference = reference or result["results"]
+            assert result["results"] == reference, f"{mode}, streaming={streaming}"
+    
+    for row, (status, phone, dob, zip_code, note) in zip(reference, expected):
+        print(f"  Row {row['row_number']}: {row['status']} - {row['note']}")
+        data = row["data"]
+        assert row["status"] == status
+        assert data["Phone"] == phone and data["Zip Code"] == zip_code, data
+        assert dob in data["Date of Birth"] and note in row["note"], row
+    # A date cell is already a date, so formatting it isn't a fix
+    assert "DOB" not in reference[0]["note"]
+    
+    # Number cells never reuse field results of the same digits as text
+    number_zip = dict(zip(REQUIRED_HEADERS, ["", "", "", "", "", 2134]))
+    assert cleaner.row_fingerprint(number_zip) != cleaner.row_fingerprint({**number_zip, "Zip Code": "2134"})
+    
+    print("✓ Typed cell tests passed\n")
+
+
+def test_export_formats():
+    """Test cleaned file export in each output format."""
+    print("=== Testing Export Formats ===")
+    
+    content = build_workbook(SAMPLE_ROWS)
+    readers = {
+        "xlsx": lambda data: pd.read_excel(io.BytesIO(data), dtype=str).values.tolist(),
+        "csv": lambda data: list(csv.reader(io.StringIO(data.decode("utf-8"))))[1:],
+        "parquet": lambda data: pd.read_parquet(io.BytesIO(data)).values.tolist(),
+    }
+    
+    for output_format, read in readers.items():
+        result = SpreadsheetCleaner(output_format=output_format).process_spreadsheet(content, "test.xlsx")
+        assert result["success"], result.get("error")
+        
+        expected = [
+            [r["data"][header] for header in REQUIRED_HEADERS]
+            for r in result["results"] if r["status"] in ["ok", "fixed"]
+        ]
+        rows = read(result["cleaned_file"])
+        print(f"  {output_format}: {len(rows)} rows, {len(result['cleaned_file'])} bytes")
+        assert rows == expected, f"Expected {expected}, got {rows}"
+    
+    try:
+        SpreadsheetCleaner(output_format="json")
+        assert False, "Expected ValueError for unknown format"
+    except ValueError:
+        pass
+    
+    print("✓ Export format tests passed\n")
+
+
+def test_parallel_matches_serial():
+    """Test that multi-process cleaning matches the serial path."""
+    print("=== Testing Parallel Cleaning ===")
+    
+    # Repeat the sample so duplicates span chunk boundaries
+    content = build_workbook(SAMPLE_ROWS * 5)
+    expected = SpreadsheetCleaner().process_spreadsheet(content, "test.xlsx")
+    
+    chunk_size = cleaner.PARALLEL_CHUNK_SIZE
+    cleaner.PARALLEL_CHUNK_SIZE = 7
+    try:
+        for mode in ["scalar", "dictionary"]:
+            result = SpreadsheetCleaner(mode=mode, streaming=True, workers=2).process_spreadsheet(content, "test.xlsx")
+            print(f"  {mode}: {result['summary']}")
+            assert result["success"], result.get("error")
+            assert result["results"] == expected["results"]
+    finally:
+        cleaner.PARALLEL_CHUNK_SIZE = chunk_size
+    
+    print("✓ Parallel cleaning tests passed\n")
+
+
 if __name__ == "__main__":
     print("\n" + "="*50)
     print("Running Cleaner Tests")
@@ -143,7 +717,22 @@ if __name__ == "__main__":
     test_name_cleaning()
     test_email_cleaning()
     test_dob_cleaning()
+    test_dob_parser()
     test_header_validation()
+    test_dictionary_matches_scalar()
+    test_duplicate_index()
+    test_rule_pipeline_matches_validators()
+    test_streaming_matches_dataframe()
+    test_csv_ingestion()
+    test_stream_results()
+    test_batch_cross_file_duplicates()
+    test_incremental_reclean()
+    test_columnar_results()
+    test_fuzzy_duplicates()
+    test_instrumentation()
+    test_typed_cells()
+    test_export_formats()
+    test_parallel_matches_serial()
     
     print("="*50)
     print("✓ All tests passed!")
@@ -0,0 +1,302 @@
+"""
+Test script for form automation, with stubbed pages instead of a browser.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from form_automation import FormAutomation, is_form_submission
+
+FORM_URL = "https://forms.example.com/info"
+
+STUDENT = {
+    "Email Address": "ann@example.com",
+    "First Name": "Ann",
+    "Last Name": "Lee",
+    "Phone": "6364801423",
+    "Date of Birth": "03/07/2007",
+    "Zip Code": "60163",
+}
+
+
+class FakeRequest:
+    def __init__(self, url: str, method: str = "POST", resource_type: str = "fetch"):
+        self.url = url
+        self.method = method
+        self.resource_type = resource_type
+
+
+class FakeResponse:
+    def __init__(self, request: FakeRequest, status: int = 200):
+        self.request = request
+        self.status = status
+        self.ok = status < 400
+
+
+class FakePage:
+    """
+    Stands in for a Playwright page.
+    
+    goto takes load_seconds, or idle_seconds to reach networkidle. Clicking
+    submit sends `submit_responses` in order; expect_response resolves
+    with the first its predicate accepts.
+    """
+    
+    load_seconds = 0.05
+    idle_seconds = 0.2
+    submit_responses = []
+    
+    def __init__(self):
+        self.url = "about:blank"
+        self.waits = []
+        self.closed = False
+        self._sent = []
+    
+    async def goto(self, url: str, wait_until: str, timeout: int):
+        self.waits.append(wait_until)
+        await asyncio.sleep(self.idle_seconds if wait_until == "networkidle" else self.load_seconds)
+        if self.closed:
+            raise Exception("Target page, context or browser has been closed")
+        self.url = url
+    
+    async def wait_for_function(self, js: str, arg, timeout: int):
+        self.waits.append("selectors")
+    
+    async def wait_for_load_state(self, state: str, timeout: int):
+        await asyncio.sleep(self.idle_seconds - self.load_seconds)
+    
+    async def fill(self, selector: str, value: str):
+        assert not self.closed and self.url != "about:blank", "Filled a page without the form"
+    
+    async def evaluate(self, js: str):
+        return {"success": True, "message": "checked"}
+    
+    async def eval_on_selector(self, selector: str, js: str):
+        return "https://api.example.com/leads"
+    
+    async def click(self, selector: str):
+        self._sent = list(self.submit_responses)
+    
+    @asynccontextmanager
+    async def expect_response(self, predicate, timeout: int):
+        page = self
+        
+        class Info:
+            @property
+            async def value(self):
+                for response in page._sent:
+                    if predicate(response):
+                        return response
+                raise Exception("Timeout waiting for response")
+        
+        yield Info()
+    
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+    
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+    
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    contexts = 0
+    
+    def is_connected(self) -> bool:
+        return True
+    
+    async def new_context(self):
+        FakeBrowser.contexts += 1
+        return FakeContext()
+    
+    async def close(self):
+        pass
+
+
+async def started(readiness: str = "selectors", lookahead: int = 0) -> FormAutomation:
+    """FormAutomation on a FakeContext, as after start()."""
+    automation = FormAutomation(readiness, "off", lookahead)
+    automation.browser = FakeBrowser()
+    automation.context = FakeContext()
+    automation.page = await automation.context.new_page()
+    return automation
+
+
+def test_readiness_strategies():
+    """Test that selectors readiness skips networkidle and counts the time it saved."""
+    print("=== Testing Readiness Strategies ===")
+    
+    async def run(readiness: str):
+        automation = await started(readiness)
+        for _ in range(3):
+            result = await automation.fill_form(FORM_URL, STUDENT)
+            assert result["success"], result
+        await asyncio.sleep(FakePage.idle_seconds)  # Let the networkidle watchers finish
+        stats = dict(automation.readiness_stats)
+        waits = automation.page.waits
+        await automation.stop()
+        return stats, waits
+    
+    stats, waits = asyncio.run(run("networkidle"))
+    print(f"  networkidle: {stats['rows']} rows, ready in {stats['ready_seconds']:.2f}s")
+    assert waits == ["networkidle"]
+    assert stats["rows"] == 3 and stats["ready_seconds"] >= 3 * FakePage.idle_seconds
+    assert stats["networkidle_rows"] == 0 and stats["saved_seconds"] == 0
+    
+    stats, waits = asyncio.run(run("selectors"))
+    print(f"  selectors: {stats['rows']} rows, ready in {stats['ready_seconds']:.2f}s, "
+          f"{stats['saved_seconds']:.2f}s saved on {stats['networkidle_rows']} rows")
+    assert waits == ["domcontentloaded", "selectors"]
+    assert stats["rows"] == 3 and stats["ready_seconds"] < 3 * FakePage.idle_seconds
+    assert stats["networkidle_rows"] == 3
+    assert stats["saved_seconds"] >= 3 * (FakePage.idle_seconds - FakePage.load_seconds) * 0.9
+    assert stats["wait_seconds"] == stats["ready_seconds"], "Expected every row to wait without lookahead"
+    
+    try:
+        FormAutomation("load")
+        assert False, "Expected ValueError for unknown readiness"
+    except ValueError as e:
+        print(f"  Unknown strategy: {e}")
+    
+    print("✓ Readiness strategy tests passed\n")
+
+
+def test_submission_confirmation():
+    """Test that only the form's own POST confirms a submission, not a beacon."""
+    print("=== Testing Submission Confirmation ===")
+    
+    origins = {"https://forms.example.com", "https://api.example.com"}
+    tests = [
+        (FakeRequest("https://api.example.com/leads"), True),
+        (FakeRequest("https://forms.example.com/info", resource_type="document"), True),
+        (FakeRequest("https://forms.example.com/info", method="GET"), False),
+        (FakeRequest("https://www.google-analytics.com/g/collect"), False),
+        (FakeRequest("https://api.example.com/leads", resource_type="ping"), False),
+        (FakeRequest("https://forms.example.com/track", resource_type="beacon"), False),
+    ]
+    for request, expected in tests:
+        assert is_form_submission(request, origins) == expected, (request.url, request.resource_type)
+    
+    async def submit(responses):
+        FakePage.submit_responses = responses
+        automation = await started()
+        try:
+            return await automation.fill_form(FORM_URL, STUDENT, submit=True, max_retries=1)
+        finally:
+            await automation.stop()
+    
+    beacon = FakeResponse(FakeRequest("https://www.google-analytics.com/g/collect"))
+    lead = FakeResponse(FakeRequest("https://api.example.com/leads"))
+    rejected = FakeResponse(FakeRequest("https://api.example.com/leads"), status=500)
+    
+    result = asyncio.run(submit([beacon, lead]))
+    print(f"  Beacon then form POST: {result['message']}")
+    assert result["success"]
+    
+    result = asyncio.run(submit([beacon]))
+    print(f"  Beacon only: {result['message']}")
+    assert not result["success"], "Expected a beacon not to confirm the submission"
+    
+    result = asyncio.run(submit([beacon, rejected]))
+    print(f"  Form POST failed: {result['message']}")
+    assert not result["success"] and "HTTP 500" in result["message"]
+    
+    FakePage.submit_responses = []
+    print("✓ Submission confirmation tests passed\n")
+
+
+def test_lookahead():
+    """Test that pages loaded ahead are used oldest first, only for their URL, and closed on stop."""
+    print("=== Testing Lookahead ===")
+    
+    async def run(lookahead: int, urls, upcoming=lambda i, rows: rows - i - 1):
+        automation = await started(lookahead=lookahead)
+        used = []
+        for i, url in enumerate(urls):
+            result = await automation.fill_form(url, STUDENT, upcoming=upcoming(i, len(urls)))
+            assert result["success"], result
+            used.append(automation.page)
+            assert automation.page.url == url, "Expected the student's page to have their form loaded"
+            await asyncio.sleep(2 * FakePage.load_seconds)  # Row delay, while the next forms load
+        pages = automation.context.pages
+        stats = dict(automation.readiness_stats)
+        await automation.stop()
+        assert all(page.closed for page in pages), "Expected stop to close pages loaded ahead"
+        return used, pages, stats
+    
+    used, pages, stats = asyncio.run(run(0, [FORM_URL] * 4))
+    assert stats["preloaded_rows"] == 0 and len(pages) == 4
+    
+    used, pages, stats = asyncio.run(run(2, [FORM_URL] * 6))
+    print(f"  lookahead 2: {stats['preloaded_rows']} of {stats['rows']} rows preloaded, "
+          f"waited {stats['wait_seconds']:.2f}s of {stats['ready_seconds']:.2f}s")
+    assert used == pages[:6], "Expected pages loaded ahead to be used oldest first"
+    assert len(pages) == 6, "Expected no forms loaded ahead past the last row"
+    assert stats["preloaded_rows"] == 5
+    assert stats["wait_seconds"] < stats["ready_seconds"] / 2
+    
+    # Without the rows to come, the pipeline stays full to the end
+    used, pages, stats = asyncio.run(run(2, [FORM_URL] * 6, lambda i, rows: None))
+    assert len(pages) == 6 + 2 and stats["preloaded_rows"] == 5
+    
+    # Pages loaded ahead for another form are closed, not filled
+    other_url = "https://forms.example.com/other"
+    used, pages, stats = asyncio.run(run(2, [FORM_URL] * 3 + [other_url] * 3))
+    discarded = [page for page in pages if page not in used and page.url == FORM_URL]
+    print(f"  URL change: {len(discarded)} pages discarded, {stats['preloaded_rows']} rows preloaded")
+    assert len(discarded) == 2
+    assert stats["preloaded_rows"] == 4
+    
+    try:
+        FormAutomation(lookahead=9)
+        assert False, "Expected ValueError for lookahead 9"
+    except ValueError as e:
+        print(f"  Bad lookahead: {e}")
+    
+    print("✓ Lookahead tests passed\n")
+
+
+def test_stop_during_fill():
+    """Test that a page stopped mid-fill returns at once instead of retrying on a new context."""
+    print("=== Testing Stop During Fill ===")
+    
+    async def run():
+        automation = await started()
+        FakeBrowser.contexts = 0
+        fill = asyncio.create_task(automation.fill_form(FORM_URL, STUDENT))
+        await asyncio.sleep(FakePage.load_seconds / 2)  # Navigating
+        start = time.perf_counter()
+        await automation.stop()
+        result = await fill
+        return result, time.perf_counter() - start
+    
+    result, seconds = asyncio.run(run())
+    print(f"  {result['message']} after {seconds:.2f}s")
+    assert not result["success"] and result["message"].startswith("Stopped")
+    assert seconds < 0.5, "Expected no retry after stop"
+    assert FakeBrowser.contexts == 0, "Expected no context recreated after stop"
+    
+    print("✓ Stop during fill tests passed\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Running Form Automation Tests")
+    print("="*50 + "\n")
+    
+    test_readiness_strategies()
+    test_submission_confirmation()
+    test_lookahead()
+    test_stop_during_fill()
+    
+    print("="*50)
+    print("✓ All tests passed!")
+    print("="*50 + "\n")
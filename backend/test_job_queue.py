@@ -0,0 +1,138 @@
+"""
+Test script for the distributed submission queue.
+"""
+import os
+import tempfile
+import time
+import job_queue
+from job_queue import SQLiteJobQueue, open_queue
+
+STUDENTS = [
+    {"row_number": 2, "data": {"First Name": "Ann", "Last Name": "Lee"}},
+    {"row_number": 3, "data": {"First Name": "Bob", "Last Name": "Kim"}},
+    {"row_number": 4, "data": {"First Name": "Cal", "Last Name": "Ray"}},
+]
+
+
+def temp_queue() -> SQLiteJobQueue:
+    """Queue in a new temporary SQLite file."""
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    return open_queue(f"sqlite://{path}")
+
+
+def test_lease_and_ack():
+    """Test that each row is leased once and results come back in ack order."""
+    print("=== Testing Lease and Ack ===")
+    
+    queue = temp_queue()
+    job_id = queue.create_job("https://example.com/form", STUDENTS)
+    
+    leases = [queue.lease() for _ in STUDENTS]
+    assert queue.lease() is None, "Expected every row to be leased"
+    assert [lease["position"] for lease in leases] == [0, 1, 2]
+    assert leases[0]["url"] == "https://example.com/form"
+    assert leases[1]["student"] == STUDENTS[1]
+    
+    assert queue.ack(leases[2], "Cal Ray")
+    assert queue.ack(leases[0], "Ann Lee", "Timeout")
+    results = queue.results(job_id)
+    print(f"  Results: {[(r['row'], r['student'], r['error']) for r in results]}")
+    assert [(r["row"], r["error"]) for r in results] == [(4, None), (2, "Timeout")]
+    assert queue.results(job_id, after=results[0]["id"]) == results[1:]
+    assert queue.job(job_id) == {"status": "running", "total": 3, "finished": 2}
+    
+    print("✓ Lease and ack tests passed\n")
+
+
+def test_job_status():
+    """Test that rows of paused and killed jobs aren't leased."""
+    print("=== Testing Job Status ===")
+    
+    queue = temp_queue()
+    job_id = queue.create_job("https://example.com/form", STUDENTS)
+    
+    queue.set_job_status(job_id, "paused")
+    assert queue.lease() is None, "Expected no leases from a paused job"
+    queue.set_job_status(job_id, "running")
+    assert queue.lease()["position"] == 0
+    queue.set_job_status(job_id, "killed")
+    assert queue.lease() is None, "Expected no leases from a killed job"
+    
+    try:
+        queue.set_job_status(job_id, "done")
+        assert False, "Expected ValueError for unknown status"
+    except ValueError as e:
+        print(f"  Unknown status: {e}")
+    
+    try:
+        open_queue("redis://localhost")
+        assert False, "Expected ValueError for unknown backend"
+    except ValueError as e:
+        print(f"  Unknown backend: {e}")
+    
+    print("✓ Job status tests passed\n")
+
+
+def test_lease_timeout():
+    """Test that rows of dead workers are leased again, then failed."""
+    print("=== Testing Lease Timeout ===")
+    
+    queue = temp_queue()
+    job_id = queue.create_job("https://example.com/form", STUDENTS[:1])
+    
+    first = queue.lease(lease_seconds=0.01)
+    time.sleep(0.02)
+    second = queue.lease(lease_seconds=0.01)
+    assert second["position"] == first["position"], "Expected expired row to be leased again"
+    assert not queue.ack(first, "Ann Lee"), "Expected ack of an expired lease to be dropped"
+    
+    for _ in range(job_queue.MAX_LEASE_ATTEMPTS - 2):
+        time.sleep(0.02)
+        assert queue.lease(lease_seconds=0.01) is not None
+    time.sleep(0.02)
+    assert queue.lease() is None, "Expected row to be failed after too many timeouts"
+    
+    results = queue.results(job_id)
+    print(f"  Results: {[(r['row'], r['error']) for r in results]}")
+    assert len(results) == 1 and "timed out" in results[0]["error"]
+    
+    print("✓ Lease timeout tests passed\n")
+
+
+def test_lease_renewal():
+    """Test that a renewed lease outlives its lease_seconds and a lost one can't be renewed."""
+    print("=== Testing Lease Renewal ===")
+    
+    queue = temp_queue()
+    queue.create_job("https://example.com/form", STUDENTS[:1])
+    
+    lease = queue.lease(lease_seconds=0.05)
+    for _ in range(4):
+        time.sleep(0.03)
+        assert queue.renew(lease, lease_seconds=0.05)
+    assert queue.lease() is None, "Expected a renewed lease to be kept"
+    
+    time.sleep(0.1)
+    second = queue.lease()
+    assert second["position"] == lease["position"], "Expected the row leased again once renewals stop"
+    assert not queue.renew(lease), "Expected a lease taken by another worker not to be renewed"
+    assert queue.ack(second, "Ann Lee")
+    assert not queue.renew(second), "Expected an acked lease not to be renewed"
+    
+    print("✓ Lease renewal tests passed\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Running Job Queue Tests")
+    print("="*50 + "\n")
+    
+    test_lease_and_ack()
+    test_job_status()
+    test_lease_timeout()
+    test_lease_renewal()
+    
+    print("="*50)
+    print("✓ All tests passed!")
+    print("="*50 + "\n")
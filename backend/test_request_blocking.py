@@ -0,0 +1,93 @@
+"""
+Test script for request blocking on form pages.
+"""
+import asyncio
+from form_automation import merge_counters, new_page_stats
+from request_blocking import RequestBlocker
+
+
+class FakeRequest:
+    def __init__(self, url: str, resource_type: str):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    """Stands in for a Playwright route, recording whether it was continued or aborted."""
+    
+    def __init__(self, url: str, resource_type: str):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+    
+    async def continue_(self):
+        self.outcome = "continued"
+    
+    async def abort(self, error_code: str):
+        self.outcome = error_code
+
+
+def test_safe_profile():
+    """Test that the safe profile blocks media and trackers but not the form."""
+    print("=== Testing Safe Blocking Profile ===")
+    
+    blocker = RequestBlocker.from_profile("safe")
+    tests = [
+        ("https://www.goarmy.com/info", "document", "continued"),
+        ("https://www.goarmy.com/app.js", "script", "continued"),
+        ("https://www.goarmy.com/api/lead", "fetch", "continued"),
+        ("https://www.goarmy.com/hero.jpg", "image", "blockedbyclient"),
+        ("https://fonts.gstatic.com/font.woff2", "font", "blockedbyclient"),
+        ("https://www.googletagmanager.com/gtm.js", "script", "blockedbyclient"),
+        ("https://region1.google-analytics.com/g/collect", "ping", "blockedbyclient"),
+    ]
+    
+    for url, resource_type, expected in tests:
+        route = FakeRoute(url, resource_type)
+        asyncio.run(blocker._route(route))
+        print(f"  {resource_type} {url}: {route.outcome}")
+        assert route.outcome == expected, f"Expected {expected} for {url}, got {route.outcome}"
+    
+    stats = blocker.stats
+    assert stats["requests"] == 7 and stats["blocked"] == 4
+    assert stats["blocked_by_type"] == {"image": 1, "font": 1, "script": 1, "ping": 1}
+    assert stats["estimated_bytes_saved"] > 0
+    
+    print("✓ Safe blocking profile tests passed\n")
+
+
+def test_allow_and_deny_lists():
+    """Test that allowed domains win over blocked types and domains."""
+    print("=== Testing Allow and Deny Lists ===")
+    
+    blocker = RequestBlocker(["image"], ["tracker.example"], allowed_domains=["cdn.example.com"])
+    assert blocker.should_block("https://pixel.tracker.example/p", "xhr")
+    assert not blocker.should_block("https://nottracker.example/p", "xhr")
+    assert blocker.should_block("https://www.example.com/a.png", "image")
+    assert not blocker.should_block("https://img.cdn.example.com/a.png", "image")
+    assert not RequestBlocker.from_profile("off").enabled
+    
+    try:
+        RequestBlocker.from_profile("everything")
+        assert False, "Expected ValueError for unknown profile"
+    except ValueError as e:
+        print(f"  Unknown profile: {e}")
+    
+    total = new_page_stats()
+    merge_counters(total, {"blocking": blocker.stats})
+    merge_counters(total, {"blocking": {"blocked": 2, "blocked_by_type": {"image": 2}}})
+    assert total["blocking"]["blocked"] == 2 and total["blocking"]["blocked_by_type"] == {"image": 2}
+    
+    print("✓ Allow and deny list tests passed\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Running Request Blocking Tests")
+    print("="*50 + "\n")
+    
+    test_safe_profile()
+    test_allow_and_deny_lists()
+    
+    print("="*50)
+    print("✓ All tests passed!")
+    print("="*50 + "\n")
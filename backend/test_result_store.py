@@ -0,0 +1,102 @@
+"""
+Test script for the server-side result store and cleaning cache.
+"""
+import time
+from cleaner import SpreadsheetCleaner
+from result_cache import CleaningCache, cache_key
+from result_store import ResultStore
+from test_cleaner import build_workbook, SAMPLE_ROWS
+
+
+def test_result_store_ttl():
+    """Test that results expire after the TTL."""
+    print("=== Testing Result Store TTL ===")
+    
+    store = ResultStore(ttl_seconds=0.05, max_bytes=1024)
+    result_id = store.put({"cleaned_file": b"abc", "results": []})
+    
+    assert store.get(result_id)["cleaned_file"] == b"abc"
+    time.sleep(0.06)
+    assert store.get(result_id) is None, "Expected result to expire"
+    
+    print("✓ Result store TTL tests passed\n")
+
+
+def test_result_store_size_cap():
+    """Test that the oldest results are evicted to stay under the cap."""
+    print("=== Testing Result Store Size Cap ===")
+    
+    store = ResultStore(max_bytes=100)
+    first = store.put({"cleaned_file": b"x" * 60})
+    second = store.put({"cleaned_file": b"y" * 30})
+    third = store.put({"cleaned_file": b"z" * 40})
+    
+    print(f"  Stored: first={store.get(first) is not None}, second={store.get(second) is not None}, third={store.get(third) is not None}")
+    assert store.get(first) is None, "Expected oldest result to be evicted"
+    assert store.get(second) is not None
+    assert store.get(third) is not None
+    
+    try:
+        store.put({"cleaned_file": b"x" * 101})
+        assert False, "Expected ValueError for oversized result"
+    except ValueError as e:
+        print(f"  Oversized: {e}")
+    
+    print("✓ Result store size cap tests passed\n")
+
+
+def test_cleaning_cache():
+    """Test LRU eviction and hit/miss counting in the cleaning cache."""
+    print("=== Testing Cleaning Cache ===")
+    
+    cache = CleaningCache(max_bytes=100)
+    cache.put(("a",), {"cleaned_file": b"x" * 40})
+    cache.put(("b",), {"cleaned_file": b"y" * 40})
+    assert cache.get(("a",)) is not None  # a is now most recently used
+    cache.put(("c",), {"cleaned_file": b"z" * 40})
+    
+    assert cache.get(("b",)) is None, "Expected least recently used entry to be evicted"
+    assert cache.get(("c",)) is not None
+    stats = cache.stats()
+    print(f"  Stats: {stats}")
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["entries"] == 2
+    
+    assert cache_key(b"file", "xlsx") == cache_key(b"file", "xlsx")
+    assert cache_key(b"file", "xlsx") != cache_key(b"file", "csv")
+    assert cache_key(b"file", "xlsx") != cache_key(b"other", "xlsx")
+    
+    print("✓ Cleaning cache tests passed\n")
+
+
+def test_cleaner_uses_cache():
+    """Test that repeat uploads are served from the cache."""
+    print("=== Testing Cleaner Cache ===")
+    
+    cache = CleaningCache()
+    content = build_workbook(SAMPLE_ROWS)
+    
+    first = SpreadsheetCleaner(cache=cache).process_spreadsheet(content, "test.xlsx")
+    second = SpreadsheetCleaner(cache=cache).process_spreadsheet(content, "test.xlsx")
+    third = SpreadsheetCleaner(cache=cache, output_format="csv").process_spreadsheet(content, "test.xlsx")
+    
+    print(f"  Stats: {cache.stats()}")
+    assert second is first, "Expected repeat upload to be served from cache"
+    assert third is not first
+    assert cache.hits == 1 and cache.misses == 2
+    
+    print("✓ Cleaner cache tests passed\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Running Result Store and Cache Tests")
+    print("="*50 + "\n")
+    
+    test_result_store_ttl()
+    test_result_store_size_cap()
+    test_cleaning_cache()
+    test_cleaner_uses_cache()
+    
+    print("="*50)
+    print("✓ All tests passed!")
+    print("="*50 + "\n")
@@ -0,0 +1,443 @@
+"""
+Test script for the submission page pool, with stubbed pages instead of a browser.
+"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import submission_manager
+from job_queue import open_queue
+from submission_manager import SubmissionManager
+from submission_worker import QueueWorker
+
+# The real shard entry point, called by the fake ones in the shard processes
+RUN_SHARD = submission_manager.run_shard
+
+# Students whose first name ends in this digit fail to submit
+FAILING_DIGIT = "3"
+
+
+def make_students(count: int, note_bytes: int = 0):
+    """Students S0..S<count-1> on rows 2 onwards, with a note of note_bytes each."""
+    students = [{"row_number": i + 2, "data": {"First Name": f"S{i}", "Last Name": "Lee"}} for i in range(count)]
+    if note_bytes:
+        for student in students:
+            student["data"]["Note"] = "x" * note_bytes
+    return students
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+    
+    def is_connected(self) -> bool:
+        return self.connected
+
+
+class FakeAutomation:
+    """Stands in for FormAutomation, taking a fixed time per student."""
+    
+    fill_seconds = 0.02
+    active = 0
+    peak = 0
+    filled = []
+    upcoming = []
+    
+    def __init__(self, readiness: str = "selectors", blocking: str = "off", lookahead: int = 0):
+        self.browser = None
+        self.stats = {"rows": 0}
+        self._closed = None
+    
+    @property
+    def page_stats(self):
+        return {"readiness": dict(self.stats), "blocking": {}}
+    
+    async def start(self, browser=None):
+        self.browser = browser or FakeBrowser()
+        self._closed = asyncio.Event()
+    
+    async def stop(self):
+        self.browser = None
+        if self._closed:
+            self._closed.set()
+    
+    async def fill_form(self, url: str, student_data, submit: bool = False, upcoming=None):
+        # Like FormAutomation.fill_form, failures are returned, not raised
+        if self.browser is None:
+            return {"success": False, "message": "Browser is not connected"}
+        if student_data["First Name"] == "CRASH":
+            os._exit(1)
+        FakeAutomation.upcoming.append(upcoming)
+        FakeAutomation.active += 1
+        FakeAutomation.peak = max(FakeAutomation.peak, FakeAutomation.active)
+        try:
+            # Closing the page interrupts the fill, like closing a Playwright page
+            await asyncio.wait_for(self._closed.wait(), self.fill_seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            FakeAutomation.active -= 1
+        if self.browser is None:
+            return {"success": False, "message": "Stopped: Target page, context or browser has been closed"}
+        self.stats["rows"] += 1
+        FakeAutomation.filled.append(student_data["First Name"])
+        if student_data["First Name"].endswith(FAILING_DIGIT):
+            return {"success": False, "message": "Form rejected"}
+        return {"success": True}
+
+
+@contextmanager
+def fake_pages():
+    """Run SubmissionManager on FakeAutomation pages with no row delay."""
+    saved = submission_manager.FormAutomation, submission_manager.ROW_DELAY_SECONDS
+    submission_manager.FormAutomation = FakeAutomation
+    submission_manager.ROW_DELAY_SECONDS = 0
+    FakeAutomation.active = FakeAutomation.peak = 0
+    FakeAutomation.filled = []
+    FakeAutomation.upcoming = []
+    try:
+        yield
+    finally:
+        submission_manager.FormAutomation, submission_manager.ROW_DELAY_SECONDS = saved
+
+
+def run_fake_shard(*args):
+    """Shard process entry point running FakeAutomation pages."""
+    submission_manager.FormAutomation = FakeAutomation
+    submission_manager.ROW_DELAY_SECONDS = 0
+    RUN_SHARD(*args)
+
+
+def run_slow_shard(*args):
+    """Shard whose pages take a minute per student, unless closed."""
+    FakeAutomation.fill_seconds = 60
+    run_fake_shard(*args)
+
+
+def run_shard_dying_mid_put(*args):
+    """Shard whose CRASH student kills it while it holds the events queue's write lock."""
+    events = args[8]
+    crash = FakeAutomation.fill_form
+    
+    async def fill_form(automation, url, student_data, submit=False, upcoming=None):
+        if student_data["First Name"] == "CRASH":
+            events._wlock.acquire()
+        return await crash(automation, url, student_data, submit, upcoming)
+    
+    FakeAutomation.fill_form = fill_form
+    run_fake_shard(*args)
+
+
+def run_shard_without_done(*args):
+    """Shard that dies right after recording its rows, before it reports 'done'."""
+    async def exit_now(worker):
+        worker._events.close()
+        worker._events.join_thread()
+        os._exit(0)
+    
+    submission_manager.ShardWorker._stop_pages = exit_now
+    run_fake_shard(*args)
+
+
+@contextmanager
+def fake_shards(entry_point=run_fake_shard):
+    """Start shard processes with entry_point instead of run_shard, on any number of CPUs."""
+    saved = submission_manager.MAX_PROCESSES
+    submission_manager.run_shard = entry_point
+    submission_manager.MAX_PROCESSES = max(saved, 2)
+    try:
+        yield
+    finally:
+        submission_manager.run_shard = RUN_SHARD
+        submission_manager.MAX_PROCESSES = saved
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    """Poll until condition() is true."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "Timed out waiting for condition"
+        await asyncio.sleep(0.01)
+
+
+def test_page_pool_counters():
+    """Test that every student is submitted once and counted, on up to `concurrency` pages."""
+    print("=== Testing Page Pool Counters ===")
+    
+    students = make_students(40)
+    expected_failed = sum(1 for s in students if s["data"]["First Name"].endswith(FAILING_DIGIT))
+    
+    async def run(concurrency: int):
+        manager = SubmissionManager()
+        started = await manager.start_submission("https://example.com/form", students, concurrency=concurrency)
+        await manager.task
+        return started, manager.get_status()
+    
+    for concurrency in [1, 4]:
+        with fake_pages():
+            started, status = asyncio.run(run(concurrency))
+            print(f"  concurrency {concurrency}: {status['completed']} ok, {status['failed']} failed, peak {FakeAutomation.peak} pages")
+            assert started["concurrency"] == concurrency
+            assert status["status"] == "completed"
+            assert status["completed"] + status["failed"] == status["current_position"] == len(students)
+            assert status["in_flight"] == 0
+            assert status["failed"] == expected_failed
+            assert sorted(entry["row"] for entry in status["log"]) == [s["row_number"] for s in students]
+            assert sorted(FakeAutomation.filled) == sorted(s["data"]["First Name"] for s in students)
+            assert FakeAutomation.peak == concurrency
+            assert status["readiness"]["rows"] == len(students), "Expected page counters kept after pages close"
+            assert FakeAutomation.upcoming[-1] == 0, "Expected no forms loaded ahead past the job"
+            assert max(FakeAutomation.upcoming[-concurrency:]) <= 1
+            if concurrency == 1:
+                assert FakeAutomation.upcoming == list(range(len(students) - 1, -1, -1))
+    
+    # Small jobs don't open more pages than students
+    async def small_job():
+        manager = SubmissionManager()
+        started = await manager.start_submission("https://example.com/form", students[:3], concurrency=8)
+        await manager.task
+        return started
+    
+    with fake_pages():
+        assert asyncio.run(small_job())["concurrency"] == 3
+    
+    try:
+        asyncio.run(SubmissionManager().start_submission("https://example.com/form", students, concurrency=0))
+        assert False, "Expected ValueError for concurrency 0"
+    except ValueError as e:
+        print(f"  Bad concurrency: {e}")
+    
+    print("✓ Page pool counter tests passed\n")
+
+
+def test_pause_resume_kill():
+    """Test that paused pages take no students and killed jobs close their pages."""
+    print("=== Testing Pause, Resume and Kill ===")
+    
+    students = make_students(60)
+    
+    async def run():
+        manager = SubmissionManager()
+        await manager.start_submission("https://example.com/form", students, concurrency=4)
+        await wait_for(lambda: manager.state["current_position"] >= 8)
+        
+        await manager.pause()
+        assert manager.get_status()["status"] == "paused"
+        await wait_for(lambda: FakeAutomation.active == 0)
+        paused_at = manager.state["current_position"]
+        finished = len(FakeAutomation.filled)
+        await asyncio.sleep(0.1)
+        assert manager.state["current_position"] == paused_at, "Expected no students taken while paused"
+        assert len(FakeAutomation.filled) == finished
+        assert manager.state["in_flight"] == 0, "Expected no students on a page while paused"
+        assert paused_at == manager.state["completed"] + manager.state["failed"], "Expected finished rows counted"
+        print(f"  Paused at {paused_at}")
+        
+        await manager.resume()
+        await wait_for(lambda: manager.state["current_position"] >= paused_at + 8)
+        
+        await manager.kill()
+        await manager.task
+        status = manager.get_status()
+        print(f"  Killed at {manager.state['current_position']}, {status['completed'] + status['failed']} rows logged")
+        assert status["status"] == "killed"
+        assert manager.state["current_position"] < len(students)
+        assert manager.automations == [], "Expected pages closed on kill"
+        assert status["completed"] + status["failed"] == len(FakeAutomation.filled), \
+            "Expected students interrupted by the kill not logged"
+        
+        # A killed job can be followed by a new one
+        await manager.start_submission("https://example.com/form", students[:5], concurrency=2)
+        await manager.task
+        assert manager.get_status()["status"] == "completed"
+        assert manager.get_status()["completed"] + manager.get_status()["failed"] == 5
+    
+    with fake_pages():
+        asyncio.run(run())
+    
+    print("✓ Pause, resume and kill tests passed\n")
+
+
+def test_shards():
+    """Test that shard processes submit every student once and report their counters."""
+    print("=== Testing Shard Processes ===")
+    
+    students = make_students(40)
+    
+    async def run():
+        manager = SubmissionManager()
+        started = await manager.start_submission("https://example.com/form", students, concurrency=2, processes=2)
+        await manager.task
+        return started, manager.get_status()
+    
+    with fake_shards():
+        started, status = asyncio.run(run())
+    print(f"  {started['processes']} x {started['concurrency']} pages: {status['completed']} ok, {status['failed']} failed")
+    assert status["status"] == "completed", status["errors"]
+    assert sorted(entry["row"] for entry in status["log"]) == [s["row_number"] for s in students]
+    assert status["current_position"] == len(students) and status["in_flight"] == 0
+    assert status["readiness"]["rows"] == len(students), "Expected page counters of the shards"
+    
+    print("✓ Shard process tests passed\n")
+
+
+def test_shard_failures():
+    """Test that completion goes by recorded rows, not by which shards said they're done."""
+    print("=== Testing Shard Failures ===")
+    
+    async def run(students):
+        manager = SubmissionManager()
+        await manager.start_submission("https://example.com/form", students, concurrency=2, processes=2)
+        await manager.task
+        return manager.get_status()
+    
+    # Every row recorded, but the shards died before reporting 'done'
+    students = make_students(20)
+    with fake_shards(run_shard_without_done):
+        status = asyncio.run(run(students))
+    print(f"  Shards died after their rows: {status['status']}, {status['completed'] + status['failed']} rows")
+    assert status["status"] == "completed", status["errors"]
+    assert status["completed"] + status["failed"] == len(students)
+    
+    # A shard died on a row, which is never recorded
+    students[5]["data"]["First Name"] = "CRASH"
+    with fake_shards():
+        status = asyncio.run(run(students))
+    print(f"  Shard died on a row: {status['status']}, {status['completed'] + status['failed']} rows")
+    assert status["status"] == "error"
+    assert all(entry["row"] != students[5]["row_number"] for entry in status["log"])
+    
+    # ... holding a queue lock the other shard then waits on forever
+    exit_seconds = submission_manager.SHARD_EXIT_SECONDS
+    submission_manager.SHARD_EXIT_SECONDS = 1.0
+    try:
+        with fake_shards(run_shard_dying_mid_put):
+            status = asyncio.run(asyncio.wait_for(run(students), 30))
+    finally:
+        submission_manager.SHARD_EXIT_SECONDS = exit_seconds
+    print(f"  Shard died mid-put: {status['status']}, {status['errors']}")
+    assert status["status"] == "error"
+    assert any("exited with code 1" in error for error in status["errors"])
+    
+    print("✓ Shard failure tests passed\n")
+
+
+def test_shard_kill():
+    """Test that killing a sharded job closes the pages instead of waiting for their students."""
+    print("=== Testing Shard Kill ===")
+    
+    async def run():
+        manager = SubmissionManager()
+        # More than a pipe holds, were the whole job queued at once
+        await manager.start_submission("https://example.com/form", make_students(400, 1000), concurrency=2, processes=2)
+        await asyncio.sleep(2)  # Shards start and take a student per page
+        taken = manager.get_status()
+        
+        start = time.perf_counter()
+        await manager.kill()
+        await manager.task
+        return taken, manager.get_status(), time.perf_counter() - start
+    
+    # Earlier tests' process pools may leave their own feeder threads behind
+    running = set(threading.enumerate())
+    with fake_shards(run_slow_shard):
+        taken, status, seconds = asyncio.run(run())
+    print(f"  {taken['in_flight']} rows on a page, {taken['current_position']} finished")
+    assert taken["in_flight"] == 4 and taken["current_position"] == 0, "Expected rows on a page counted apart from finished ones"
+    assert status["in_flight"] == 0
+    print(f"  Killed after {seconds:.2f}s, {status['completed'] + status['failed']} rows recorded")
+    assert status["status"] == "killed"
+    assert status["completed"] + status["failed"] == 0, "Expected interrupted students not recorded"
+    assert seconds < submission_manager.SHARD_EXIT_SECONDS, "Expected shards to close their pages on kill"
+    feeders = [thread for thread in threading.enumerate()
+               if thread.name == "QueueFeederThread" and thread not in running]
+    assert feeders == [], "Expected the task queue closed, not waiting for students nobody takes"
+    
+    print("✓ Shard kill tests passed\n")
+
+
+def test_queue_worker():
+    """Test that a queue worker submits leased rows and acks them off the event loop."""
+    print("=== Testing Queue Worker ===")
+    
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    job_queue = open_queue(f"sqlite://{path}")
+    students = make_students(12)
+    job_id = job_queue.create_job("https://example.com/form", students)
+    
+    ack_threads = set()
+    ack = job_queue.ack
+    
+    def recording_ack(*args):
+        ack_threads.add(threading.get_ident())
+        return ack(*args)
+    
+    job_queue.ack = recording_ack
+    worker = QueueWorker(job_queue, concurrency=3, exit_when_idle=True)
+    with fake_pages():
+        asyncio.run(worker.run())
+    
+    results = job_queue.results(job_id)
+    print(f"  {len(results)} rows acked from {len(ack_threads)} thread(s)")
+    assert sorted(result["row"] for result in results) == [s["row_number"] for s in students]
+    assert sum(result["error"] is not None for result in results) == 1
+    assert ack_threads and threading.get_ident() not in ack_threads, "Expected acks off the event loop"
+    assert worker._leases == {} and worker._outcomes == {}
+    
+    print("✓ Queue worker tests passed\n")
+
+
+def test_queue_worker_lease_renewal():
+    """Test that rows taking longer than lease_seconds keep their lease while on a page."""
+    print("=== Testing Queue Worker Lease Renewal ===")
+    
+    handle, path = tempfile.mkstemp(suffix=".db")
+    os.close(handle)
+    job_queue = open_queue(f"sqlite://{path}")
+    students = make_students(2)
+    job_id = job_queue.create_job("https://example.com/form", students)
+    worker = QueueWorker(job_queue, concurrency=2, lease_seconds=0.3, exit_when_idle=True)
+    
+    async def run():
+        task = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.6)  # Both rows on a page, past their first lease
+        stolen = await asyncio.to_thread(job_queue.lease)
+        await task
+        return stolen
+    
+    fill_seconds = FakeAutomation.fill_seconds
+    FakeAutomation.fill_seconds = 1.0
+    try:
+        with fake_pages():
+            stolen = asyncio.run(run())
+    finally:
+        FakeAutomation.fill_seconds = fill_seconds
+    
+    results = job_queue.results(job_id)
+    print(f"  {len(results)} rows acked, row leased by another worker: {stolen is not None}")
+    assert stolen is None, "Expected rows on a page not to be leased again"
+    assert sorted(result["row"] for result in results) == [s["row_number"] for s in students]
+    
+    print("✓ Queue worker lease renewal tests passed\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*50)
+    print("Running Submission Manager Tests")
+    print("="*50 + "\n")
+    
+    test_page_pool_counters()
+    test_pause_resume_kill()
+    test_shards()
+    test_shard_failures()
+    test_shard_kill()
+    test_queue_worker()
+    test_queue_worker_lease_renewal()
+    
+    print("="*50)
+    print("✓ All tests passed!")
+    print("="*50 + "\n")
@@ -3,7 +3,27 @@ Data validation and cleaning functions for student spreadsheet processing.
 """
 import re
 from datetime import datetime
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import Any, Dict, Tuple, Optional
+from dob_parser import parse_date_of_birth
+
+
+# Bump whenever a change here or in rules.py can
+# change cleaning output, so cached results from older versions are ignored
+VALIDATOR_VERSION = "2"
+
+# Patterns shared by the validators, compiled once at import
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+# Allow letters, spaces, hyphens, apostrophes
+# Including accented characters
+NAME_PATTERN = re.compile(r"^[A-Za-zÀ-ÖØ-öø-ÿ' -]+$")
+
+# Basic email regex
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Distinct date of birth strings remembered by clean_date_of_birth
+DOB_CACHE_SIZE = 4096
 
 
 # Required headers in exact order
@@ -58,7 +78,7 @@ def clean_phone(phone: str) -> Tuple[str, str, str]:
     original = str(phone).strip()
     
     # Extract only digits
-    digits = re.sub(r'\D', '', original)
+    digits = NON_DIGIT_PATTERN.sub('', original)
     
     if len(digits) == 10:
         if digits == original:
@@ -69,6 +89,26 @@ def clean_phone(phone: str) -> Tuple[str, str, str]:
         return original, "skipped", f"Phone must be 10 digits, got {len(digits)}"
 
 
+def clean_phone_number(phone: Any) -> Optional[Tuple[str, str, str]]:
+    """
+    Validate a phone number stored in a numeric cell.
+    
+    Args:
+        phone: Cell value from ingest.normalize_cell
+    
+    Returns:
+        Tuple of (cleaned_value, status, note), or None if the value isn't
+        a whole non-negative number and should be validated as text
+    """
+    if not isinstance(phone, int) or phone < 0:
+        return None
+    
+    digits = str(phone)
+    if len(digits) == 10:
+        return digits, "ok", ""
+    return digits, "skipped", f"Phone must be 10 digits, got {len(digits)}"
+
+
 def clean_zip_code(zip_code: str) -> Tuple[str, str, str]:
     """
     Extract first 5 digits from ZIP code.
@@ -85,7 +125,7 @@ def clean_zip_code(zip_code: str) -> Tuple[str, str, str]:
     original = str(zip_code).strip()
     
     # Extract only digits
-    digits = re.sub(r'\D', '', original)
+    digits = NON_DIGIT_PATTERN.sub('', original)
     
     if len(digits) >= 5:
         zip_5 = digits[:5]
@@ -97,6 +137,34 @@ def clean_zip_code(zip_code: str) -> Tuple[str, str, str]:
         return original, "skipped", f"ZIP code must be 5 digits, got {len(digits)}"
 
 
+def clean_zip_code_number(zip_code: Any) -> Optional[Tuple[str, str, str]]:
+    """
+    Restore the leading zeros Excel drops from ZIP codes in numeric cells.
+    
+    3-4 digit numbers are padded to 5 digits (2134 → 02134) and 7-8 digit
+    numbers to ZIP+4 before taking the first 5 (21341234 → 02134).
+    
+    Args:
+        zip_code: Cell value from ingest.normalize_cell
+    
+    Returns:
+        Tuple of (cleaned_value, status, note), or None if the value should
+        be validated as text (not a whole number, or no zeros to restore)
+    """
+    if not isinstance(zip_code, int) or zip_code < 0:
+        return None
+    
+    digits = str(zip_code)
+    if len(digits) in (3, 4):
+        zip_5 = digits.zfill(5)
+    elif len(digits) in (7, 8):
+        zip_5 = digits.zfill(9)[:5]
+    else:
+        return None
+    
+    return zip_5, "fixed", f"ZIP code formatted: {digits} → {zip_5}"
+
+
 def clean_name(name: str, field_name: str = "Name") -> Tuple[str, str, str]:
     """
     Validate name contains only allowed characters.
@@ -113,11 +181,7 @@ def clean_name(name: str, field_name: str = "Name") -> Tuple[str, str, str]:
     
     cleaned = str(name).strip()
     
-    # Allow letters, spaces, hyphens, apostrophes
-    # Including accented characters
-    name_pattern = r"^[A-Za-zÀ-ÖØ-öø-ÿ' -]+$"
-    
-    if re.match(name_pattern, cleaned):
+    if NAME_PATTERN.match(cleaned):
         return cleaned, "ok", ""
     else:
         return cleaned, "skipped", f"{field_name} contains invalid characters"
@@ -138,10 +202,7 @@ def clean_email(email: str) -> Tuple[str, str, str]:
     
     cleaned = str(email).strip().lower()
     
-    # Basic email regex
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    
-    if re.match(email_pattern, cleaned):
+    if EMAIL_PATTERN.match(cleaned):
         return cleaned, "ok", ""
     else:
         return cleaned, "skipped", "Invalid email format"
@@ -152,6 +213,9 @@ def clean_date_of_birth(dob: str) -> Tuple[str, str, str]:
     Clean and validate date of birth.
     Pad to MM/DD/YYYY format and validate year range.
     
+    Results are memoized per distinct value (and current year), since
+    rosters repeat birthdates a lot.
+    
     Args:
         dob: Date of birth string
     
@@ -161,72 +225,85 @@ def clean_date_of_birth(dob: str) -> Tuple[str, str, str]:
     if not dob or not str(dob).strip():
         return "", "skipped", "Date of birth is empty"
     
-    original = str(dob).strip()
-    
+    return _clean_date_of_birth(str(dob).strip(), datetime.now().year)
+
+
+@lru_cache(maxsize=DOB_CACHE_SIZE)
+def _clean_date_of_birth(original: str, current_year: int) -> Tuple[str, str, str]:
+    """Clean a stripped, non-empty date of birth for the given current year."""
     try:
-        # Try to parse various date formats
-        date_obj = None
-        for fmt in ['%m/%d/%Y', '%m/%d/%y', '%-m/%-d/%Y', '%-m/%-d/%y', '%m-%d-%Y', '%m-%d-%y']:
-            try:
-                date_obj = datetime.strptime(original, fmt)
-                break
-            except ValueError:
-                continue
-        
-        # If none of the formats worked, try manual parsing
+        date_obj = parse_date_of_birth(original)
         if not date_obj:
-            # Try splitting by / or -
-            parts = re.split(r'[/-]', original)
-            if len(parts) == 3:
-                month, day, year = parts
-                month = int(month)
-                day = int(day)
-                year = int(year)
-                
-                # Handle 2-digit years
-                if year < 100:
-                    if year <= 50:
-                        year += 2000
-                    else:
-                        year += 1900
-                
-                date_obj = datetime(year, month, day)
-            else:
-                return original, "skipped", "Invalid date format"
-        
-        year = date_obj.year
-        current_year = datetime.now().year
-        
-        # Check if year is in future or current year -> auto-correct to junior age
-        if year >= current_year:
-            corrected_year = current_year - 16
-            date_obj = datetime(corrected_year, date_obj.month, date_obj.day)
-            formatted = date_obj.strftime('%m/%d/%Y')
-            return formatted, "fixed", f"DOB year corrected: {original} → {formatted} (future year adjusted to age 16)"
+            return original, "skipped", "Invalid date format"
         
-        # Check if year is too old
-        if year < 1950:
-            return original, "skipped", f"DOB year {year} is before 1950"
-        
-        if year > current_year + 1:
-            return original, "skipped", f"DOB year {year} is too far in future"
-        
-        # Format to MM/DD/YYYY
-        formatted = date_obj.strftime('%m/%d/%Y')
-        
-        if formatted == original:
-            return formatted, "ok", ""
-        else:
-            return formatted, "fixed", f"DOB formatted: {original} → {formatted}"
+        return _check_date_of_birth(date_obj, original, current_year)
     
     except (ValueError, TypeError) as e:
         return original, "skipped", f"Invalid date format: {str(e)}"
 
 
+def clean_date_of_birth_value(dob: Any) -> Optional[Tuple[str, str, str]]:
+    """
+    Clean a date of birth stored in an Excel date cell.
+    
+    The date is formatted directly, with the same year rules as
+    clean_date_of_birth; a date cell is never "fixed" just for its format.
+    
+    Args:
+        dob: Cell value from ingest.normalize_cell
+    
+    Returns:
+        Tuple of (cleaned_value, status, note), or None if the value isn't
+        a date and should be validated as text
+    """
+    if not isinstance(dob, datetime):
+        return None
+    
+    return _clean_date_value(datetime(dob.year, dob.month, dob.day), datetime.now().year)
+
+
+@lru_cache(maxsize=DOB_CACHE_SIZE)
+def _clean_date_value(date_obj: datetime, current_year: int) -> Tuple[str, str, str]:
+    """Clean a date cell's date for the given current year."""
+    try:
+        return _check_date_of_birth(date_obj, date_obj.strftime('%m/%d/%Y'), current_year)
+    except ValueError as e:
+        return date_obj.strftime('%m/%d/%Y'), "skipped", f"Invalid date format: {str(e)}"
+
+
+def _check_date_of_birth(date_obj: datetime, original: str, current_year: int) -> Tuple[str, str, str]:
+    """Apply the year rules to a parsed date of birth and format it."""
+    year = date_obj.year
+    
+    # Check if year is in future or current year -> auto-correct to junior age
+    if year >= current_year:
+        corrected_year = current_year - 16
+        date_obj = datetime(corrected_year, date_obj.month, date_obj.day)
+        formatted = date_obj.strftime('%m/%d/%Y')
+        return formatted, "fixed", f"DOB year corrected: {original} → {formatted} (future year adjusted to age 16)"
+    
+    # Check if year is too old
+    if year < 1950:
+        return original, "skipped", f"DOB year {year} is before 1950"
+    
+    if year > current_year + 1:
+        return original, "skipped", f"DOB year {year} is too far in future"
+    
+    # Format to MM/DD/YYYY
+    formatted = date_obj.strftime('%m/%d/%Y')
+    
+    if formatted == original:
+        return formatted, "ok", ""
+    else:
+        return formatted, "fixed", f"DOB formatted: {original} → {formatted}"
+
+
 def detect_duplicate(row_data: dict, existing_rows: list) -> bool:
     """
     Check if a row is a duplicate based on email or name+DOB combination.
     
+    Scans every existing row; use DuplicateIndex when checking many rows.
+    
     Args:
         row_data: Dictionary with student data
         existing_rows: List of previously processed rows
@@ -257,3 +334,84 @@ def detect_duplicate(row_data: dict, existing_rows: list) -> bool:
     
     return False
 
+
+
+
+class DuplicateIndex:
+    """
+    Incremental index of accepted rows for duplicate detection.
+    
+    Same matching rules as detect_duplicate (email, or first name + last
+    name + DOB), but each lookup is a hash lookup instead of a scan over
+    every earlier row. Each key remembers the first row that claimed it.
+    """
+    
+    def __init__(self):
+        self._emails: Dict[str, Tuple[int, Any]] = {}
+        self._name_dob: Dict[Tuple[str, str, str], Tuple[int, Any]] = {}
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @staticmethod
+    def _keys(row_data: dict) -> Tuple[str, Optional[Tuple[str, str, str]]]:
+        """Normalize a row into its email key and name+DOB key."""
+        email = row_data.get('Email Address', '').lower().strip()
+        first_name = row_data.get('First Name', '').lower().strip()
+        last_name = row_data.get('Last Name', '').lower().strip()
+        dob = row_data.get('Date of Birth', '').strip()
+        
+        name_key = (first_name, last_name, dob) if first_name and last_name and dob else None
+        return email, name_key
+    
+    def find(self, row_data: dict) -> Optional[Any]:
+        """
+        Look up the earliest indexed row this row duplicates.
+        
+        Args:
+            row_data: Dictionary with student data
+        
+        Returns:
+            Reference of the matching row (as passed to add), or None
+        """
+        email, name_key = self._keys(row_data)
+        
+        matches = []
+        if email and email in self._emails:
+            matches.append(self._emails[email])
+        if name_key and name_key in self._name_dob:
+            matches.append(self._name_dob[name_key])
+        
+        if not matches:
+            return None
+        return min(matches, key=lambda match: match[0])[1]
+    
+    def find_similar(self, row_data: dict) -> Optional[Tuple[Any, float]]:
+        """
+        Look up a likely (not exact) duplicate of this row.
+        
+        Exact matching only, so never finds one; see
+        fuzzy_dedup.FuzzyDuplicateIndex.
+        
+        Returns:
+            Tuple of (reference of the matching row, score), or None
+        """
+        return None
+    
+    def add(self, row_data: dict, row_ref: Any) -> None:
+        """
+        Add an accepted row to the index.
+        
+        Args:
+            row_data: Dictionary with student data
+            row_ref: Reference reported by find (usually the row number)
+        """
+        email, name_key = self._keys(row_data)
+        entry = (self._count, row_ref)
+        self._count += 1
+        
+        if email:
+            self._emails.setdefault(email, entry)
+        if name_key:
+            self._name_dob.setdefault(name_key, entry)
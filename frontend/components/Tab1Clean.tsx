@@ -1,7 +1,7 @@
 'use client';
 
 import { useState, useRef, useEffect } from 'react';
-import { cleanSpreadsheet, downloadCleanedFile, CleanedRow } from '@/lib/api';
+import { cleanSpreadsheet, downloadCleanedFile, fetchResultRows, CleanedRow, RESULTS_PAGE_SIZE } from '@/lib/api';
 import { saveToStorage, loadFromStorage, clearStorage } from '@/lib/storage';
 
 export default function Tab1Clean() {
@@ -9,9 +9,10 @@ export default function Tab1Clean() {
   const [file, setFile] = useState<File | null>(null);
   const [results, setResults] = useState<CleanedRow[]>([]);
   const [summary, setSummary] = useState<any>(null);
-  const [cleanedFile, setCleanedFile] = useState<string | null>(null);
+  const [cleanedFile, setCleanedFile] = useState<string | null>(null); // result ID of the cleaned file
   const [cleanedFilename, setCleanedFilename] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [isDragging, setIsDragging] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
@@ -29,8 +30,9 @@ export default function Tab1Clean() {
   const handleFileChange = (selectedFile: File | null) => {
     if (!selectedFile) return;
 
-    if (!selectedFile.name.endsWith('.xlsx') && !selectedFile.name.endsWith('.xls')) {
-      setError('Please upload an Excel file (.xlsx or .xls)');
+    const name = selectedFile.name.toLowerCase();
+    if (!['.xlsx', '.xls', '.csv', '.tsv', '.txt'].some(ext => name.endsWith(ext))) {
+      setError('Please upload an Excel file (.xlsx or .xls) or a CSV/TSV file');
       return;
     }
 
@@ -72,11 +74,11 @@ export default function Tab1Clean() {
     setError(null);
 
     try {
-      const response = await cleanSpreadsheet(file);
+      const response = await cleanSpreadsheet(file, 'xlsx', cleanedFile);
       
       setResults(response.results);
       setSummary(response.summary);
-      setCleanedFile(response.cleaned_file);
+      setCleanedFile(response.result_id);
       setCleanedFilename(response.filename);
 
       // Save to localStorage
@@ -84,7 +86,7 @@ export default function Tab1Clean() {
         targetUrl,
         results: response.results,
         summary: response.summary,
-        cleanedFile: response.cleaned_file,
+        cleanedFile: response.result_id,
         filename: response.filename,
       });
     } catch (err: any) {
@@ -108,13 +110,37 @@ export default function Tab1Clean() {
     clearStorage();
   };
 
-  const handleDownload = () => {
+  const handleLoadMore = async () => {
+    if (!cleanedFile) return;
+
+    setLoadingMore(true);
+    setError(null);
+
+    try {
+      const page = await fetchResultRows(cleanedFile, results.length, RESULTS_PAGE_SIZE);
+      const loaded = [...results, ...page];
+      setResults(loaded);
+      saveToStorage({ results: loaded });
+    } catch (err: any) {
+      setError(err.message || 'Failed to load more rows');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const handleDownload = async () => {
     if (cleanedFile && cleanedFilename) {
-      downloadCleanedFile(cleanedFile, cleanedFilename);
+      try {
+        await downloadCleanedFile(cleanedFile, cleanedFilename);
+      } catch (err: any) {
+        setError(err.message || 'Failed to download cleaned file');
+      }
     }
   };
 
-  const skippedRows = results.filter(r => r.status === 'skipped');
+  // Counted from the summary, since only some rows may be loaded
+  const skippedCount = summary?.skipped ?? 0;
+  const hasMoreRows = summary !== null && results.length < summary.total;
 
   return (
     <div className="space-y-6">
@@ -150,7 +176,7 @@ export default function Tab1Clean() {
           <input
             ref={fileInputRef}
             type="file"
-            accept=".xlsx,.xls"
+            accept=".xlsx,.xls,.csv,.tsv,.txt"
             onChange={(e) => handleFileChange(e.target.files?.[0] || null)}
             className="hidden"
             id="file-upload"
@@ -167,7 +193,7 @@ export default function Tab1Clean() {
             ) : (
               <div>
                 <p className="font-medium">Click to upload or drag and drop</p>
-                <p className="text-sm text-gray-500 mt-1">Excel files (.xlsx, .xls)</p>
+                <p className="text-sm text-gray-500 mt-1">Excel files (.xlsx, .xls) or CSV/TSV</p>
               </div>
             )}
           </label>
@@ -248,10 +274,10 @@ export default function Tab1Clean() {
       )}
 
       {/* Unfixable Rows Warning */}
-      {skippedRows.length > 0 && (
+      {skippedCount > 0 && (
         <div className="bg-yellow-50 border border-yellow-200 rounded-lg p-4">
           <h3 className="font-semibold text-yellow-800 mb-2">
-            ⚠️ {skippedRows.length} Unfixable Row{skippedRows.length > 1 ? 's' : ''}
+            ⚠️ {skippedCount} Unfixable Row{skippedCount > 1 ? 's' : ''}
           </h3>
           <p className="text-sm text-yellow-700 mb-3">
             The following rows have errors that need manual correction. Please fix these in your Excel file and re-upload.
@@ -315,6 +341,20 @@ export default function Tab1Clean() {
               </tbody>
             </table>
           </div>
+          {hasMoreRows && (
+            <div className="border-t border-gray-200 px-4 py-3 flex items-center justify-between">
+              <span className="text-sm text-gray-600">
+                Showing {results.length} of {summary.total} rows
+              </span>
+              <button
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                className="px-4 py-2 border border-gray-300 text-gray-700 rounded-lg text-sm font-medium hover:bg-gray-50 disabled:cursor-not-allowed transition-colors"
+              >
+                {loadingMore ? 'Loading...' : 'Load more rows'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -9,13 +9,15 @@ import {
   resumeSubmission,
   killSubmission,
   SubmissionStatus,
+  fetchResultRows,
   CleanedRow,
+  ResultsExpiredError,
 } from '@/lib/api';
 
 export default function Tab2Submit() {
   const [targetUrl, setTargetUrl] = useState('');
-  const [students, setStudents] = useState<CleanedRow[]>([]);
-  const [validStudents, setValidStudents] = useState<CleanedRow[]>([]);
+  const [resultId, setResultId] = useState<string | null>(null); // stored cleaning result
+  const [validCount, setValidCount] = useState(0);
   const [skippedCount, setSkippedCount] = useState(0);
   const [status, setStatus] = useState<SubmissionStatus | null>(null);
   const [error, setError] = useState<string | null>(null);
@@ -27,15 +29,25 @@ export default function Tab2Submit() {
   useEffect(() => {
     const stored = loadFromStorage();
     if (stored.targetUrl) setTargetUrl(stored.targetUrl);
-    if (stored.results.length > 0) {
-      setStudents(stored.results);
-      const valid = stored.results.filter((r: CleanedRow) => r.status === 'ok' || r.status === 'fixed');
-      const skipped = stored.results.filter((r: CleanedRow) => r.status === 'skipped');
-      setValidStudents(valid);
-      setSkippedCount(skipped.length);
+    // Only the rows shown in the clean tab are stored; counts come from the summary
+    if (stored.cleanedFile && stored.summary) {
+      setResultId(stored.cleanedFile);
+      setValidCount(stored.summary.ok + stored.summary.fixed);
+      setSkippedCount(stored.summary.skipped);
+
+      // Stored results expire; say so when the tab opens rather than on Start
+      fetchResultRows(stored.cleanedFile, 0, 0).catch(handleExpired);
     }
   }, []);
 
+  const handleExpired = (err: any) => {
+    if (!(err instanceof ResultsExpiredError)) return false;
+    setResultId(null);
+    setValidCount(0);
+    setError(err.message);
+    return true;
+  };
+
   // Local timer - runs independently in browser for smooth counting
   useEffect(() => {
     if (status?.status !== 'running') return;
@@ -86,7 +98,7 @@ export default function Tab2Submit() {
   }, [status?.log]);
 
   const handleStart = async () => {
-    if (validStudents.length === 0) {
+    if (!resultId || validCount === 0) {
       setError('No valid students to submit');
       return;
     }
@@ -96,6 +108,10 @@ export default function Tab2Submit() {
     setIsSubmitting(true);
 
     try {
+      // Every row is needed to submit, so load them all now rather than in the clean tab
+      const rows = await fetchResultRows(resultId);
+      const validStudents = rows.filter((r: CleanedRow) => r.status === 'ok' || r.status === 'fixed');
+
       await startSubmission({
         url: targetUrl,
         students: validStudents.map(s => ({
@@ -104,7 +120,9 @@ export default function Tab2Submit() {
         })),
       });
     } catch (err: any) {
-      setError(err.message || 'Failed to start submission');
+      if (!handleExpired(err)) {
+        setError(err.message || 'Failed to start submission');
+      }
       setIsSubmitting(false);
     }
   };
@@ -155,7 +173,7 @@ export default function Tab2Submit() {
         <h3 className="text-xl font-semibold text-gray-800 mb-4">Submission Summary</h3>
         <div className="space-y-2 text-gray-700">
           <p><span className="font-medium">Target URL:</span> {targetUrl || 'Not set'}</p>
-          <p><span className="font-medium">Valid Students:</span> {validStudents.length}</p>
+          <p><span className="font-medium">Valid Students:</span> {validCount}</p>
           {skippedCount > 0 && (
             <p className="text-yellow-600">
               <span className="font-medium">Skipped Rows:</span> {skippedCount} (will be ignored during submission)
@@ -176,7 +194,7 @@ export default function Tab2Submit() {
         {!status || status.status === 'idle' ? (
           <button
             onClick={handleStart}
-            disabled={validStudents.length === 0 || !targetUrl}
+            disabled={validCount === 0 || !targetUrl}
             className="flex-1 bg-green-600 text-white px-6 py-3 rounded-lg font-medium hover:bg-green-700 disabled:bg-gray-300 disabled:cursor-not-allowed transition-colors"
           >
             Start Submission
@@ -4,6 +4,18 @@
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+// Rows fetched per page of a stored cleaning result
+export const RESULTS_PAGE_SIZE = 100;
+
+// Thrown when a stored cleaning result is gone (the backend keeps them for an hour)
+export class ResultsExpiredError extends Error {
+  constructor() {
+    super('Results expired, re-clean the file');
+    this.name = 'ResultsExpiredError';
+    Object.setPrototypeOf(this, ResultsExpiredError.prototype);
+  }
+}
+
 export interface CleanedRow {
   row_number: number;
   status: 'ok' | 'fixed' | 'skipped';
@@ -16,24 +28,42 @@ export interface CleanedRow {
     'Date of Birth': string;
     'Zip Code': string;
   };
+  duplicate_of?: number; // earlier row number, only set on duplicate rows
+  possible_duplicate_of?: number; // earlier similar row, only with fuzzy_dedup
+  duplicate_score?: number; // similarity to possible_duplicate_of, 0 to 1
+}
+
+export interface CleanSummary {
+  ok: number;
+  fixed: number;
+  skipped: number;
+  total: number;
 }
 
 export interface CleanResponse {
   success: boolean;
-  results: CleanedRow[];
-  summary: {
-    ok: number;
-    fixed: number;
-    skipped: number;
-    total: number;
-  };
-  cleaned_file: string; // base64 encoded
+  result_id: string; // server-side result, used to fetch rows and the cleaned file
+  results: CleanedRow[]; // first RESULTS_PAGE_SIZE rows; fetch more with fetchResultRows
+  summary: CleanSummary;
   filename: string;
+  content_type: string;
+  incremental?: { reused_rows: number; recleaned_rows: number }; // set when previousResultId was still stored
 }
 
-export async function cleanSpreadsheet(file: File): Promise<CleanResponse> {
+export type OutputFormat = 'xlsx' | 'csv' | 'parquet';
+
+export async function cleanSpreadsheet(
+  file: File,
+  outputFormat: OutputFormat = 'xlsx',
+  previousResultId?: string | null
+): Promise<CleanResponse> {
   const formData = new FormData();
   formData.append('file', file);
+  formData.append('output_format', outputFormat);
+  if (previousResultId) {
+    // Only rows changed since the previous upload get re-validated
+    formData.append('previous_result_id', previousResultId);
+  }
 
   const response = await fetch(`${API_URL}/clean`, {
     method: 'POST',
@@ -45,11 +75,50 @@ export async function cleanSpreadsheet(file: File): Promise<CleanResponse> {
     throw new Error(error.detail || 'Failed to clean spreadsheet');
   }
 
-  return response.json();
+  const cleaned = await response.json();
+
+  // Row results are fetched separately from the stored result, a page at a time
+  const results = await fetchResultRows(cleaned.result_id, 0, RESULTS_PAGE_SIZE);
+
+  return { ...cleaned, results };
 }
 
-export function downloadCleanedFile(base64Data: string, filename: string) {
-  const blob = base64ToBlob(base64Data, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet');
+export async function fetchResultRows(
+  resultId: string,
+  offset: number = 0,
+  limit?: number
+): Promise<CleanedRow[]> {
+  const params = new URLSearchParams({ offset: String(offset) });
+  if (limit !== undefined) {
+    params.append('limit', String(limit));
+  }
+
+  const response = await fetch(`${API_URL}/results/${resultId}?${params}`);
+
+  if (response.status === 404) {
+    throw new ResultsExpiredError();
+  }
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to load cleaning results');
+  }
+
+  const stored = await response.json();
+  return stored.results;
+}
+
+export async function downloadCleanedFile(resultId: string, filename: string) {
+  const response = await fetch(`${API_URL}/results/${resultId}/file`);
+
+  if (response.status === 404) {
+    throw new ResultsExpiredError();
+  }
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to download cleaned file');
+  }
+
+  const blob = await response.blob();
   const url = window.URL.createObjectURL(blob);
   const a = document.createElement('a');
   a.href = url;
@@ -60,18 +129,6 @@ export function downloadCleanedFile(base64Data: string, filename: string) {
   window.URL.revokeObjectURL(url);
 }
 
-function base64ToBlob(base64: string, contentType: string): Blob {
-  const byteCharacters = atob(base64);
-  const byteNumbers = new Array(byteCharacters.length);
-  
-  for (let i = 0; i < byteCharacters.length; i++) {
-    byteNumbers[i] = byteCharacters.charCodeAt(i);
-  }
-  
-  const byteArray = new Uint8Array(byteNumbers);
-  return new Blob([byteArray], { type: contentType });
-}
-
 // Submission API Types
 export interface LogEntry {
   row: number;
@@ -87,9 +144,27 @@ export interface SubmissionStatus {
   elapsed_seconds: number;
   status: 'idle' | 'running' | 'paused' | 'completed' | 'killed';
   current_position: number;
+  in_flight: number;
   failed: number;
   log: LogEntry[];
   errors: string[];
+  readiness: {
+    strategy: 'selectors' | 'networkidle';
+    lookahead: number;
+    rows: number;
+    ready_seconds: number;
+    wait_seconds: number;
+    preloaded_rows: number;
+    networkidle_rows: number;
+    saved_seconds: number;
+  };
+  blocking: {
+    profile: 'safe' | 'off';
+    requests: number;
+    blocked: number;
+    estimated_bytes_saved: number;
+    blocked_by_type: Record<string, number>;
+  };
 }
 
 export interface SubmitRequest {
@@ -98,10 +173,16 @@ export interface SubmitRequest {
     row_number: number;
     data: CleanedRow['data'];
   }[];
+  concurrency?: number;
+  processes?: number;
+  distributed?: boolean;
+  readiness?: 'selectors' | 'networkidle';
+  blocking?: 'safe' | 'off';
+  lookahead?: number;
 }
 
 // Submission API Functions
-export async function startSubmission(request: SubmitRequest): Promise<{ status: string; total: number }> {
+export async function startSubmission(request: SubmitRequest): Promise<{ status: string; total: number; concurrency: number; processes: number; distributed: boolean }> {
   const response = await fetch(`${API_URL}/submit`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
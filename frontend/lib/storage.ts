@@ -21,7 +21,7 @@ export interface StoredData {
     skipped: number;
     total: number;
   } | null;
-  cleanedFile: string | null;
+  cleanedFile: string | null; // result ID for GET /results/{id}/file
   filename: string | null;
 }
 